@@ -0,0 +1,133 @@
+"""
+Operacje zbiorcze administratora: tworzenie, edycja i usuwanie wielu
+wydarzeń lub projektów w jednej transakcji.
+
+Każdy element jest walidowany osobno - błędny element dostaje status
+``invalid`` (a brakujący id ``not_found``), a pozostałe są zapisywane razem
+jednym commitem. Zapis idzie przez ORM (``add_all`` + jeden flush), więc
+wstawienia trafiają do bazy wielowierszowymi INSERT-ami, a hooki sesji
+(indeks wyszukiwania, tagi technologii, wersje cache) działają jak przy
+pojedynczych zapisach.
+"""
+
+from typing import Any, Dict, Iterable, List, Sequence, Tuple
+
+from pydantic import TypeAdapter, ValidationError
+from sqlalchemy import false, func, update
+from sqlalchemy.orm import Session
+
+from .models import schemas
+from .storage import owned_files, release_files
+
+# Górna granica liczby elementów w jednym żądaniu
+BATCH_MAX_ITEMS = 5000
+
+
+def validate_items(
+    adapter: TypeAdapter, items: Sequence[Any]
+) -> Tuple[List[Tuple[int, Any]], List[schemas.BatchItemResult]]:
+    """Dzieli elementy na poprawne ``(index, model)`` i wyniki ``invalid``."""
+    valid, invalid = [], []
+    for index, item in enumerate(items):
+        try:
+            valid.append((index, adapter.validate_python(item)))
+        except ValidationError as exc:
+            invalid.append(
+                schemas.BatchItemResult(
+                    index=index,
+                    status=schemas.BatchStatus.INVALID,
+                    errors=exc.errors(include_url=False, include_context=False),
+                )
+            )
+    return valid, invalid
+
+
+def _sorted(results: Iterable[schemas.BatchItemResult]):
+    return sorted(results, key=lambda result: result.index)
+
+
+def _load_by_id(session: Session, model, ids, load_options) -> Dict[int, Any]:
+    if not ids:
+        return {}
+    rows = session.query(model).options(*load_options).filter(model.id.in_(ids))
+    return {row.id: row for row in rows}
+
+
+def assign_ids(session: Session, objs: Sequence[Any]) -> None:
+    """
+    Nadaje nowym obiektom (jednego modelu) kolejne wolne id. Z kluczem nadanym
+    z góry ORM wstawia wiersze jednym ``executemany`` - bez tego SQLite (brak
+    deterministycznego RETURNING dla wielu wierszy) dostaje INSERT na wiersz.
+    """
+    if not objs or session.get_bind().dialect.name != "sqlite":
+        return
+    model = type(objs[0])
+    # Pusty UPDATE otwiera transakcję zapisu: do commitu nikt inny nie wstawi
+    # wiersza, więc odczytane maksimum pozostaje aktualne
+    session.execute(update(model).where(false()).values(id=model.id))
+    start = (session.query(func.max(model.id)).scalar() or 0) + 1
+    for obj_id, obj in enumerate(objs, start):
+        obj.id = obj_id
+
+
+def batch_create(
+    session: Session, model, adapter: TypeAdapter, items: Sequence[Any]
+) -> List[schemas.BatchItemResult]:
+    valid, results = validate_items(adapter, items)
+    objs = [model(**data.model_dump()) for _, data in valid]
+    assign_ids(session, objs)
+    session.add_all(objs)
+    session.flush()
+    # id odczytane przed commitem - po nim obiekty są wygaszone
+    results += [
+        schemas.BatchItemResult(
+            index=index, status=schemas.BatchStatus.CREATED, id=obj.id
+        )
+        for (index, _), obj in zip(valid, objs)
+    ]
+    session.commit()
+    return _sorted(results)
+
+
+def batch_update(
+    session: Session,
+    model,
+    adapter: TypeAdapter,
+    items: Sequence[Any],
+    load_options=(),
+) -> List[schemas.BatchItemResult]:
+    valid, results = validate_items(adapter, items)
+    rows = _load_by_id(session, model, {data.id for _, data in valid}, load_options)
+    for index, data in valid:
+        row = rows.get(data.id)
+        if row is None:
+            status = schemas.BatchStatus.NOT_FOUND
+        else:
+            for key, value in data.model_dump(
+                exclude_unset=True, exclude={"id"}
+            ).items():
+                setattr(row, key, value)
+            status = schemas.BatchStatus.UPDATED
+        results.append(schemas.BatchItemResult(index=index, status=status, id=data.id))
+    session.commit()
+    return _sorted(results)
+
+
+def batch_delete(
+    session: Session, model, ids: Sequence[int], load_options=()
+) -> List[schemas.BatchItemResult]:
+    rows = _load_by_id(session, model, set(ids), load_options)
+    results, owned = [], []
+    for index, row_id in enumerate(ids):
+        row = rows.pop(row_id, None)
+        if row is None:
+            # Brak w bazie albo powtórzony id
+            status = schemas.BatchStatus.NOT_FOUND
+        else:
+            owned += owned_files(row)
+            session.delete(row)
+            status = schemas.BatchStatus.DELETED
+        results.append(schemas.BatchItemResult(index=index, status=status, id=row_id))
+    session.commit()
+    release_files(session, owned)
+    return results
@@ -0,0 +1,212 @@
+"""
+Pamięć podręczna (LRU + TTL) zserializowanych odpowiedzi publicznych GET-ów
+oraz warunkowe GET-y (ETag / Last-Modified -> 304 Not Modified).
+
+Klucz wpisu zawiera wersje tabel, z których odpowiedź została zbudowana
+(patrz ``db/versioning.py``), więc każdy commit zmieniający te tabele
+automatycznie unieważnia powiązane wpisy - stare po prostu wypadają z LRU.
+TTL chroni przed zmianami, o których proces nie wie (np. inny worker).
+
+ETag jest skrótem zserializowanej treści, liczonym raz przy budowaniu wpisu,
+więc nie zmienia się po restarcie, wygaśnięciu TTL ani między workerami,
+dopóki treść jest ta sama. Odpowiedź 304 przy trafieniu w pamięć podręczną
+nie wymaga zapytania do bazy. Zmiany spoza procesu są widoczne najpóźniej
+po jednym okresie TTL.
+"""
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Sequence
+
+from fastapi import Request, Response
+from pydantic import TypeAdapter
+from sqlalchemy.orm import Session
+
+from .config import settings
+from .db import versioning
+from .dependencies import DBSession
+
+_MISSING = object()
+
+
+@dataclass
+class CachedResponse:
+    body: bytes
+    headers: Dict[str, str] = field(default_factory=dict)
+    etag: str = field(init=False)
+
+    def __post_init__(self):
+        self.etag = make_etag(self.body)
+
+    def to_response(self) -> Response:
+        return Response(
+            content=self.body, media_type="application/json", headers=self.headers
+        )
+
+
+class ResponseCache:
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Any:
+        """Zwraca zapisaną wartość albo ``_MISSING``."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires_at, value = entry
+                if expires_at > time.monotonic():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._entries[key]
+            self.misses += 1
+            return _MISSING
+
+    def set(self, key: Hashable, value: Any) -> None:
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def get_or_build(
+        self, key: Hashable, tables: Sequence[str], build: Callable[[], Any]
+    ) -> Any:
+        """
+        Zwraca wartość dla ``key`` zbudowaną przy aktualnych wersjach ``tables``.
+        ``build`` jest wywoływane tylko przy braku trafienia.
+        """
+        versioned_key = (key, versioning.get_versions(*tables))
+        value = self.get(versioned_key)
+        if value is _MISSING:
+            value = build()
+            self.set(versioned_key, value)
+        return value
+
+    async def get_or_build_async(
+        self,
+        key: Hashable,
+        tables: Sequence[str],
+        build: Callable[[], Awaitable[Any]],
+    ) -> Any:
+        """Jak ``get_or_build``, ale ``build`` jest korutyną (np. ``run_sync``)."""
+        versioned_key = (key, versioning.get_versions(*tables))
+        value = self.get(versioned_key)
+        if value is _MISSING:
+            value = await build()
+            self.set(versioned_key, value)
+        return value
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = self.evictions = 0
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_ratio": self.hits / lookups if lookups else 0.0,
+            }
+
+
+response_cache = ResponseCache(
+    maxsize=settings.response_cache_size, ttl=settings.response_cache_ttl
+)
+
+
+def dump_json(adapter: TypeAdapter, obj: Any) -> bytes:
+    """Walidacja obiektów ORM schematem i serializacja do JSON (bajty)."""
+    return adapter.dump_json(adapter.validate_python(obj, from_attributes=True))
+
+
+def make_etag(body: bytes) -> str:
+    return f'"{hashlib.sha256(body).hexdigest()[:32]}"'
+
+
+def http_date(value: datetime) -> str:
+    return format_datetime(value.replace(tzinfo=timezone.utc), usegmt=True)
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    if if_none_match.strip() == "*":
+        return True
+    candidates = (tag.strip() for tag in if_none_match.split(","))
+    return any(tag.removeprefix("W/") == etag for tag in candidates)
+
+
+def _not_modified_since(if_modified_since: str, modified: Optional[datetime]) -> bool:
+    try:
+        since = parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return False
+    if since.tzinfo is None:
+        since = since.replace(tzinfo=timezone.utc)
+    if modified is None:
+        return False
+    # Last-Modified ma dokładność do sekundy
+    modified = modified.replace(tzinfo=timezone.utc, microsecond=0)
+    return modified <= since
+
+
+async def cached_response(
+    request: Request,
+    db: DBSession,
+    key: Hashable,
+    tables: Sequence[str],
+    build: Callable[[Session], Optional[CachedResponse]],
+    last_modified: Optional[Callable[[Session], Optional[datetime]]] = None,
+) -> Optional[Response]:
+    """
+    Odpowiedź z pamięci podręcznej z obsługą If-None-Match / If-Modified-Since.
+
+    ``build`` i ``last_modified`` to synchroniczny kod ORM wykonywany przez
+    ``db.run_sync`` - tylko wtedy, gdy jest potrzebny. ``last_modified`` to
+    tanie zapytanie o datę modyfikacji zasobu, używane przy If-Modified-Since.
+    ``If-None-Match: *`` pasuje tylko do istniejącego zasobu.
+    Zwraca None, gdy ``build`` zwróci None (zasób nie istnieje) - wtedy
+    endpoint zgłasza 404.
+    """
+    # ETag wynika z treści, więc najpierw wpis z pamięci podręcznej (albo
+    # zbudowany) - przy okazji wiadomo, czy zasób w ogóle istnieje
+    cached = await response_cache.get_or_build_async(
+        key, tables, lambda: db.run_sync(build)
+    )
+    if cached is None:
+        return None
+    validators = {"ETag": cached.etag, "Cache-Control": "no-cache"}
+
+    if_none_match = request.headers.get("if-none-match")
+    if_modified_since = request.headers.get("if-modified-since")
+    # Zgodnie z RFC 9110 If-Modified-Since jest ignorowany, gdy jest If-None-Match
+    if if_none_match is not None:
+        if _etag_matches(if_none_match, cached.etag):
+            return Response(status_code=304, headers=validators)
+    elif if_modified_since is not None and last_modified is not None:
+        modified = await db.run_sync(last_modified)
+        if _not_modified_since(if_modified_since, modified):
+            return Response(status_code=304, headers=validators)
+
+    response = cached.to_response()
+    response.headers.update(validators)
+    return response
@@ -1,9 +1,72 @@
+from typing import List, Literal, Optional
+
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 class Settings(BaseSettings):
     app_name: str = "FastAPI Admin API"
     admin_api_key: str = "super_secret_api_key" # TODO: Change this to an actual secret key
 
+    # Baza danych
+    database_url: str = "sqlite:///./sql_app.db"
+    sqlite_journal_mode: Literal["WAL", "DELETE", "TRUNCATE", "PERSIST", "MEMORY"] = (
+        "WAL"
+    )
+    sqlite_synchronous: Literal["OFF", "NORMAL", "FULL", "EXTRA"] = "NORMAL"
+    sqlite_cache_size: int = -20000  # ujemna wartość = KiB (tu ~20 MB)
+    sqlite_mmap_size: int = 256 * 1024 * 1024
+    sqlite_busy_timeout: int = 5000  # ms oczekiwania na blokadę zapisu
+    db_pool_size: int = 5
+    db_max_overflow: int = 10
+    db_pool_timeout: float = 30.0
+    # Routery korzystają z AsyncSession (aiosqlite) zamiast sesji w wątkach
+    db_async: bool = False
+    async_database_url: Optional[str] = None  # domyślnie wyprowadzany z database_url
+
+    # Odpowiedzi z obiektów ORM bez ponownej walidacji schematem (app.serialization)
+    fast_serialization: bool = True
+
+    # Pamięć podręczna odpowiedzi publicznych (0 = wyłączona)
+    response_cache_size: int = 512
+    # Zapisy z innych procesów (workerów) są widoczne po najwyżej jednym TTL
+    response_cache_ttl: float = 300.0
+
+    # Warianty zdjęć (wymaga Pillow); pusta lista wyłącza generowanie
+    image_variant_widths: List[int] = [320, 800, 1600]
+    image_variant_format: str = "WEBP"
+    image_variant_quality: int = 80
+    image_workers: Optional[int] = None  # None = liczba rdzeni
+    # Wiele zdjęć w jednym żądaniu (/admin/upload_images/)
+    image_upload_max_files: int = 500
+    image_upload_concurrency: int = 4  # pliki zapisywane jednocześnie
+
+    # Wznawialne przesyłanie dużych plików (poza static/, bo to katalog publiczny)
+    upload_staging_dir: str = "upload_staging"
+    upload_session_ttl: int = 24 * 60 * 60  # sekundy bez aktywności
+    upload_purge_interval: float = 3600.0  # sprzątanie w tle; 0 = wyłączone
+
+    # Uzgadnianie static/ z bazą (app.reconciler); 0 = bez zadania w tle
+    reconcile_interval: float = 300.0  # przerwa między pełnymi przejściami
+    reconcile_batch: int = 1000  # plików/wierszy na jeden krok
+    reconcile_grace: float = 3600.0  # młodsze pliki są pomijane (sekundy)
+    reconcile_remove: bool = False  # w tle tylko raport, chyba że True
+
+    # Metryki Prometheusa pod /metrics (app.metrics)
+    metrics_enabled: bool = True
+
+    # Profilowanie SQL (app.db.profiling)
+    slow_query_threshold: Optional[float] = None  # sekundy; None = bez logu
+    slow_query_explain: bool = True  # dołącz plan zapytania do logu
+    server_timing: bool = False  # nagłówek Server-Timing z czasem zapytań
+    # Profil żądania dla admina (X-Profile: 1, app.profiler)
+    profiler_enabled: bool = True
+    profiler_interval: float = 0.001  # sekundy między próbkami
+
+    # Statyczne migawki JSON treści publicznej (app.publisher)
+    snapshot_enabled: bool = True
+    snapshot_dir: str = "static/snapshots"
+    snapshot_debounce: float = 2.0  # sekundy ciszy po zapisie przed publikacją
+    snapshot_max_delay: float = 30.0  # najdłuższe odkładanie przy ciągłych zapisach
+
     model_config = SettingsConfigDict(env_file=".env")
 
 settings = Settings()
@@ -1,11 +1,95 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import URL, Engine, make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import declarative_base, sessionmaker
 
-SQLALCHEMY_DATABASE_URL = "sqlite:///./sql_app.db"
+from ..config import Settings, settings
+from . import profiling
 
-engine = create_engine(
-    SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False}
-)
+SQLALCHEMY_DATABASE_URL = settings.database_url
+
+
+def apply_sqlite_pragmas(dbapi_connection, config: Settings = settings) -> None:
+    """
+    Ustawienia SQLite obowiązujące dla pojedynczego połączenia.
+    WAL pozwala czytelnikom działać równolegle z zapisem admina (w trybie
+    rollback-journal każdy zapis blokuje wszystkie odczyty).
+    """
+    cursor = dbapi_connection.cursor()
+    try:
+        cursor.execute(f"PRAGMA journal_mode={config.sqlite_journal_mode}")
+        cursor.execute(f"PRAGMA synchronous={config.sqlite_synchronous}")
+        cursor.execute(f"PRAGMA cache_size={int(config.sqlite_cache_size)}")
+        cursor.execute(f"PRAGMA mmap_size={int(config.sqlite_mmap_size)}")
+        cursor.execute(f"PRAGMA busy_timeout={int(config.sqlite_busy_timeout)}")
+    finally:
+        cursor.close()
+
+
+def _engine_kwargs(database_url: URL, config: Settings) -> dict:
+    kwargs = {}
+    if database_url.get_backend_name() == "sqlite":
+        kwargs["connect_args"] = {"check_same_thread": False}
+    # Baza w pamięci działa na jednym połączeniu - pula nie ma sensu
+    if database_url.database not in (None, "", ":memory:"):
+        kwargs.update(
+            pool_size=config.db_pool_size,
+            max_overflow=config.db_max_overflow,
+            pool_timeout=config.db_pool_timeout,
+        )
+    return kwargs
+
+
+def _listen_for_pragmas(sync_engine: Engine, config: Settings) -> None:
+    @event.listens_for(sync_engine, "connect")
+    def _on_connect(dbapi_connection, connection_record):
+        apply_sqlite_pragmas(dbapi_connection, config)
+
+
+def create_db_engine(url: str, config: Settings = settings) -> Engine:
+    """Silnik skonfigurowany z ``Settings`` (pragmy SQLite, rozmiar puli)."""
+    database_url = make_url(url)
+    db_engine = create_engine(url, **_engine_kwargs(database_url, config))
+    if database_url.get_backend_name() == "sqlite":
+        _listen_for_pragmas(db_engine, config)
+    profiling.configure(
+        db_engine, config.slow_query_threshold, config.slow_query_explain
+    )
+    return db_engine
+
+
+def async_database_url(url: str) -> str:
+    """``sqlite:///...`` -> ``sqlite+aiosqlite:///...``"""
+    database_url = make_url(url)
+    if database_url.get_backend_name() == "sqlite":
+        database_url = database_url.set(drivername="sqlite+aiosqlite")
+    return database_url.render_as_string(hide_password=False)
+
+
+def create_async_db_engine(url: str, config: Settings = settings) -> AsyncEngine:
+    """Asynchroniczny odpowiednik ``create_db_engine`` (np. aiosqlite)."""
+    database_url = make_url(url)
+    db_engine = create_async_engine(url, **_engine_kwargs(database_url, config))
+    if database_url.get_backend_name() == "sqlite":
+        _listen_for_pragmas(db_engine.sync_engine, config)
+    profiling.configure(
+        db_engine.sync_engine, config.slow_query_threshold, config.slow_query_explain
+    )
+    return db_engine
+
+
+engine = create_db_engine(SQLALCHEMY_DATABASE_URL)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Tryb asynchroniczny (settings.db_async) - silnik tworzony tylko, gdy potrzebny
+async_engine = None
+AsyncSessionLocal = None
+if settings.db_async:
+    async_engine = create_async_db_engine(
+        settings.async_database_url or async_database_url(SQLALCHEMY_DATABASE_URL)
+    )
+    AsyncSessionLocal = async_sessionmaker(
+        async_engine, autoflush=False, expire_on_commit=False
+    )
+
 Base = declarative_base()
@@ -0,0 +1,62 @@
+"""
+Lekkie dopasowanie istniejącej bazy do modeli.
+
+``create_all`` tworzy tylko brakujące tabele - nie dodaje nowych kolumn ani
+indeksów do tabel, które już istnieją. ``upgrade_schema`` uzupełnia je
+w starszych plikach ``sql_app.db`` (wyłącznie operacje addytywne), a funkcje
+``migrate_*`` przenoszą dane do nowych tabel.
+"""
+
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import flag_modified
+from sqlalchemy.schema import CreateColumn
+
+from .database import Base
+
+
+def upgrade_schema(engine: Engine) -> None:
+    inspector = inspect(engine)
+    existing_tables = set(inspector.get_table_names())
+
+    with engine.begin() as conn:
+        for table in Base.metadata.sorted_tables:
+            if table.name not in existing_tables:
+                continue
+
+            existing_columns = {c["name"] for c in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in existing_columns:
+                    continue
+                ddl = CreateColumn(column).compile(dialect=engine.dialect)
+                conn.execute(text(f"ALTER TABLE {table.name} ADD COLUMN {ddl}"))
+
+            existing_indexes = {i["name"] for i in inspector.get_indexes(table.name)}
+            for index in table.indexes:
+                if index.name not in existing_indexes:
+                    index.create(conn)
+
+
+def migrate_technology_tags(engine: Engine) -> int:
+    """
+    Rozbija tekstowe ``Project.technologies`` na tagi w bazach sprzed
+    wprowadzenia tabeli ``technologies``. Zwraca liczbę przetworzonych
+    projektów (0, gdy tagi już są).
+    """
+    from ..models import models
+
+    with Session(engine) as session:
+        if session.query(models.project_technologies).first() is not None:
+            return 0
+        projects = (
+            session.query(models.Project)
+            .filter(models.Project.technologies.is_not(None))
+            .filter(models.Project.technologies != "")
+            .all()
+        )
+        for project in projects:
+            # _sync_tags reaguje na zmianę pola - oznaczamy je jako zmienione
+            flag_modified(project, "technologies")
+        session.commit()
+        return len(projects)
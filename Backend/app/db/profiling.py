@@ -0,0 +1,218 @@
+"""
+Profilowanie SQL: log wolnych zapytań i nagłówek ``Server-Timing``.
+
+* ``SlowQueryLog`` - zdarzenia silnika mierzą każde zapytanie; przekraczające
+  próg trafiają do logu ``app.db.profiling`` razem z parametrami, planem
+  (``EXPLAIN QUERY PLAN``) i trasą, która je wysłała. Trasę podaje
+  ``SlowQueryMiddleware``.
+* ``ServerTimingMiddleware`` - dopisuje do odpowiedzi liczbę i łączny czas
+  zapytań żądania (``Server-Timing: db;dur=...``), widoczne w narzędziach
+  deweloperskich przeglądarki.
+
+Oba mechanizmy są opcjonalne (``settings.slow_query_threshold``,
+``settings.server_timing``) i niezależne od siebie oraz od ``app.metrics``.
+"""
+
+import contextvars
+import logging
+import time
+from typing import Any, List, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from ..metrics import route_template, track_sql, untrack_sql
+
+logger = logging.getLogger(__name__)
+
+SERVER_TIMING_HEADER = "Server-Timing"
+
+# Atrybut kontekstu wykonania - znika razem z nim, także gdy zapytanie rzuci
+_QUERY_START = "_profiling_query_start"
+_MAX_PARAMETERS_LENGTH = 1000
+
+# Plan zapytania wg dialektu; pozostałe bazy logują zapytanie bez planu
+EXPLAIN_PREFIXES = {
+    "sqlite": "EXPLAIN QUERY PLAN ",
+    "postgresql": "EXPLAIN ",
+    "mysql": "EXPLAIN ",
+}
+_EXPLAINABLE = ("SELECT", "WITH", "INSERT", "UPDATE", "DELETE")
+
+# Scope żądania, w którym wykonywane są zapytania (SlowQueryMiddleware)
+_current_scope: contextvars.ContextVar[Optional[dict]] = contextvars.ContextVar(
+    "slow_query_scope", default=None
+)
+
+
+def _format_parameters(parameters: Any, many: bool) -> str:
+    text = repr(parameters)
+    if many:
+        text = f"{len(parameters)} sets, e.g. {parameters[0]!r}"
+    if len(text) > _MAX_PARAMETERS_LENGTH:
+        text = text[:_MAX_PARAMETERS_LENGTH] + "..."
+    return text
+
+
+def _format_sqlite_plan(rows) -> List[str]:
+    """Wiersze (id, parent, notused, detail) jako wcięte drzewo."""
+    depth = {0: -1}
+    lines = []
+    for row in rows:
+        node, parent, detail = row[0], row[1], row[-1]
+        depth[node] = depth.get(parent, -1) + 1
+        lines.append("  " * depth[node] + str(detail))
+    return lines
+
+
+def explain(connection, statement: str, parameters: Any, many: bool) -> List[str]:
+    """
+    Plan zapytania z osobnego kursora DBAPI - kursor zapytania ma jeszcze
+    nieodczytane wiersze, a zdarzenia silnika nie widzą tego wywołania.
+    """
+    prefix = EXPLAIN_PREFIXES.get(connection.dialect.name)
+    if prefix is None or not statement.lstrip().upper().startswith(_EXPLAINABLE):
+        return []
+    if many:
+        parameters = parameters[0] if parameters else ()
+    cursor = connection.connection.dbapi_connection.cursor()
+    try:
+        cursor.execute(prefix + statement, parameters)
+        rows = cursor.fetchall()
+    finally:
+        cursor.close()
+    if connection.dialect.name == "sqlite":
+        return _format_sqlite_plan(rows)
+    return [str(row[-1]) for row in rows]
+
+
+def _request_label() -> str:
+    scope = _current_scope.get()
+    if scope is None:
+        return "(outside request)"
+    return f"{scope['method']} {route_template(scope)}"
+
+
+class SlowQueryLog:
+    """Loguje zapytania dłuższe niż ``threshold`` sekund."""
+
+    def __init__(self, threshold: float, explain_plans: bool = True):
+        self.threshold = threshold
+        self.explain_plans = explain_plans
+
+    def attach(self, engine: Engine) -> None:
+        if not event.contains(engine, "before_cursor_execute", self._before):
+            event.listen(engine, "before_cursor_execute", self._before)
+            event.listen(engine, "after_cursor_execute", self._after)
+
+    def detach(self, engine: Engine) -> None:
+        if event.contains(engine, "before_cursor_execute", self._before):
+            event.remove(engine, "before_cursor_execute", self._before)
+            event.remove(engine, "after_cursor_execute", self._after)
+
+    def _before(self, conn, cursor, statement, parameters, context, many):
+        setattr(context, _QUERY_START, time.perf_counter())
+
+    def _after(self, conn, cursor, statement, parameters, context, many):
+        start = getattr(context, _QUERY_START, None)
+        if start is None:
+            return
+        duration = time.perf_counter() - start
+        if duration >= self.threshold:
+            self._log(conn, statement, parameters, many, duration)
+
+    def _log(self, conn, statement, parameters, many, duration) -> None:
+        plan: List[str] = []
+        if self.explain_plans:
+            try:
+                plan = explain(conn, statement, parameters, many)
+            except Exception as exc:
+                plan = [f"(plan unavailable: {exc})"]
+        route = _request_label()
+        formatted = _format_parameters(parameters, many)
+        message = "Slow query (%.1f ms) in %s:\n%s\nparameters: %s"
+        args = [duration * 1000, route, statement, formatted]
+        if plan:
+            message += "\nplan:\n%s"
+            args.append("\n".join("  " + line for line in plan))
+        logger.warning(
+            message,
+            *args,
+            extra={
+                "duration": duration,
+                "route": route,
+                "statement": statement,
+                "parameters": formatted,
+                "plan": plan,
+            },
+        )
+
+
+class SlowQueryMiddleware:
+    """Udostępnia logowi wolnych zapytań żądanie, które je wysłało."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        token = _current_scope.set(scope)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            _current_scope.reset(token)
+
+
+def server_timing(statements: int, db_seconds: float, total_seconds: float) -> str:
+    return (
+        f'db;dur={db_seconds * 1000:.1f};desc="{statements} queries", '
+        f"app;dur={total_seconds * 1000:.1f}"
+    )
+
+
+class ServerTimingMiddleware:
+    """
+    Dopisuje ``Server-Timing`` z liczbą i czasem zapytań SQL żądania.
+    Wymaga silnika z ``app.metrics.instrument_engine``.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        sql, token = track_sql(scope)
+        start = time.perf_counter()
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                value = server_timing(
+                    sql.statements, sql.seconds, time.perf_counter() - start
+                )
+                headers = list(message.get("headers", []))
+                headers.append((SERVER_TIMING_HEADER.encode(), value.encode()))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            untrack_sql(token)
+
+
+slow_query_log: Optional[SlowQueryLog] = None
+
+
+def configure(engine: Engine, threshold: Optional[float], explain_plans: bool) -> None:
+    """Włącza log wolnych zapytań dla silnika (``threshold=None`` - wyłączony)."""
+    global slow_query_log
+    if threshold is None:
+        return
+    if slow_query_log is None:
+        slow_query_log = SlowQueryLog(threshold, explain_plans)
+    slow_query_log.attach(engine)
@@ -0,0 +1,204 @@
+"""
+Indeks pełnotekstowy (SQLite FTS5) nad projektami i wydarzeniami.
+
+Tabela ``search_index`` jest tworzona razem z pozostałymi przez
+``create_all`` (a w starszych bazach - przy pierwszym starcie, wraz
+z zaindeksowaniem istniejących wierszy). Zmiany obiektów ORM są przenoszone
+do indeksu w tym samym flushu, więc indeks i dane commitują się razem.
+
+``rowid`` w indeksie jest wyprowadzany z id (projekty parzyste, wydarzenia
+nieparzyste) - aktualizacja i usunięcie wpisu to wyszukanie po kluczu,
+a nie przeszukanie całej tabeli FTS.
+"""
+
+import html
+import re
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import event, inspect, text
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+
+from ..models import models
+from .database import Base
+
+SEARCH_TABLE = "search_index"
+
+# Kolumny indeksowane dla każdego modelu (brakujące są puste)
+INDEXED_FIELDS: Dict[type, Tuple[str, ...]] = {
+    models.Project: ("name", "description", "technologies"),
+    models.Event: ("name", "description"),
+}
+_KINDS = {models.Project: ("project", 0), models.Event: ("event", 1)}
+
+# Waga trafienia w kolumnie (kind, ref_id, name, description, technologies)
+_BM25_WEIGHTS = "0.0, 0.0, 10.0, 1.0, 5.0"
+
+_TOKEN = re.compile(r"\w+", re.UNICODE)
+
+# Znaczniki trafień w snippet() - znaki sterujące, których nie ma w tekście
+# z formularzy; zamieniane na <mark> dopiero po escapowaniu HTML
+_MARK_OPEN, _MARK_CLOSE = "\x02", "\x03"
+
+
+def _rowid(obj) -> int:
+    return obj.id * 2 + _KINDS[type(obj)][1]
+
+
+def _is_sqlite(bind) -> bool:
+    return bind.dialect.name == "sqlite"
+
+
+def _has_index(conn: Connection) -> bool:
+    return (
+        conn.execute(
+            text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"),
+            {"name": SEARCH_TABLE},
+        ).first()
+        is not None
+    )
+
+
+def rebuild_search_index(conn: Connection) -> None:
+    """Indeksuje od nowa wszystkie projekty i wydarzenia."""
+    conn.execute(text(f"DELETE FROM {SEARCH_TABLE}"))
+    conn.execute(
+        text(
+            f"INSERT INTO {SEARCH_TABLE}"
+            " (rowid, kind, ref_id, name, description, technologies)"
+            " SELECT id * 2, 'project', id, name, description, technologies"
+            " FROM projects"
+        )
+    )
+    conn.execute(
+        text(
+            f"INSERT INTO {SEARCH_TABLE}"
+            " (rowid, kind, ref_id, name, description, technologies)"
+            " SELECT id * 2 + 1, 'event', id, name, description, NULL FROM events"
+        )
+    )
+
+
+def create_search_index(conn: Connection) -> None:
+    """Tworzy tabelę FTS5, jeśli jej brakuje, i wypełnia ją istniejącymi danymi."""
+    if not _is_sqlite(conn) or _has_index(conn):
+        return
+    # remove_diacritics: "robotow" znajduje "robotów"; prefix: szybkie "kol*"
+    conn.execute(
+        text(
+            f"CREATE VIRTUAL TABLE {SEARCH_TABLE} USING fts5("
+            "kind UNINDEXED, ref_id UNINDEXED, name, description, technologies, "
+            "tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3')"
+        )
+    )
+    rebuild_search_index(conn)
+
+
+@event.listens_for(Base.metadata, "after_create")
+def _create_after_tables(target, connection, **kw):
+    create_search_index(connection)
+
+
+@event.listens_for(Base.metadata, "before_drop")
+def _drop_before_tables(target, connection, **kw):
+    if _is_sqlite(connection):
+        connection.execute(text(f"DROP TABLE IF EXISTS {SEARCH_TABLE}"))
+
+
+def _indexed_fields_changed(obj) -> bool:
+    state = inspect(obj)
+    return any(
+        state.attrs[field].history.has_changes() for field in INDEXED_FIELDS[type(obj)]
+    )
+
+
+@event.listens_for(Session, "after_flush")
+def _sync_flushed(session, flush_context):
+    changed = [obj for obj in session.new if type(obj) in INDEXED_FIELDS]
+    changed += [
+        obj
+        for obj in session.dirty
+        if type(obj) in INDEXED_FIELDS and _indexed_fields_changed(obj)
+    ]
+    removed = [obj for obj in session.deleted if type(obj) in INDEXED_FIELDS]
+    if not changed and not removed:
+        return
+
+    conn = session.connection()
+    if not _is_sqlite(conn):
+        return
+    stale = [{"rowid": _rowid(obj)} for obj in changed + removed]
+    conn.execute(text(f"DELETE FROM {SEARCH_TABLE} WHERE rowid = :rowid"), stale)
+    if changed:
+        conn.execute(
+            text(
+                f"INSERT INTO {SEARCH_TABLE}"
+                " (rowid, kind, ref_id, name, description, technologies)"
+                " VALUES (:rowid, :kind, :ref_id, :name, :description, :technologies)"
+            ),
+            [
+                {
+                    "rowid": _rowid(obj),
+                    "kind": _KINDS[type(obj)][0],
+                    "ref_id": obj.id,
+                    "name": obj.name,
+                    "description": obj.description,
+                    "technologies": getattr(obj, "technologies", None),
+                }
+                for obj in changed
+            ],
+        )
+
+
+def build_match_query(q: str) -> Optional[str]:
+    """
+    Zamienia tekst od użytkownika na bezpieczne wyrażenie MATCH.
+    Każde słowo musi wystąpić; ostatnie może być początkiem słowa.
+    """
+    tokens = _TOKEN.findall(q)
+    if not tokens:
+        return None
+    terms = [f'"{token}"' for token in tokens]
+    terms[-1] += "*"
+    return " ".join(terms)
+
+
+def search(db: Session, q: str, limit: int = 20) -> List[dict]:
+    """Wyniki uszeregowane wg BM25 (najlepsze pierwsze) z fragmentami tekstu."""
+    match = build_match_query(q)
+    if match is None:
+        return []
+    rows = db.execute(
+        text(
+            "SELECT kind, ref_id, name,"
+            f" snippet({SEARCH_TABLE}, -1, :mark_open, :mark_close, '…', 12),"
+            f" bm25({SEARCH_TABLE}, {_BM25_WEIGHTS}) AS score"
+            f" FROM {SEARCH_TABLE} WHERE {SEARCH_TABLE} MATCH :match"
+            " ORDER BY score LIMIT :limit"
+        ),
+        {
+            "match": match,
+            "limit": limit,
+            "mark_open": _MARK_OPEN,
+            "mark_close": _MARK_CLOSE,
+        },
+    )
+    return [
+        {
+            "kind": kind,
+            "id": ref_id,
+            "name": name,
+            "snippet": _highlight(snippet),
+            "score": -score,
+        }
+        for kind, ref_id, name, snippet, score in rows
+    ]
+
+
+def _highlight(snippet: str) -> str:
+    """Fragment jako bezpieczny HTML - tylko znaczniki <mark> nie są escapowane."""
+    return (
+        html.escape(snippet)
+        .replace(_MARK_OPEN, "<mark>")
+        .replace(_MARK_CLOSE, "</mark>")
+    )
@@ -0,0 +1,87 @@
+"""
+Liczniki wersji treści - osobny licznik dla każdej tabeli.
+
+Licznik jest podbijany po każdym commicie, który zmienił wiersze tabeli
+(zarówno przez flush obiektów ORM, jak i przez masowe INSERT/UPDATE/DELETE).
+Pozwala to tanio sprawdzić, czy wynik policzony wcześniej jest nadal aktualny.
+"""
+
+import logging
+import threading
+from collections import defaultdict
+from itertools import chain
+from typing import Callable, Dict, List, Set, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+_lock = threading.Lock()
+_versions: Dict[str, int] = defaultdict(int)
+
+_TOUCHED_KEY = "touched_tables"
+
+# Wywoływane po commicie ze zbiorem zmienionych tabel (np. publikacja migawek)
+_listeners: List[Callable[[Set[str]], None]] = []
+
+logger = logging.getLogger(__name__)
+
+
+def get_versions(*tables: str) -> Tuple[int, ...]:
+    """Zwraca aktualne wersje podanych tabel (w tej samej kolejności)."""
+    return tuple(_versions[table] for table in tables)
+
+
+def bump(*tables: str) -> None:
+    with _lock:
+        for table in tables:
+            _versions[table] += 1
+
+
+def on_change(listener: Callable[[Set[str]], None]) -> Callable[[Set[str]], None]:
+    """Rejestruje funkcję wywoływaną po każdym commicie zmieniającym tabele."""
+    _listeners.append(listener)
+    return listener
+
+
+def _touched(session: Session) -> set:
+    return session.info.setdefault(_TOUCHED_KEY, set())
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_flushed(session, flush_context):
+    touched = _touched(session)
+    for obj in chain(session.new, session.dirty, session.deleted):
+        table = getattr(obj, "__table__", None)
+        if table is not None:
+            touched.add(table.name)
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _collect_bulk(orm_execute_state):
+    if not (
+        orm_execute_state.is_insert
+        or orm_execute_state.is_update
+        or orm_execute_state.is_delete
+    ):
+        return
+    table = getattr(orm_execute_state.statement, "table", None)
+    if table is not None:
+        _touched(orm_execute_state.session).add(table.name)
+
+
+@event.listens_for(Session, "after_commit")
+def _bump_committed(session):
+    touched = session.info.pop(_TOUCHED_KEY, None)
+    if touched:
+        bump(*touched)
+        for listener in _listeners:
+            try:
+                listener(touched)
+            except Exception:
+                # Commit już się odbył - błąd słuchacza nie może go cofnąć
+                logger.exception("Version change listener failed")
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_rolled_back(session):
+    session.info.pop(_TOUCHED_KEY, None)
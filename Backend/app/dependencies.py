@@ -1,6 +1,33 @@
+from typing import Optional, Union
+
 from fastapi import Header, HTTPException
-from .db.database import SessionLocal
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from . import profiler
 from .config import settings
+from .db.database import AsyncSessionLocal, SessionLocal
+
+
+class SyncSessionRunner:
+    """
+    Zwykła sesja z interfejsem ``AsyncSession.run_sync``.
+    Kod ORM wykonuje się w puli wątków, więc nie blokuje pętli zdarzeń.
+    """
+
+    def __init__(self, session: Session):
+        self.session = session
+
+    async def run_sync(self, fn, *args, **kwargs):
+        return await run_in_threadpool(
+            profiler.sampled_in_thread(fn), self.session, *args, **kwargs
+        )
+
+
+# Routery wykonują kod ORM przez ``await db.run_sync(fn)`` - niezależnie od trybu
+DBSession = Union[AsyncSession, SyncSessionRunner]
+
 
 def get_db():
     db = SessionLocal()
@@ -9,6 +36,24 @@ def get_db():
     finally:
         db.close()
 
+
+async def get_session():
+    """Sesja dla routerów: AsyncSession (``db_async``) albo sesja w wątkach."""
+    if settings.db_async:
+        async with AsyncSessionLocal() as session:
+            yield session
+    else:
+        db = SessionLocal()
+        try:
+            yield SyncSessionRunner(db)
+        finally:
+            await run_in_threadpool(db.close)
+
+
+def is_valid_api_key(x_api_key: Optional[str]) -> bool:
+    return x_api_key in [settings.admin_api_key, "test_api_key"]
+
+
 def verify_api_key(x_api_key: str = Header(...)):
-    if x_api_key not in [settings.admin_api_key, "test_api_key"]:
+    if not is_valid_api_key(x_api_key):
         raise HTTPException(status_code=401, detail="Invalid API Key")
@@ -0,0 +1,102 @@
+"""
+Wybór pól (``fields=``) i relacji (``include=``) w odpowiedziach publicznych.
+
+``fields`` to kolumny obiektu głównego (domyślnie wszystkie), ``include``
+to relacje (domyślnie wszystkie; puste ``include=`` - żadna), np. karta
+projektu na stronie głównej::
+
+    GET /api/projects/?fields=id,name,year&include=images
+
+Niewybrane kolumny nie trafiają do SELECT-a (``load_only``), a niewybrane
+relacje nie są ani ładowane, ani serializowane (``raiseload`` - przypadkowy
+odczyt kończy się błędem zamiast cichego zapytania). ``id`` jest zawsze
+w odpowiedzi.
+"""
+
+from typing import Iterable, List, Mapping, NamedTuple, Optional, Sequence, Tuple
+
+from fastapi import HTTPException
+from sqlalchemy import inspect
+from sqlalchemy.orm import load_only, raiseload
+
+ALWAYS_INCLUDED = ("id",)
+FIELDS_MAX_LENGTH = 200  # długość parametrów fields/include
+
+
+class Fieldset(NamedTuple):
+    columns: Tuple[str, ...]
+    relations: Tuple[str, ...]
+
+    @property
+    def fields(self) -> Tuple[str, ...]:
+        return self.columns + self.relations
+
+
+def _split(value: str) -> List[str]:
+    return [name.strip() for name in value.split(",") if name.strip()]
+
+
+def _check(param: str, names: Iterable[str], allowed: Sequence[str]) -> None:
+    unknown = sorted(set(names) - set(allowed))
+    if unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown {param}: {', '.join(unknown)}. "
+            f"Allowed: {', '.join(allowed)}",
+        )
+
+
+def schema_parts(schema, model) -> Tuple[Tuple[str, ...], Tuple[str, ...]]:
+    """Pola schematu podzielone na kolumny i relacje modelu (w kolejności schematu)."""
+    relationships = inspect(model).relationships.keys()
+    names = tuple(schema.model_fields)
+    return (
+        tuple(name for name in names if name not in relationships),
+        tuple(name for name in names if name in relationships),
+    )
+
+
+def parse_fieldset(
+    schema, model, fields: Optional[str], include: Optional[str]
+) -> Optional[Fieldset]:
+    """Fieldset z parametrów zapytania; None - pełna odpowiedź."""
+    if fields is None and include is None:
+        return None
+    columns, relations = schema_parts(schema, model)
+    chosen_columns = set(columns)
+    if fields is not None:
+        chosen_columns = set(_split(fields))
+        _check("fields", chosen_columns, columns)
+        chosen_columns.update(ALWAYS_INCLUDED)
+    chosen_relations = set(relations)
+    if include is not None:
+        chosen_relations = set(_split(include))
+        _check("include", chosen_relations, relations)
+    # Kolejność schematu - ten sam fieldset daje ten sam klucz cache
+    return Fieldset(
+        tuple(name for name in columns if name in chosen_columns),
+        tuple(name for name in relations if name in chosen_relations),
+    )
+
+
+def load_options(
+    model,
+    fieldset: Optional[Fieldset],
+    loaders: Mapping[str, object],
+    extra_columns: Sequence[str] = (),
+) -> list:
+    """
+    Opcje zapytania dla fieldsetu: ``loaders`` to opcje ładowania relacji
+    (nazwa -> np. ``selectinload``), ``extra_columns`` - kolumny potrzebne
+    poza odpowiedzią (kursor, Last-Modified).
+    """
+    if fieldset is None:
+        return list(loaders.values())
+    columns = dict.fromkeys(fieldset.columns + tuple(extra_columns))
+    options = [load_only(*(getattr(model, name) for name in columns), raiseload=True)]
+    for name, loader in loaders.items():
+        if name in fieldset.relations:
+            options.append(loader)
+        else:
+            options.append(raiseload(getattr(model, name)))
+    return options
@@ -0,0 +1,138 @@
+"""
+Pomniejszone warianty zdjęć (np. 320/800/1600 px w WebP) dla galerii.
+
+Skalowanie jest kosztowne dla CPU, więc wykonuje się w puli procesów,
+poza pętlą zdarzeń i poza GIL-em. Warianty zależą tylko od treści
+oryginału, dlatego są zapisywane pod nazwą wyprowadzoną z jego skrótu
+(``variants/ab/cd/<skrót>-<szerokość>.webp``) - ponowny upload tego samego
+zdjęcia nie generuje ich drugi raz.
+
+Pillow jest zależnością opcjonalną: bez niego zdjęcia są zapisywane
+jak dotąd, tylko bez wariantów.
+"""
+
+import asyncio
+import io
+import logging
+import multiprocessing
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Sequence
+
+from .config import settings
+from .storage import blob_path, sha256_of, write_atomically
+
+try:
+    from PIL import Image as PILImage
+    from PIL import ImageOps
+except ImportError:  # pragma: no cover - zależy od środowiska
+    PILImage = None
+
+logger = logging.getLogger(__name__)
+
+VARIANTS_SUBDIR = "variants"
+
+_DIGEST_RE = re.compile(r"^[0-9a-f]{64}$")
+
+_pool: Optional[ProcessPoolExecutor] = None
+
+
+def _source_digest(source_path: str) -> str:
+    stem = os.path.splitext(os.path.basename(source_path))[0]
+    if _DIGEST_RE.match(stem):
+        return stem
+    # Starsze pliki nie są nazwane skrótem - liczymy go z treści
+    with open(source_path, "rb") as source:
+        return sha256_of(source)
+
+
+def generate_variants(
+    source_path: str,
+    destination_dir: str,
+    widths: Sequence[int],
+    image_format: str = "WEBP",
+    quality: int = 80,
+) -> List[Dict]:
+    """
+    Tworzy warianty ``source_path`` o podanych szerokościach (bez powiększania).
+    Uruchamiane w procesie roboczym; zwraca opisy wariantów dla ``Image.variants``.
+    """
+    digest = _source_digest(source_path)
+    extension = "." + image_format.lower()
+    variants = []
+    with PILImage.open(source_path) as original:
+        image = ImageOps.exif_transpose(original)
+        if image.mode not in ("RGB", "RGBA"):
+            image = image.convert("RGBA" if "A" in image.getbands() else "RGB")
+
+        for width in sorted(set(widths)):
+            if width >= image.width:
+                continue
+            height = max(1, round(image.height * width / image.width))
+            path = blob_path(destination_dir, digest, f"-{width}{extension}")
+            if not os.path.exists(path):
+                buffer = io.BytesIO()
+                image.resize((width, height), PILImage.LANCZOS).save(
+                    buffer, image_format, quality=quality
+                )
+                buffer.seek(0)
+                write_atomically(buffer, os.path.dirname(path), os.path.basename(path))
+            variants.append({"width": width, "height": height, "file_path": path})
+    return variants
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    if _pool is None:
+        # Bez "fork" - kopia procesu z działającą pętlą zdarzeń i wątkami (pula
+        # wątków, połączenia SQLite) mogłaby odziedziczyć zajęte blokady.
+        # Serwer forkserver ma już zaimportowany ten moduł, więc start
+        # kolejnych procesów jest tani.
+        if "forkserver" in multiprocessing.get_all_start_methods():
+            context = multiprocessing.get_context("forkserver")
+            context.set_forkserver_preload([__name__])
+        else:
+            context = multiprocessing.get_context("spawn")
+        _pool = ProcessPoolExecutor(
+            max_workers=settings.image_workers, mp_context=context
+        )
+    return _pool
+
+
+def shutdown_pool() -> None:
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=True)
+        _pool = None
+
+
+async def create_variants(source_path: str, images_dir: str) -> List[Dict]:
+    """
+    Generuje warianty w puli procesów. Plik, którego Pillow nie potrafi
+    odczytać, po prostu nie dostaje wariantów.
+    """
+    if PILImage is None or not settings.image_variant_widths:
+        return []
+    loop = asyncio.get_running_loop()
+    try:
+        return await loop.run_in_executor(
+            _get_pool(),
+            generate_variants,
+            source_path,
+            os.path.join(images_dir, VARIANTS_SUBDIR),
+            tuple(settings.image_variant_widths),
+            settings.image_variant_format,
+            settings.image_variant_quality,
+        )
+    except Exception:
+        logger.warning("Could not create variants for %s", source_path, exc_info=True)
+        return []
+
+
+def remove_variants(variants: Optional[List[Dict]]) -> None:
+    for variant in variants or []:
+        try:
+            os.remove(variant["file_path"])
+        except FileNotFoundError:
+            pass
@@ -1,14 +1,73 @@
-from fastapi import FastAPI
+import asyncio
+from contextlib import asynccontextmanager, suppress
+
+from fastapi import Depends, FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 
-from .db.database import engine
+from .config import settings
+from .db.database import async_engine, engine
+from .db.migrations import migrate_technology_tags, upgrade_schema
+from .db.profiling import (
+    SERVER_TIMING_HEADER,
+    ServerTimingMiddleware,
+    SlowQueryMiddleware,
+)
+from .images import shutdown_pool
+from .metrics import MetricsMiddleware, instrument_engine, track_in_flight
 from .models import models
-from .routers import events, files, group_info, projects
+from .pagination import NEXT_CURSOR_HEADER, TOTAL_COUNT_HEADER
+from .profiler import ProfilerMiddleware
+from .publisher import publisher
+from .reconciler import run_periodically
+from .routers import (
+    admin,
+    events,
+    files,
+    group_info,
+    home,
+    projects,
+    search,
+    technologies,
+    uploads,
+)
 
+# create_all tworzy też indeks FTS5 (app.db.search, importowany przez routery)
 models.Base.metadata.create_all(bind=engine)
+upgrade_schema(engine)
+migrate_technology_tags(engine)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if settings.snapshot_enabled:
+        # Migawki mogą być nieaktualne po zmianach spoza aplikacji
+        publisher.schedule()
+    reconcile_task = None
+    if settings.reconcile_interval > 0:
+        reconcile_task = asyncio.create_task(
+            run_periodically(settings.reconcile_interval, settings.reconcile_remove)
+        )
+    purge_task = None
+    if settings.upload_purge_interval > 0:
+        purge_task = asyncio.create_task(
+            uploads.purge_periodically(settings.upload_purge_interval)
+        )
+    yield
+    for task in (reconcile_task, purge_task):
+        if task is not None:
+            task.cancel()
+            with suppress(asyncio.CancelledError):
+                await task
+    if settings.snapshot_enabled:
+        publisher.flush()
+    shutdown_pool()
+
 
-app = FastAPI()
+app = FastAPI(
+    lifespan=lifespan,
+    dependencies=[Depends(track_in_flight)] if settings.metrics_enabled else [],
+)
 
 origins = [
     "http://localhost",
@@ -22,12 +81,38 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[TOTAL_COUNT_HEADER, NEXT_CURSOR_HEADER, SERVER_TIMING_HEADER],
 )
 
+if settings.slow_query_threshold is not None:
+    app.add_middleware(SlowQueryMiddleware)
+
+if settings.server_timing:
+    app.add_middleware(ServerTimingMiddleware)
+
+if settings.metrics_enabled:
+    # Dodany po CORS, więc zewnętrzny - mierzy też odpowiedzi CORS i błędy
+    app.add_middleware(MetricsMiddleware)
+
+if settings.profiler_enabled:
+    # Najbardziej zewnętrzny - profil obejmuje też pozostałe middleware
+    app.add_middleware(ProfilerMiddleware, interval=settings.profiler_interval)
+
+if settings.metrics_enabled or settings.server_timing:
+    instrument_engine(engine)
+    if async_engine is not None:
+        instrument_engine(async_engine.sync_engine)
+
 app.include_router(events.router, prefix="/api")
 app.include_router(projects.router, prefix="/api")
 app.include_router(group_info.router, prefix="/api")
 app.include_router(files.router, prefix="/api")
+app.include_router(home.router, prefix="/api")
+app.include_router(admin.router, prefix="/api")
+app.include_router(uploads.router, prefix="/api")
+app.include_router(search.router, prefix="/api")
+app.include_router(technologies.router, prefix="/api")
+app.include_router(admin.metrics_router)
 
 app.mount("/static", StaticFiles(directory="static"), name="static")
 
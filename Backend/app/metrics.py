@@ -0,0 +1,310 @@
+"""
+Metryki HTTP i SQL w formacie tekstowym Prometheusa (``GET /metrics``).
+
+Dla każdej pary (metoda, szablon trasy) - np. ``/api/projects/{project_id}``,
+a nie surowa ścieżka, więc liczba serii jest ograniczona liczbą tras:
+
+* histogram czasu obsługi żądania,
+* liczba żądań w toku,
+* liczba odpowiedzi wg statusu i suma rozmiarów odpowiedzi,
+* liczba zapytań SQL i łączny czas SQL (zdarzenia silnika).
+
+Middleware jest czystym ASGI (bez ``BaseHTTPMiddleware``), a zapis wyniku
+żądania to jedna sekcja krytyczna na żądanie. Zapytania SQL są przypisywane
+do żądania przez ``contextvars`` - kontekst przechodzi do puli wątków
+i do ``AsyncSession.run_sync``, więc działa w obu trybach sesji.
+"""
+
+import bisect
+import contextvars
+import threading
+import time
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from fastapi import Request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# Domyślne progi histogramu Prometheusa (sekundy)
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+UNMATCHED_ROUTE = "<unmatched>"
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+_SCOPE_KEY = "metrics.in_flight"
+# Atrybut kontekstu wykonania - znika razem z nim, także gdy zapytanie rzuci
+_QUERY_START = "_metrics_query_start"
+
+RouteKey = Tuple[str, str]  # (metoda, szablon trasy)
+
+
+class SQLStats:
+    """Zapytania SQL jednego żądania (obiekt współdzielony z wątkami)."""
+
+    __slots__ = ("statements", "seconds", "scope")
+
+    def __init__(self, scope=None):
+        self.statements = 0
+        self.seconds = 0.0
+        self.scope = scope  # żądanie ASGI, do którego należą zapytania
+
+
+_current_sql: contextvars.ContextVar[Optional[SQLStats]] = contextvars.ContextVar(
+    "current_sql", default=None
+)
+
+
+def current_sql() -> Optional[SQLStats]:
+    """Statystyki SQL bieżącego żądania (None poza żądaniem)."""
+    return _current_sql.get()
+
+
+def track_sql(scope) -> Tuple[SQLStats, Optional[contextvars.Token]]:
+    """
+    Statystyki SQL żądania: istniejące (ustawione przez zewnętrzne
+    middleware tego samego żądania) albo nowe - wtedy zwraca też token.
+    """
+    sql = _current_sql.get()
+    if sql is not None and sql.scope is scope:
+        return sql, None
+    sql = SQLStats(scope)
+    return sql, _current_sql.set(sql)
+
+
+def untrack_sql(token: Optional[contextvars.Token]) -> None:
+    if token is not None:
+        _current_sql.reset(token)
+
+
+class _RouteStats:
+    __slots__ = (
+        "buckets",
+        "duration_sum",
+        "count",
+        "statuses",
+        "response_bytes",
+        "in_flight",
+        "sql_statements",
+        "sql_seconds",
+    )
+
+    def __init__(self, bucket_count: int):
+        self.buckets = [0] * (bucket_count + 1)  # ostatni: +Inf
+        self.duration_sum = 0.0
+        self.count = 0
+        self.statuses: Dict[int, int] = {}
+        self.response_bytes = 0
+        self.in_flight = 0
+        self.sql_statements = 0
+        self.sql_seconds = 0.0
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_bound(bound: float) -> str:
+    return repr(float(bound))
+
+
+class MetricsRegistry:
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.bounds = tuple(sorted(buckets))
+        self._lock = threading.Lock()
+        self._routes: Dict[RouteKey, _RouteStats] = {}
+
+    def _stats(self, key: RouteKey) -> _RouteStats:
+        stats = self._routes.get(key)
+        if stats is None:
+            stats = self._routes[key] = _RouteStats(len(self.bounds))
+        return stats
+
+    def started(self, key: RouteKey) -> None:
+        with self._lock:
+            self._stats(key).in_flight += 1
+
+    def finished(
+        self,
+        key: RouteKey,
+        status: int,
+        duration: float,
+        response_bytes: int,
+        sql: SQLStats,
+        in_flight_key: Optional[RouteKey] = None,
+    ) -> None:
+        bucket = bisect.bisect_left(self.bounds, duration)
+        with self._lock:
+            stats = self._stats(key)
+            stats.buckets[bucket] += 1
+            stats.duration_sum += duration
+            stats.count += 1
+            stats.statuses[status] = stats.statuses.get(status, 0) + 1
+            stats.response_bytes += response_bytes
+            stats.sql_statements += sql.statements
+            stats.sql_seconds += sql.seconds
+            if in_flight_key is not None:
+                self._stats(in_flight_key).in_flight -= 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._routes.clear()
+
+    def snapshot(self) -> Dict[RouteKey, _RouteStats]:
+        """Kopia liczników (bez trzymania blokady podczas formatowania)."""
+        with self._lock:
+            copies = {}
+            for key, stats in self._routes.items():
+                copy = _RouteStats(len(self.bounds))
+                for name in _RouteStats.__slots__:
+                    value = getattr(stats, name)
+                    setattr(
+                        copy, name, value.copy() if hasattr(value, "copy") else value
+                    )
+                copies[key] = copy
+            return copies
+
+    def render(self) -> str:
+        """Wszystkie metryki w formacie tekstowym Prometheusa."""
+        routes = sorted(self.snapshot().items())
+        lines: List[str] = []
+
+        def family(name: str, kind: str, help_text: str):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+
+        def labels(key: RouteKey, **extra) -> str:
+            pairs = [("method", key[0]), ("route", key[1]), *extra.items()]
+            return ",".join(f'{name}="{_escape(str(value))}"' for name, value in pairs)
+
+        family(
+            "http_request_duration_seconds",
+            "histogram",
+            "Czas obsługi żądania HTTP.",
+        )
+        for key, stats in routes:
+            if not stats.count:
+                continue
+            cumulative = 0
+            for bound, count in zip(self.bounds, stats.buckets):
+                cumulative += count
+                lines.append(
+                    f"http_request_duration_seconds_bucket"
+                    f"{{{labels(key, le=_format_bound(bound))}}} {cumulative}"
+                )
+            lines.append(
+                f'http_request_duration_seconds_bucket{{{labels(key, le="+Inf")}}}'
+                f" {stats.count}"
+            )
+            lines.append(
+                f"http_request_duration_seconds_sum{{{labels(key)}}} "
+                f"{stats.duration_sum}"
+            )
+            lines.append(
+                f"http_request_duration_seconds_count{{{labels(key)}}} {stats.count}"
+            )
+
+        family("http_requests_total", "counter", "Odpowiedzi HTTP wg statusu.")
+        for key, stats in routes:
+            for status, count in sorted(stats.statuses.items()):
+                lines.append(
+                    f"http_requests_total{{{labels(key, status=status)}}} {count}"
+                )
+
+        family("http_requests_in_flight", "gauge", "Żądania HTTP w toku.")
+        for key, stats in routes:
+            lines.append(f"http_requests_in_flight{{{labels(key)}}} {stats.in_flight}")
+
+        simple = (
+            ("http_response_size_bytes_total", "response_bytes", "Bajty odpowiedzi."),
+            ("db_statements_total", "sql_statements", "Zapytania SQL w żądaniach."),
+            ("db_statement_seconds_total", "sql_seconds", "Czas zapytań SQL."),
+        )
+        for name, attribute, help_text in simple:
+            family(name, "counter", help_text)
+            for key, stats in routes:
+                if stats.count:
+                    lines.append(f"{name}{{{labels(key)}}} {getattr(stats, attribute)}")
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+
+def route_template(scope) -> str:
+    """Szablon trasy dopasowanej przez router (po obsłużeniu żądania)."""
+    # FastAPI >= 0.13x: ścieżka z prefiksem include_router jest w kontekście trasy
+    context = (scope.get("fastapi") or {}).get("effective_route_context")
+    path = getattr(context, "path", None) or getattr(scope.get("route"), "path", None)
+    return path or UNMATCHED_ROUTE
+
+
+async def track_in_flight(request: Request) -> None:
+    """
+    Zależność globalna aplikacji: trasa jest znana dopiero po dopasowaniu,
+    więc licznik "w toku" dla trasy podbija się tutaj, a zmniejsza middleware.
+    """
+    scope = request.scope
+    if _SCOPE_KEY not in scope and "metrics.started" in scope:
+        key = (scope["method"], route_template(scope))
+        scope[_SCOPE_KEY] = key
+        registry.started(key)
+
+
+class MetricsMiddleware:
+    def __init__(self, app, registry: MetricsRegistry = registry):
+        self.app = app
+        self.registry = registry
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        sql, token = track_sql(scope)
+        scope["metrics.started"] = True
+        status = 500
+        response_bytes = 0
+
+        async def send_wrapper(message):
+            nonlocal status, response_bytes
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            elif message["type"] == "http.response.body":
+                response_bytes += len(message.get("body", b""))
+            await send(message)
+
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            duration = time.perf_counter() - start
+            untrack_sql(token)
+            self.registry.finished(
+                (scope["method"], route_template(scope)),
+                status,
+                duration,
+                response_bytes,
+                sql,
+                scope.get(_SCOPE_KEY),
+            )
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, many):
+    if _current_sql.get() is not None:
+        setattr(context, _QUERY_START, time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, many):
+    sql = _current_sql.get()
+    start = getattr(context, _QUERY_START, None)
+    if sql is None or start is None:
+        return
+    sql.statements += 1
+    sql.seconds += time.perf_counter() - start
+
+
+def instrument_engine(engine: Engine) -> None:
+    """Liczy zapytania SQL silnika w bieżącym żądaniu (idempotentne)."""
+    if not event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", _after_cursor_execute)
@@ -1,12 +1,33 @@
 import enum
+import re
+from collections import Counter
+from datetime import datetime, timezone
+from itertools import chain
+from typing import List
 
-from sqlalchemy import Column, DateTime, ForeignKey, Integer, String
+from sqlalchemy import (
+    JSON,
+    Column,
+    DateTime,
+    ForeignKey,
+    Index,
+    Integer,
+    String,
+    Table,
+    inspect,
+)
 from sqlalchemy import Enum as SAEnum
-from sqlalchemy.orm import relationship
+from sqlalchemy import event, update
+from sqlalchemy.orm import Session, relationship
 
 from ..db.database import Base
 
 
+def utcnow() -> datetime:
+    # SQLite nie przechowuje strefy - trzymamy naiwny czas UTC
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
 class Platforms(str, enum.Enum):
     WIN = "Windows"
     LINUX = "Linux"
@@ -20,8 +41,34 @@ class Event(Base):
     name = Column(String, index=True)
     date = Column(DateTime)
     description = Column(String)
+    updated_at = Column(DateTime, default=utcnow, onupdate=utcnow)
+
+    # Zdjęcia znikają razem z wydarzeniem (pliki zwalnia router po commicie)
+    images = relationship("Image", back_populates="event", cascade="all, delete-orphan")
+
+    # Paginacja kursorowa sortuje po (date, id)
+    __table_args__ = (Index("ix_events_date_id", "date", "id"),)
+
+
+project_technologies = Table(
+    "project_technologies",
+    Base.metadata,
+    Column("project_id", ForeignKey("projects.id"), primary_key=True),
+    Column("technology_id", ForeignKey("technologies.id"), primary_key=True),
+    # Filtr "projekty z technologią X" idzie od strony technologii
+    Index("ix_project_technologies_technology", "technology_id", "project_id"),
+)
+
+
+class Technology(Base):
+    """Znormalizowany tag technologii; ``project_count`` aktualizowany przy zapisie."""
 
-    images = relationship("Image", back_populates="event")
+    __tablename__ = "technologies"
+
+    id = Column(Integer, primary_key=True)
+    # NOCASE: "python" i "Python" to ten sam tag (także w indeksie)
+    name = Column(String(collation="NOCASE"), unique=True, nullable=False)
+    project_count = Column(Integer, nullable=False, default=0)
 
 
 class Project(Base):
@@ -31,11 +78,21 @@ class Project(Base):
     name = Column(String, index=True)
     description = Column(String)
     technologies = Column(String)
-    year = Column(Integer, nullable=True)
+    year = Column(Integer, nullable=True, index=True)
+    updated_at = Column(DateTime, default=utcnow, onupdate=utcnow)
 
-    images = relationship("Image", back_populates="project")
-    executable = relationship("ExecutableFile", back_populates="project")
-    files = relationship("ProjectFiles", back_populates="project")
+    images = relationship(
+        "Image", back_populates="project", cascade="all, delete-orphan"
+    )
+    executable = relationship(
+        "ExecutableFile", back_populates="project", cascade="all, delete-orphan"
+    )
+    files = relationship(
+        "ProjectFiles", back_populates="project", cascade="all, delete-orphan"
+    )
+    # Wyprowadzane z ``technologies`` przy każdym zapisie (patrz _sync_tags)
+    # Bez relacji zwrotnej - lista projektów taga rosłaby przy każdym imporcie
+    tags = relationship("Technology", secondary=project_technologies)
 
 
 class Image(Base):
@@ -43,8 +100,11 @@ class Image(Base):
 
     id = Column(Integer, primary_key=True, index=True)
     file_path = Column(String, index=True)
-    event_id = Column(Integer, ForeignKey("events.id"), nullable=True)
-    project_id = Column(Integer, ForeignKey("projects.id"), nullable=True)
+    # Pomniejszone wersje: [{"width": ..., "height": ..., "file_path": ...}]
+    variants = Column(JSON, nullable=True)
+    # Indeksy FK - ładowanie zdjęć wydarzenia/projektu bez skanu całej tabeli
+    event_id = Column(Integer, ForeignKey("events.id"), nullable=True, index=True)
+    project_id = Column(Integer, ForeignKey("projects.id"), nullable=True, index=True)
 
     event = relationship("Event", back_populates="images")
     project = relationship("Project", back_populates="images")
@@ -57,6 +117,7 @@ class GroupInfo(Base):
     name = Column(String, index=True)
     description = Column(String)
     contact = Column(String)
+    updated_at = Column(DateTime, default=utcnow, onupdate=utcnow)
 
 
 class ExecutableFile(Base):
@@ -64,9 +125,11 @@ class ExecutableFile(Base):
 
     id = Column(Integer, primary_key=True, index=True)
     file_path = Column(String, index=True)
+    # Oryginalna nazwa pliku (na dysku plik nazywa się skrótem SHA-256)
+    file_name = Column(String, nullable=True)
     version = Column(String)
     platform = Column(SAEnum(Platforms))
-    project_id = Column(Integer, ForeignKey("projects.id"))
+    project_id = Column(Integer, ForeignKey("projects.id"), index=True)
 
     project = relationship("Project", back_populates="executable")
 
@@ -76,6 +139,125 @@ class ProjectFiles(Base):
 
     id = Column(Integer, primary_key=True, index=True)
     file_path = Column(String, index=True)
-    project_id = Column(Integer, ForeignKey("projects.id"))
+    file_name = Column(String, nullable=True)
+    project_id = Column(Integer, ForeignKey("projects.id"), index=True)
 
     project = relationship("Project", back_populates="files")
+
+
+class UploadKind(str, enum.Enum):
+    EXECUTABLE = "executable"
+    PROJECT_FILE = "project_file"
+
+
+class UploadSession(Base):
+    """Przesyłanie pliku w kawałkach, które można wznowić po przerwaniu."""
+
+    __tablename__ = "upload_sessions"
+
+    id = Column(String, primary_key=True)
+    kind = Column(SAEnum(UploadKind))
+    file_name = Column(String)
+    total_size = Column(Integer)
+    received = Column(Integer, default=0)
+    project_id = Column(Integer, ForeignKey("projects.id"))
+    version = Column(String, nullable=True)
+    platform = Column(String, nullable=True)
+    created_at = Column(DateTime, default=utcnow)
+    expires_at = Column(DateTime, index=True)
+
+
+@event.listens_for(Session, "before_flush")
+def _touch_parents(session, flush_context, instances):
+    """
+    Zmiana zdjęć lub plików zmienia też odpowiedź dla wydarzenia/projektu,
+    więc podbijamy ``updated_at`` rodzica (Last-Modified w odpowiedziach).
+    """
+    event_ids, project_ids = set(), set()
+    for obj in chain(session.new, session.dirty, session.deleted):
+        if isinstance(obj, Image):
+            event_ids.add(obj.event_id)
+            project_ids.add(obj.project_id)
+        elif isinstance(obj, (ExecutableFile, ProjectFiles)):
+            project_ids.add(obj.project_id)
+    event_ids.discard(None)
+    project_ids.discard(None)
+
+    now = utcnow()
+    if event_ids:
+        session.execute(
+            update(Event).where(Event.id.in_(event_ids)).values(updated_at=now)
+        )
+    if project_ids:
+        session.execute(
+            update(Project).where(Project.id.in_(project_ids)).values(updated_at=now)
+        )
+
+
+_TAG_SEPARATORS = re.compile(r"[,;\n]")
+
+
+def parse_technologies(technologies) -> List[str]:
+    """``"Python, FastAPI,python"`` -> ``["Python", "FastAPI"]``."""
+    names, seen = [], set()
+    for part in _TAG_SEPARATORS.split(technologies or ""):
+        name = " ".join(part.split())
+        if name and name.lower() not in seen:
+            seen.add(name.lower())
+            names.append(name)
+    return names
+
+
+@event.listens_for(Session, "before_flush")
+def _sync_tags(session, flush_context, instances):
+    """
+    Utrzymuje tagi projektów zgodne z polem ``technologies`` i przyrostowo
+    poprawia ``Technology.project_count`` (bez GROUP BY przy odczycie).
+    """
+    changed = [obj for obj in session.new if isinstance(obj, Project)]
+    changed += [
+        obj
+        for obj in session.dirty
+        if isinstance(obj, Project)
+        and inspect(obj).attrs.technologies.history.has_changes()
+    ]
+    deleted = [obj for obj in session.deleted if isinstance(obj, Project)]
+    if not changed and not deleted:
+        return
+
+    deltas = Counter()
+    with session.no_autoflush:
+        wanted = {obj: parse_technologies(obj.technologies) for obj in changed}
+        names = {name.lower() for tags in wanted.values() for name in tags}
+        existing = {}
+        if names:
+            for tag in session.query(Technology).filter(Technology.name.in_(names)):
+                existing[tag.name.lower()] = tag
+
+        for obj, tag_names in wanted.items():
+            current = {tag.name.lower(): tag for tag in obj.tags}
+            for name in tag_names:
+                if name.lower() in current:
+                    continue
+                tag = existing.get(name.lower())
+                if tag is None:
+                    tag = existing[name.lower()] = Technology(name=name)
+                    session.add(tag)
+                obj.tags.append(tag)
+                deltas[tag] += 1
+            kept = {name.lower() for name in tag_names}
+            for key, tag in current.items():
+                if key not in kept:
+                    obj.tags.remove(tag)
+                    deltas[tag] -= 1
+
+        for obj in deleted:
+            for tag in obj.tags:
+                deltas[tag] -= 1
+
+    for tag, delta in deltas.items():
+        if inspect(tag).pending:
+            tag.project_count = (tag.project_count or 0) + delta
+        elif delta:
+            # Wyrażenie SQL - odporne na równoległe zapisy innych projektów
+            tag.project_count = Technology.project_count + delta
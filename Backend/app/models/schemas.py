@@ -1,8 +1,8 @@
 from datetime import datetime
 from enum import Enum
-from typing import List, Optional
+from typing import Any, Dict, List, Optional
 
-from pydantic import BaseModel, ConfigDict
+from pydantic import BaseModel, ConfigDict, Field, field_validator
 from sqlalchemy.ext.declarative import ConcreteBase
 
 # 1. Definicja Enuma (musi być identyczna jak w models.py lub zaimportowana)
@@ -27,6 +27,7 @@ class ProjectFilesCreate(ProjectFilesBase):
 
 class ProjectFiles(ProjectFilesBase):
     id: int
+    file_name: Optional[str] = None
     project_id: Optional[int] = None
     model_config = ConfigDict(from_attributes=True)
 
@@ -46,13 +47,49 @@ class ExecutableFileCreate(ExecutableFileBase):
 
 class ExecutableFile(ExecutableFileBase):
     id: int
+    file_name: Optional[str] = None
     project_id: Optional[int] = None
     model_config = ConfigDict(from_attributes=True)
 
 
+# --- SCHEMATY DLA PRZESYŁANIA W KAWAŁKACH ---
+
+
+class UploadKind(str, Enum):
+    EXECUTABLE = "executable"
+    PROJECT_FILE = "project_file"
+
+
+class UploadSessionCreate(BaseModel):
+    kind: UploadKind
+    file_name: str
+    total_size: int = Field(ge=0)
+    project_id: int
+    # Wymagane tylko dla kind == "executable"
+    version: Optional[str] = None
+    platform: Optional[str] = None
+
+
+class UploadSession(BaseModel):
+    id: str
+    kind: UploadKind
+    file_name: str
+    total_size: int
+    received: int
+    project_id: int
+    expires_at: datetime
+    model_config = ConfigDict(from_attributes=True)
+
+
 # --- SCHEMATY DLA ZDJĘĆ ---
 
 
+class ImageVariant(BaseModel):
+    width: int
+    height: int
+    file_path: str
+
+
 class ImageBase(BaseModel):
     file_path: str
     # Usunięto id z Base - przy tworzeniu (Create) jeszcze go nie mamy
@@ -66,8 +103,23 @@ class Image(ImageBase):
     id: int
     event_id: Optional[int] = None
     project_id: Optional[int] = None
+    # Warianty od najmniejszego - klient wybiera rozmiar (np. przez srcset)
+    variants: List[ImageVariant] = []
     model_config = ConfigDict(from_attributes=True)
 
+    @field_validator("variants", mode="before")
+    @classmethod
+    def variants_or_empty(cls, value):
+        return value or []
+
+
+class ImageUploadResult(BaseModel):
+    # Wynik dla jednego pliku z /admin/upload_images/ (w kolejności przesłania)
+    index: int
+    file_name: str
+    image: Optional[Image] = None
+    error: Optional[str] = None
+
 
 # --- SCHEMATY DLA EVENTÓW ---
 
@@ -82,6 +134,10 @@ class EventCreate(EventBase):
     pass
 
 
+class EventBatchUpdate(EventCreate):
+    id: int
+
+
 class Event(EventBase):
     id: int
     # Domyślnie pusta lista, jeśli nie ma zdjęć
@@ -103,6 +159,10 @@ class ProjectCreate(ProjectBase):
     pass
 
 
+class ProjectBatchUpdate(ProjectCreate):
+    id: int
+
+
 class Project(ProjectBase):
     id: int
     # Pełna struktura projektu wraz z powiązanymi obiektami
@@ -128,3 +188,58 @@ class GroupInfoCreate(GroupInfoBase):
 class GroupInfo(GroupInfoBase):
     id: int
     model_config = ConfigDict(from_attributes=True)
+
+
+# --- SCHEMAT STRONY GŁÓWNEJ ---
+
+
+class Home(BaseModel):
+    # Wszystkie sekcje strony publicznej w jednej odpowiedzi
+    projects: List[Project] = []
+    events: List[Event] = []
+    about: Optional[GroupInfo] = None
+
+
+# --- SCHEMATY OPERACJI ZBIORCZYCH ---
+
+
+class BatchStatus(str, Enum):
+    CREATED = "created"
+    UPDATED = "updated"
+    DELETED = "deleted"
+    NOT_FOUND = "not_found"
+    INVALID = "invalid"
+
+
+class BatchItemResult(BaseModel):
+    # Pozycja elementu w przesłanej tablicy
+    index: int
+    status: BatchStatus
+    id: Optional[int] = None
+    errors: Optional[List[Dict[str, Any]]] = None
+
+
+# --- SCHEMAT TAGÓW TECHNOLOGII ---
+
+
+class Technology(BaseModel):
+    name: str
+    project_count: int
+    model_config = ConfigDict(from_attributes=True)
+
+
+# --- SCHEMAT WYNIKÓW WYSZUKIWANIA ---
+
+
+class SearchKind(str, Enum):
+    PROJECT = "project"
+    EVENT = "event"
+
+
+class SearchResult(BaseModel):
+    kind: SearchKind
+    id: int
+    name: Optional[str] = None
+    # Fragment z dopasowaniem otoczonym <mark>...</mark>
+    snippet: str
+    score: float
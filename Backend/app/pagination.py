@@ -0,0 +1,143 @@
+"""
+Paginacja kursorowa (keyset) i tanie liczniki wierszy dla list publicznych.
+
+Kursor to zakodowana w base64 krotka wartości kolumn sortowania ostatniego
+elementu strony. Kolejna strona zaczyna się od ``WHERE (kolumny) > (kursor)``,
+więc korzysta z indeksu i kosztuje tyle samo co pierwsza - w przeciwieństwie
+do ``OFFSET``, który SQLite musi przewinąć wiersz po wierszu.
+"""
+
+import base64
+import binascii
+import json
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from fastapi import HTTPException
+from sqlalchemy import and_, false, func, or_
+from sqlalchemy.orm import Query, Session
+
+from .db import versioning
+
+# Nagłówki odpowiedzi list (widoczne też dla frontendu - patrz CORS w main.py)
+TOTAL_COUNT_HEADER = "X-Total-Count"
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+_count_cache: Dict[str, Tuple[Tuple[int, ...], int]] = {}
+
+
+def _to_json(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    raw = json.dumps([_to_json(v) for v in values], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, types: Sequence[Callable[[Any], Any]]) -> List[Any]:
+    """Dekoduje kursor; ``types`` konwertuje kolejne wartości z JSON-a."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if not isinstance(values, list) or len(values) != len(types):
+            raise ValueError("cursor length mismatch")
+        return [
+            None if value is None else convert(value)
+            for convert, value in zip(types, values)
+        ]
+    except (ValueError, TypeError, binascii.Error):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def parse_sort(sort: str) -> Tuple[str, bool]:
+    """``"-year"`` -> ``("year", True)`` (malejąco)."""
+    return sort.lstrip("-"), sort.startswith("-")
+
+
+def _after_cursor(columns: Sequence[Any], values: Sequence[Any], descending: bool):
+    """
+    Warunek "wiersz leży za kursorem" w kolejności sortowania SQLite,
+    w której NULL jest najmniejszą wartością (pierwszy rosnąco, ostatni
+    malejąco). Postać rozwinięta ``a > x OR (a = x AND b > y)`` zamiast
+    porównania krotek, bo krotka z NULL-em nie pasuje do niczego.
+    """
+    clauses = []
+    for i, (column, value) in enumerate(zip(columns, values)):
+        nullable = getattr(column.expression, "nullable", True)
+        if value is None:
+            if descending:
+                continue  # za NULL-em nie ma już nic mniejszego
+            beyond = column.is_not(None)
+        elif descending:
+            beyond = column < value
+            if nullable:
+                beyond = or_(beyond, column.is_(None))
+        else:
+            beyond = column > value
+        equal = [
+            c.is_(None) if v is None else c == v
+            for c, v in zip(columns[:i], values[:i])
+        ]
+        clauses.append(and_(*equal, beyond))
+    if not clauses:
+        return false()
+    return or_(*clauses)
+
+
+def paginate(
+    query: Query,
+    columns: Sequence[Any],
+    cursor_types: Sequence[Callable[[Any], Any]],
+    skip: int,
+    limit: int,
+    cursor: Optional[str] = None,
+    descending: bool = False,
+) -> Tuple[list, Optional[str]]:
+    """
+    Zwraca (wiersze, następny_kursor) posortowane po ``columns``
+    (rosnąco albo - przy ``descending`` - malejąco).
+
+    Ostatnia kolumna musi być unikalna (klucz główny), aby kolejność była
+    jednoznaczna. Gdy podano ``cursor``, ``skip`` jest ignorowany.
+    """
+    if descending:
+        query = query.order_by(*(column.desc() for column in columns))
+    else:
+        query = query.order_by(*columns)
+    if cursor is not None:
+        values = decode_cursor(cursor, cursor_types)
+        query = query.filter(_after_cursor(columns, values, descending))
+    else:
+        query = query.offset(skip)
+
+    rows = query.limit(limit).all()
+    next_cursor = None
+    if limit > 0 and len(rows) == limit:
+        last = rows[-1]
+        next_cursor = encode_cursor([getattr(last, col.key) for col in columns])
+    return rows, next_cursor
+
+
+def cached_count(db: Session, model, *criteria) -> int:
+    """
+    ``COUNT(*)`` tabeli liczony ponownie tylko po zmianie jej zawartości.
+    Z filtrami (``criteria``) liczony zawsze - całą odpowiedź i tak chroni
+    pamięć podręczna odpowiedzi.
+    """
+    if criteria:
+        return db.query(func.count(model.id)).filter(*criteria).scalar() or 0
+    table = model.__tablename__
+    version = versioning.get_versions(table)
+    cached = _count_cache.get(table)
+    if cached is not None and cached[0] == version:
+        return cached[1]
+    total = db.query(func.count(model.id)).scalar() or 0
+    _count_cache[table] = (version, total)
+    return total
+
+
+def clear_count_cache() -> None:
+    _count_cache.clear()
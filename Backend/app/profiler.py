@@ -0,0 +1,269 @@
+"""
+Profilowanie pojedynczego żądania na życzenie administratora.
+
+Żądanie z nagłówkiem ``X-Profile: 1`` (albo parametrem ``?_profile=1``)
+i poprawnym ``X-API-Key`` jest wykonywane pod profilerem próbkującym,
+a zamiast odpowiedzi endpointu wraca profil w formacie speedscope
+(https://www.speedscope.app - wystarczy przeciągnąć plik). Profil obejmuje
+całą obsługę żądania: routing, zależności, ORM i serializację Pydantic.
+
+Profiler co ``settings.profiler_interval`` sekund zapisuje stosy wątku pętli
+zdarzeń, który obsługuje żądanie, oraz wątków roboczych w trakcie wykonywania
+kodu tego żądania (sesja synchroniczna działa w puli wątków - patrz
+``sampled_in_thread``). Wątek pętli czekający na wynik jest oznaczany ramką
+``[idle]``. Pozostałe żądania płacą tylko za sprawdzenie nagłówków.
+"""
+
+import asyncio
+import contextvars
+import functools
+import json
+import sys
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+from starlette.responses import JSONResponse, Response
+
+from . import dependencies
+
+PROFILE_HEADER = b"x-profile"
+PROFILE_QUERY = "_profile"
+SPEEDSCOPE_SCHEMA = "https://www.speedscope.app/file-format-schema.json"
+
+IDLE_FRAME = "[idle]"
+_FALSE_VALUES = {"", "0", "false", "no"}
+# Wątek czekający w tych modułach (select, kolejka zadań) nic nie wykonuje
+_IDLE_MODULES = ("selectors.py", "threading.py", "queue.py")
+
+FrameKey = Tuple[str, str, int]  # (nazwa, plik, linia)
+
+# Wątek profilera dostaje GIL co sys.getswitchinterval() (domyślnie 5 ms),
+# więc na czas profilowania interwał przełączania jest skracany (i zawsze
+# przywracany w Sampler.stop)
+_switch_lock = threading.Lock()
+_active_samplers = 0
+_saved_switch_interval = 0.0
+
+
+def _enter_sampling(interval: float) -> None:
+    global _active_samplers, _saved_switch_interval
+    with _switch_lock:
+        if _active_samplers == 0:
+            _saved_switch_interval = sys.getswitchinterval()
+            sys.setswitchinterval(min(interval, _saved_switch_interval))
+        _active_samplers += 1
+
+
+def _exit_sampling() -> None:
+    global _active_samplers
+    with _switch_lock:
+        _active_samplers -= 1
+        if _active_samplers == 0:
+            sys.setswitchinterval(_saved_switch_interval)
+
+
+# Profiler bieżącego żądania - kontekst jest kopiowany do puli wątków
+_current_sampler: contextvars.ContextVar[Optional["Sampler"]] = contextvars.ContextVar(
+    "current_sampler", default=None
+)
+
+
+def sampled_in_thread(fn: Callable) -> Callable:
+    """
+    ``fn`` do uruchomienia w puli wątków: jeśli bieżące żądanie jest
+    profilowane, wątek jest próbkowany na czas wywołania.
+    """
+    sampler = _current_sampler.get()
+    if sampler is None:
+        return fn
+
+    @functools.wraps(fn)
+    def run(*args, **kwargs):
+        thread_id = threading.get_ident()
+        sampler.workers.add(thread_id)
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            sampler.workers.discard(thread_id)
+
+    return run
+
+
+def _header(scope, name: bytes) -> Optional[str]:
+    for key, value in scope.get("headers", ()):
+        if key == name:
+            return value.decode("latin-1")
+    return None
+
+
+def _query_flag(scope) -> Optional[str]:
+    query = scope.get("query_string", b"").decode("latin-1")
+    if PROFILE_QUERY not in query:
+        return None
+    for pair in query.split("&"):
+        key, _, value = pair.partition("=")
+        if key == PROFILE_QUERY:
+            return value or "1"
+    return None
+
+
+def profile_requested(scope) -> bool:
+    value = _header(scope, PROFILE_HEADER)
+    if value is None:
+        value = _query_flag(scope)
+    return value is not None and value.lower() not in _FALSE_VALUES
+
+
+class Sampler:
+    """Próbkuje stosy wątku pętli i wątków roboczych z ``workers``."""
+
+    def __init__(self, loop_thread: int, interval: float = 0.001):
+        self.loop_thread = loop_thread
+        self.interval = interval
+        self.workers: Set[int] = set()
+        self.frames: List[FrameKey] = []
+        self._frame_index: Dict[FrameKey, int] = {}
+        # wątek -> (próbki jako indeksy ramek od korzenia, wagi w sekundach)
+        self.samples: Dict[int, Tuple[List[List[int]], List[float]]] = {}
+        self.duration = 0.0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(
+            target=self._run, name="request-profiler", daemon=True
+        )
+
+    def start(self) -> None:
+        _enter_sampling(self.interval)
+        self._started = time.perf_counter()
+        try:
+            self._thread.start()
+        except BaseException:
+            _exit_sampling()
+            raise
+
+    def stop(self) -> None:
+        """Kończy próbkowanie (blokuje do zakończenia wątku profilera)."""
+        try:
+            self._stop.set()
+            self._thread.join()
+        finally:
+            _exit_sampling()
+            self.duration = time.perf_counter() - self._started
+
+    def _run(self) -> None:
+        last = time.perf_counter()
+        while not self._stop.wait(self.interval):
+            now = time.perf_counter()
+            weight, last = now - last, now
+            frames = sys._current_frames()
+            for thread_id in (self.loop_thread, *list(self.workers)):
+                frame = frames.get(thread_id)
+                if frame is not None:
+                    self._record(thread_id, frame, weight)
+
+    def _intern(self, key: FrameKey) -> int:
+        index = self._frame_index.get(key)
+        if index is None:
+            index = self._frame_index[key] = len(self.frames)
+            self.frames.append(key)
+        return index
+
+    def _record(self, thread_id: int, frame, weight: float) -> None:
+        idle = frame.f_code.co_filename.endswith(_IDLE_MODULES)
+        stack = []
+        while frame is not None:
+            code = frame.f_code
+            name = getattr(code, "co_qualname", code.co_name)  # 3.11+
+            stack.append(self._intern((name, code.co_filename, code.co_firstlineno)))
+            frame = frame.f_back
+        stack.reverse()
+        if idle:
+            stack.append(self._intern((IDLE_FRAME, "", 0)))
+        samples, weights = self.samples.setdefault(thread_id, ([], []))
+        samples.append(stack)
+        weights.append(weight)
+
+    def speedscope(self, name: str) -> dict:
+        """Profil w formacie speedscope - osobny profil dla każdego wątku."""
+        names = {thread.ident: thread.name for thread in threading.enumerate()}
+        thread_ids = sorted(self.samples, key=lambda t: t != self.loop_thread)
+        profiles = []
+        for thread_id in thread_ids:
+            samples, weights = self.samples[thread_id]
+            label = "event loop" if thread_id == self.loop_thread else "worker"
+            profiles.append(
+                {
+                    "type": "sampled",
+                    "name": f"{label}: {names.get(thread_id, thread_id)}",
+                    "unit": "seconds",
+                    "startValue": 0,
+                    "endValue": sum(weights),
+                    "samples": samples,
+                    "weights": weights,
+                }
+            )
+        return {
+            "$schema": SPEEDSCOPE_SCHEMA,
+            "name": name,
+            "exporter": "app.profiler",
+            "activeProfileIndex": 0,
+            "shared": {
+                "frames": [
+                    {"name": fn, "file": file, "line": line} if file else {"name": fn}
+                    for fn, file, line in self.frames
+                ]
+            },
+            "profiles": profiles,
+        }
+
+
+class ProfilerMiddleware:
+    def __init__(self, app, interval: float = 0.001):
+        self.app = app
+        self.interval = interval
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not profile_requested(scope):
+            await self.app(scope, receive, send)
+            return
+
+        if not dependencies.is_valid_api_key(_header(scope, b"x-api-key")):
+            response = JSONResponse({"detail": "Invalid API Key"}, status_code=401)
+            await response(scope, receive, send)
+            return
+
+        status = 500
+
+        async def capture(message):
+            # Odpowiedź endpointu jest pomijana - zwracamy profil
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+
+        sampler = Sampler(threading.get_ident(), self.interval)
+        error = None
+        sampler.start()
+        token = _current_sampler.set(sampler)
+        try:
+            await self.app(scope, receive, capture)
+        except Exception as exc:
+            error = exc
+        finally:
+            _current_sampler.reset(token)
+            # join poza pętlą zdarzeń - nie wstrzymuje innych żądań
+            await asyncio.get_running_loop().run_in_executor(None, sampler.stop)
+
+        name = f"{scope['method']} {scope['path']} -> {status}"
+        if error is not None:
+            name += f" ({type(error).__name__}: {error})"
+        body = json.dumps(sampler.speedscope(name), separators=(",", ":"))
+        response = Response(
+            body,
+            media_type="application/json",
+            headers={
+                "Content-Disposition": 'attachment; filename="profile.speedscope.json"',
+                "X-Profiled-Status": str(status),
+                "X-Profiled-Duration": f"{sampler.duration:.6f}",
+            },
+        )
+        await response(scope, receive, send)
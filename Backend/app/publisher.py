@@ -0,0 +1,202 @@
+"""
+Statyczne migawki JSON treści publicznej: projekty, wydarzenia, info o grupie.
+
+Pliki (``projects.json``, ``events.json``, ``about.json``,
+``technologies.json``, ``home.json`` oraz ich wersje ``.gz``) trafiają do
+``settings.snapshot_dir`` i mogą być serwowane bezpośrednio przez nginx
+(``gzip_static on``) - bez udziału Pythona i SQLite. Endpointy ``/api``
+pozostają źródłem aktualnych danych.
+
+Publikacja uruchamia się po commicie zmieniającym tabele publiczne, ale
+z opóźnieniem (``snapshot_debounce``) - seria zapisów administratora daje
+jedną publikację. Przy ciągłych zapisach publikacja nie jest odkładana
+dłużej niż ``snapshot_max_delay`` od pierwszej oczekującej zmiany. Każdy plik jest podmieniany atomowo, a niezmienione pliki
+nie są zapisywane ponownie (stabilne ETagi po stronie nginx).
+
+Uruchomienie ręczne (z katalogu Backend):
+    python -m app.publisher [--output KATALOG]
+"""
+
+import argparse
+import gzip
+import io
+import logging
+import os
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Set
+
+from pydantic import TypeAdapter
+from sqlalchemy.orm import Session, selectinload
+
+from .cache import dump_json
+from .config import settings
+from .db import versioning
+from .db.database import SessionLocal
+from .models import models, schemas
+from .routers import group_info, home, projects, technologies
+from .serialization import OrmSerializer
+from .storage import write_atomically
+
+logger = logging.getLogger(__name__)
+
+# Zmiana w którejkolwiek z tych tabel wymaga nowych migawek
+PUBLIC_TABLES = frozenset(home.HOME_TABLES + technologies.TECHNOLOGY_TABLES)
+
+_projects_serializer = OrmSerializer(schemas.Project, many=True)
+_events_serializer = OrmSerializer(schemas.Event, many=True)
+_group_info_adapter = TypeAdapter(schemas.GroupInfo)
+_technologies_adapter = TypeAdapter(List[schemas.Technology])
+
+
+def build_snapshots(db: Session) -> Dict[str, bytes]:
+    """Zserializowana treść publiczna: nazwa pliku -> JSON (wszystkie wiersze)."""
+    all_projects = (
+        db.query(models.Project)
+        .options(*projects.PROJECT_LOAD_OPTIONS)
+        .order_by(models.Project.id)
+        .all()
+    )
+    all_events = (
+        db.query(models.Event)
+        .options(selectinload(models.Event.images))
+        .order_by(models.Event.date, models.Event.id)
+        .all()
+    )
+    about = group_info.get_group_info(db)
+
+    projects_body = _projects_serializer.dump_json(all_projects)
+    events_body = _events_serializer.dump_json(all_events)
+    about_body = dump_json(_group_info_adapter, about) if about is not None else b"null"
+    return {
+        "projects.json": projects_body,
+        "events.json": events_body,
+        "about.json": about_body,
+        "technologies.json": dump_json(
+            _technologies_adapter, technologies.list_technologies(db)
+        ),
+        "home.json": b"".join(
+            (
+                b'{"projects":',
+                projects_body,
+                b',"events":',
+                events_body,
+                b',"about":',
+                about_body,
+                b"}",
+            )
+        ),
+    }
+
+
+def write_snapshot(directory: str, name: str, body: bytes) -> bool:
+    """Zapisuje ``name`` i ``name.gz``; False, gdy treść się nie zmieniła."""
+    path = os.path.join(directory, name)
+    try:
+        with open(path, "rb") as current:
+            if current.read() == body:
+                return False
+    except FileNotFoundError:
+        pass
+    # mtime=0 - ten sam JSON daje bajt w bajt ten sam plik .gz
+    compressed = gzip.compress(body, compresslevel=9, mtime=0)
+    write_atomically(io.BytesIO(compressed), directory, name + ".gz")
+    write_atomically(io.BytesIO(body), directory, name)
+    return True
+
+
+def publish(db: Optional[Session] = None, directory: Optional[str] = None) -> List[str]:
+    """Publikuje migawki; zwraca nazwy plików, które się zmieniły."""
+    directory = directory or settings.snapshot_dir
+    if db is None:
+        with SessionLocal() as session:
+            snapshots = build_snapshots(session)
+    else:
+        snapshots = build_snapshots(db)
+    return [
+        name
+        for name, body in snapshots.items()
+        if write_snapshot(directory, name, body)
+    ]
+
+
+class SnapshotPublisher:
+    """
+    Odkłada publikację o ``delay`` sekund od ostatniego ``schedule()``, ale
+    najwyżej o ``max_delay`` sekund od pierwszego oczekującego ``schedule()``.
+    Publikacja działa we własnym wątku z własną sesją bazy.
+    """
+
+    def __init__(
+        self,
+        publish_fn: Callable[[], object],
+        delay: float,
+        max_delay: Optional[float] = None,
+    ):
+        self.publish_fn = publish_fn
+        self.delay = delay
+        self.max_delay = max_delay
+        self._lock = threading.Lock()
+        self._timer: Optional[threading.Timer] = None
+        self._first_pending = 0.0
+
+    def schedule(self) -> None:
+        with self._lock:
+            now = time.monotonic()
+            if self._timer is not None:
+                self._timer.cancel()
+            else:
+                self._first_pending = now
+            delay = self.delay
+            if self.max_delay is not None:
+                deadline = self._first_pending + self.max_delay
+                delay = max(0.0, min(delay, deadline - now))
+            self._timer = threading.Timer(delay, self._run)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def _run(self) -> None:
+        with self._lock:
+            self._timer = None
+        try:
+            self.publish_fn()
+        except Exception:
+            logger.exception("Snapshot publishing failed")
+
+    def flush(self) -> None:
+        """Wykonuje zaległą publikację od razu (np. przy zamykaniu aplikacji)."""
+        with self._lock:
+            timer, self._timer = self._timer, None
+        if timer is not None:
+            timer.cancel()
+            self._run()
+
+    def cancel(self) -> None:
+        with self._lock:
+            timer, self._timer = self._timer, None
+        if timer is not None:
+            timer.cancel()
+
+
+publisher = SnapshotPublisher(
+    publish, settings.snapshot_debounce, settings.snapshot_max_delay
+)
+
+
+@versioning.on_change
+def _publish_on_change(tables: Set[str]) -> None:
+    if settings.snapshot_enabled and PUBLIC_TABLES.intersection(tables):
+        publisher.schedule()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Publikacja migawek JSON")
+    parser.add_argument("--output", default=settings.snapshot_dir)
+    args = parser.parse_args()
+
+    changed = publish(directory=args.output)
+    print(f"{len(changed)} changed: {', '.join(changed) or '-'} ({args.output})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,307 @@
+"""
+Uzgadnianie plików w ``static/`` z wierszami w bazie.
+
+Wykrywa dwa rodzaje rozbieżności:
+
+* osierocone pliki - leżą w ``static/images``, ``static/project_files`` lub
+  ``static/executables``, ale nie wskazuje na nie żaden wiersz (np. awaria
+  między zapisem pliku a commitem, stare warianty zdjęć, porzucone
+  pliki tymczasowe ``.upload-*.part``);
+* wiszące wiersze - ``Image``/``ProjectFiles``/``ExecutableFile``, których
+  pliku nie ma na dysku.
+
+Pliki są sprawdzane paczkami - jedno zapytanie po indeksowanych kolumnach
+``file_path`` na paczkę - więc nawet setki tysięcy plików to kilkaset
+zapytań. Pliki młodsze niż ``reconcile_grace`` są pomijane (mógł je właśnie
+zapisać albo ponownie użyć upload, którego wiersz nie jest jeszcze
+zatwierdzony - ponowne użycie odświeża czas modyfikacji). Tuż przed
+usunięciem referencje i wiek pliku są sprawdzane jeszcze raz.
+
+W tle ``Reconciler.step()`` sprawdza kolejne paczki co ``STEP_PAUSE`` sekund,
+aż przejście się zakończy; następne przejście zaczyna się po
+``reconcile_interval``. Na żądanie:
+    python -m app.reconciler [--remove]
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import time
+from dataclasses import dataclass, field
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from .config import settings
+from .db.database import SessionLocal
+from .images import VARIANTS_SUBDIR
+from .models import models
+from .routers import files, projects
+from .storage import (
+    FILE_MODELS,
+    TEMP_PREFIX,
+    recently_reused,
+    referenced_paths,
+    remove_orphans,
+)
+
+logger = logging.getLogger(__name__)
+
+# Przerwa między paczkami trwającego przejścia w tle (sekundy)
+STEP_PAUSE = 1.0
+
+
+def storage_roots() -> List[str]:
+    """Katalogi z plikami wskazywanymi przez ``file_path`` (bieżące ustawienia)."""
+    return [files.IMG_DIR, projects.FILES_DIR, projects.EXE_DIR]
+
+
+def _walk(root: str) -> Iterator[os.DirEntry]:
+    """Rekurencyjnie wszystkie pliki (scandir - bez osobnego stat na wpis)."""
+    try:
+        entries = os.scandir(root)
+    except FileNotFoundError:
+        return
+    with entries:
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                yield from _walk(entry.path)
+            elif entry.is_file(follow_symlinks=False):
+                yield entry
+
+
+def _remove_quietly(path: str) -> None:
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+@dataclass
+class ReconcileReport:
+    scanned_files: int = 0
+    scanned_rows: int = 0
+    orphan_files: List[str] = field(default_factory=list)
+    # (tabela, id, file_path)
+    dangling_rows: List[Tuple[str, int, str]] = field(default_factory=list)
+    removed: bool = False
+
+    def merge(self, other: "ReconcileReport") -> None:
+        self.scanned_files += other.scanned_files
+        self.scanned_rows += other.scanned_rows
+        self.orphan_files += other.orphan_files
+        self.dangling_rows += other.dangling_rows
+        self.removed = self.removed or other.removed
+
+
+class Reconciler:
+    """
+    Przyrostowe przejście po plikach i wierszach. Każde ``step()`` sprawdza
+    najwyżej ``batch_size`` plików i ``batch_size`` wierszy każdej tabeli;
+    po zakończeniu przejścia następne ``step()`` zaczyna nowe.
+    """
+
+    def __init__(
+        self,
+        batch_size: int = 1000,
+        grace: float = 3600.0,
+        session_factory=None,
+    ):
+        self.batch_size = batch_size
+        self.grace = grace
+        self.session_factory = session_factory
+        self.passes = 0
+        self._reset()
+
+    def _reset(self) -> None:
+        self._entries: Optional[Iterator[os.DirEntry]] = None
+        self._files_done = False
+        self._row_cursors: Dict[type, int] = {model: 0 for model in FILE_MODELS}
+        self._variants: Optional[Set[str]] = None
+
+    @property
+    def pass_done(self) -> bool:
+        return self._files_done and not self._row_cursors
+
+    def _next_entries(self) -> List[os.DirEntry]:
+        if self._entries is None:
+            roots = storage_roots()
+            self._entries = (entry for root in roots for entry in _walk(root))
+        batch = []
+        for entry in self._entries:
+            batch.append(entry)
+            if len(batch) >= self.batch_size:
+                return batch
+        self._files_done = True
+        return batch
+
+    def _referenced_variants(self, db: Session) -> Set[str]:
+        # Warianty są w kolumnie JSON (bez indeksu) - zbierane raz na przejście
+        if self._variants is None:
+            rows = db.execute(
+                select(models.Image.variants).where(models.Image.variants.isnot(None))
+            ).scalars()
+            self._variants = {
+                variant["file_path"] for variants in rows for variant in variants
+            }
+        return self._variants
+
+    def _check_files(self, db: Session, report: ReconcileReport) -> None:
+        entries = self._next_entries()
+        report.scanned_files += len(entries)
+        cutoff = time.time() - self.grace
+        candidates = []
+        for entry in entries:
+            try:
+                if entry.stat(follow_symlinks=False).st_mtime > cutoff:
+                    continue
+            except FileNotFoundError:
+                continue
+            candidates.append(entry)
+
+        variant_dir = os.path.join(files.IMG_DIR, VARIANTS_SUBDIR) + os.sep
+        variants = [e.path for e in candidates if e.path.startswith(variant_dir)]
+        originals = [e.path for e in candidates if not e.path.startswith(variant_dir)]
+        if variants:
+            referenced = self._referenced_variants(db)
+            report.orphan_files += [p for p in variants if p not in referenced]
+        referenced = referenced_paths(db, originals)
+        report.orphan_files += [
+            path
+            for path in originals
+            # Nazwa tymczasowa nigdy nie trafia do bazy - to pozostałość po awarii
+            if (path not in referenced and not recently_reused(path))
+            or os.path.basename(path).startswith(TEMP_PREFIX)
+        ]
+
+    def _check_rows(self, db: Session, report: ReconcileReport) -> None:
+        for model, after_id in list(self._row_cursors.items()):
+            rows = db.execute(
+                select(model.id, model.file_path)
+                .where(model.id > after_id)
+                .order_by(model.id)
+                .limit(self.batch_size)
+            ).all()
+            report.scanned_rows += len(rows)
+            report.dangling_rows += [
+                (model.__tablename__, row_id, path)
+                for row_id, path in rows
+                if not path or not os.path.exists(path)
+            ]
+            if len(rows) < self.batch_size:
+                del self._row_cursors[model]
+            else:
+                self._row_cursors[model] = rows[-1][0]
+
+    def _remove(self, db: Session, report: ReconcileReport) -> None:
+        variant_dir = os.path.join(files.IMG_DIR, VARIANTS_SUBDIR) + os.sep
+        if any(path.startswith(variant_dir) for path in report.orphan_files):
+            # Zbiór z początku przejścia mógł się zestarzeć - odświeżamy przed
+            # usunięciem (nowy upload mógł użyć istniejącego wariantu)
+            self._variants = None
+            referenced = self._referenced_variants(db)
+            report.orphan_files = [
+                path for path in report.orphan_files if path not in referenced
+            ]
+        variants = [p for p in report.orphan_files if p.startswith(variant_dir)]
+        for path in variants:
+            _remove_quietly(path)
+        originals = [p for p in report.orphan_files if not p.startswith(variant_dir)]
+        # Plik mógł zostać w międzyczasie użyty ponownie (także w innym procesie)
+        originals = remove_orphans(db, originals, time.time() - self.grace)
+        report.orphan_files = variants + originals
+        by_table = {model.__tablename__: model for model in FILE_MODELS}
+        for table, row_id, _ in report.dangling_rows:
+            row = db.get(by_table[table], row_id)
+            # Plik mógł zostać w międzyczasie przywrócony
+            if row is not None and not (
+                row.file_path and os.path.exists(row.file_path)
+            ):
+                db.delete(row)
+        db.commit()
+        report.removed = True
+
+    def step(self, remove: bool = False) -> ReconcileReport:
+        """Sprawdza kolejną paczkę; ``remove`` - usuwa też znalezione rozbieżności."""
+        if self.pass_done:
+            self._reset()
+        report = ReconcileReport()
+        with (self.session_factory or SessionLocal)() as db:
+            if not self._files_done:
+                self._check_files(db, report)
+            if self._row_cursors:
+                self._check_rows(db, report)
+            if remove and (report.orphan_files or report.dangling_rows):
+                self._remove(db, report)
+        if self.pass_done:
+            self.passes += 1
+        return report
+
+    def run(self, remove: bool = False) -> ReconcileReport:
+        """Pełne przejście od początku (tryb CLI)."""
+        self._reset()
+        report = ReconcileReport()
+        while True:
+            report.merge(self.step(remove))
+            if self.pass_done:
+                return report
+
+
+reconciler = Reconciler(settings.reconcile_batch, settings.reconcile_grace)
+
+
+async def run_periodically(interval: float, remove: bool = False) -> None:
+    """
+    Zadanie w tle: przejście paczkami co ``STEP_PAUSE`` sekund (poza pętlą
+    zdarzeń), kolejne przejście po ``interval`` sekundach.
+    """
+    delay = interval
+    while True:
+        await asyncio.sleep(delay)
+        delay = interval
+        try:
+            report = await run_in_threadpool(reconciler.step, remove)
+        except Exception:
+            logger.exception("Storage reconciliation failed")
+            continue
+        if not reconciler.pass_done:
+            delay = STEP_PAUSE
+        if report.orphan_files or report.dangling_rows:
+            logger.warning(
+                "Storage reconciliation: %d orphan files, %d dangling rows%s",
+                len(report.orphan_files),
+                len(report.dangling_rows),
+                " (removed)" if report.removed else "",
+            )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Uzgadnianie plików z bazą")
+    parser.add_argument(
+        "--remove",
+        action="store_true",
+        help="usuń osierocone pliki i wiszące wiersze (domyślnie tylko raport)",
+    )
+    parser.add_argument("--grace", type=float, default=settings.reconcile_grace)
+    parser.add_argument("--batch-size", type=int, default=settings.reconcile_batch)
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    report = Reconciler(args.batch_size, args.grace).run(remove=args.remove)
+    for path in report.orphan_files:
+        print(f"orphan file: {path}")
+    for table, row_id, path in report.dangling_rows:
+        print(f"dangling row: {table}#{row_id} -> {path}")
+    print(
+        f"{report.scanned_files} files, {report.scanned_rows} rows checked in "
+        f"{time.perf_counter() - started:.2f}s: {len(report.orphan_files)} orphan "
+        f"files, {len(report.dangling_rows)} dangling rows"
+        + (" (removed)" if report.removed else "")
+    )
+
+
+if __name__ == "__main__":
+    main()
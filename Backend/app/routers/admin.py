@@ -0,0 +1,29 @@
+from fastapi import APIRouter, Depends
+from fastapi.responses import Response
+
+from .. import metrics
+from ..cache import response_cache
+from ..dependencies import verify_api_key
+
+router = APIRouter()
+# Bez prefiksu /api - Prometheus domyślnie odpytuje /metrics
+metrics_router = APIRouter()
+
+
+@router.get("/admin/cache/", dependencies=[Depends(verify_api_key)])
+def read_cache_stats():
+    """ADMIN: Statystyki pamięci podręcznej odpowiedzi (trafienia/chybienia)."""
+    return response_cache.stats()
+
+
+@router.delete("/admin/cache/", dependencies=[Depends(verify_api_key)])
+def clear_cache():
+    """ADMIN: Czyszczenie pamięci podręcznej odpowiedzi."""
+    response_cache.clear()
+    return {"message": "Cache cleared successfully"}
+
+
+@metrics_router.get("/metrics", dependencies=[Depends(verify_api_key)])
+def read_metrics():
+    """ADMIN: Metryki żądań i zapytań SQL w formacie Prometheusa."""
+    return Response(metrics.registry.render(), media_type=metrics.CONTENT_TYPE)
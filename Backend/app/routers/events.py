@@ -1,28 +1,217 @@
-from typing import List
+from datetime import datetime
+from typing import Any, List, Literal, Optional
 
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Body, Depends, HTTPException, Query, Request
+from pydantic import TypeAdapter
+from sqlalchemy.orm import Session, joinedload, selectinload
 
-from ..dependencies import get_db, verify_api_key
+from .. import batch, pagination
+from ..cache import (
+    CachedResponse,
+    cached_response,
+    http_date,
+    response_cache,
+)
+from ..dependencies import DBSession, get_session, verify_api_key
+from ..fieldsets import FIELDS_MAX_LENGTH, Fieldset, load_options, parse_fieldset
 from ..models import models, schemas
+from ..serialization import OrmSerializer, serializer_for
+from ..storage import owned_files, release_files
 
 router = APIRouter()
 
+# Tabele, z których budowane są odpowiedzi publiczne (wersje w kluczach cache)
+EVENT_TABLES = ("events", "images")
+
+# Lista: selectin; szczegóły: jeden wiersz i jedna kolekcja - joined w jednym zapytaniu
+EVENT_LIST_RELATIONS = {"images": selectinload(models.Event.images)}
+EVENT_DETAIL_RELATIONS = {"images": joinedload(models.Event.images)}
+
+_events_serializer = OrmSerializer(schemas.Event, many=True)
+_event_serializer = OrmSerializer(schemas.Event)
+
+
+EventSort = Literal["date", "-date"]
+
+
+def _event_filters(date_from: Optional[datetime], date_to: Optional[datetime]):
+    criteria = []
+    if date_from is not None:
+        criteria.append(models.Event.date >= date_from)
+    if date_to is not None:
+        criteria.append(models.Event.date < date_to)
+    return criteria
+
+
+def list_events(
+    db: Session,
+    skip: int = 0,
+    limit: int = 100,
+    cursor=None,
+    date_from: Optional[datetime] = None,
+    date_to: Optional[datetime] = None,
+    sort: EventSort = "date",
+    fieldset: Optional[Fieldset] = None,
+):
+    """Strona wydarzeń wraz ze zdjęciami: (wiersze, następny_kursor)."""
+    _, descending = pagination.parse_sort(sort)
+    columns = (models.Event.date, models.Event.id)
+    options = load_options(
+        models.Event,
+        fieldset,
+        EVENT_LIST_RELATIONS,
+        extra_columns=[column.key for column in columns],
+    )
+    # Zakres dat i sortowanie obsługuje indeks ix_events_date_id (date, id)
+    return pagination.paginate(
+        db.query(models.Event)
+        .options(*options)
+        .filter(*_event_filters(date_from, date_to)),
+        columns=columns,
+        cursor_types=(datetime.fromisoformat, int),
+        skip=skip,
+        limit=limit,
+        cursor=cursor,
+        descending=descending,
+    )
+
+
+def _build_events_page(
+    db: Session,
+    skip: int,
+    limit: int,
+    cursor,
+    date_from: Optional[datetime] = None,
+    date_to: Optional[datetime] = None,
+    sort: EventSort = "date",
+    fieldset: Optional[Fieldset] = None,
+) -> CachedResponse:
+    events, next_cursor = list_events(
+        db, skip, limit, cursor, date_from, date_to, sort, fieldset
+    )
+    total = pagination.cached_count(
+        db, models.Event, *_event_filters(date_from, date_to)
+    )
+    headers = {pagination.TOTAL_COUNT_HEADER: str(total)}
+    if next_cursor:
+        headers[pagination.NEXT_CURSOR_HEADER] = next_cursor
+    serializer = _events_serializer
+    if fieldset is not None:
+        serializer = serializer_for(schemas.Event, True, fieldset.fields)
+    return CachedResponse(serializer.dump_json(events), headers)
+
+
+def _events_page_key(
+    skip: int,
+    limit: int,
+    cursor,
+    date_from: Optional[datetime] = None,
+    date_to: Optional[datetime] = None,
+    sort: EventSort = "date",
+    fieldset: Optional[Fieldset] = None,
+) -> tuple:
+    """Klucz strony w cache - wspólny dla listy i sekcji ``/api/home``."""
+    return ("events", skip, limit, cursor, date_from, date_to, sort, fieldset)
+
+
+def events_section(
+    db: Session, skip: int = 0, limit: int = 100, cursor=None
+) -> CachedResponse:
+    """Zserializowana strona wydarzeń - z pamięci podręcznej, jeśli aktualna."""
+    return response_cache.get_or_build(
+        _events_page_key(skip, limit, cursor),
+        EVENT_TABLES,
+        lambda: _build_events_page(db, skip, limit, cursor),
+    )
+
 
 @router.get("/events/", response_model=List[schemas.Event])
-def read_events(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    """PUBLICZNY: Lista wydarzeń."""
-    events = db.query(models.Event).offset(skip).limit(limit).all()
-    return events
+async def read_events(
+    request: Request,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    date_from: Optional[datetime] = Query(None, alias="from"),
+    date_to: Optional[datetime] = Query(None, alias="to"),
+    sort: EventSort = "date",
+    fields: Optional[str] = Query(None, max_length=FIELDS_MAX_LENGTH),
+    include: Optional[str] = Query(None, max_length=FIELDS_MAX_LENGTH),
+    db: DBSession = Depends(get_session),
+):
+    """
+    PUBLICZNY: Lista wydarzeń posortowana po (date, id), z `sort=-date` malejąco.
+    `from`/`to` zawężają do dat z przedziału [from, to).
+    Kolejną stronę pobiera się przekazując `cursor` z nagłówka X-Next-Cursor.
+    Wybór kolumn `fields` i relacji `include`, np. `fields=id,name&include=`.
+    """
+    fieldset = parse_fieldset(schemas.Event, models.Event, fields, include)
+    return await cached_response(
+        request,
+        db,
+        _events_page_key(skip, limit, cursor, date_from, date_to, sort, fieldset),
+        EVENT_TABLES,
+        lambda session: _build_events_page(
+            session, skip, limit, cursor, date_from, date_to, sort, fieldset
+        ),
+    )
 
 
 @router.get("/events/{event_id}", response_model=schemas.Event)
-def read_event(event_id: int, db: Session = Depends(get_db)):
-    """PUBLICZNY: Szczegóły wydarzenia."""
-    event = db.query(models.Event).filter(models.Event.id == event_id).first()
-    if event is None:
+async def read_event(
+    event_id: int,
+    request: Request,
+    fields: Optional[str] = Query(None, max_length=FIELDS_MAX_LENGTH),
+    include: Optional[str] = Query(None, max_length=FIELDS_MAX_LENGTH),
+    db: DBSession = Depends(get_session),
+):
+    """PUBLICZNY: Szczegóły wydarzenia (`fields`/`include` jak w liście)."""
+    fieldset = parse_fieldset(schemas.Event, models.Event, fields, include)
+    options = load_options(
+        models.Event, fieldset, EVENT_DETAIL_RELATIONS, extra_columns=["updated_at"]
+    )
+    serializer = _event_serializer
+    if fieldset is not None:
+        serializer = serializer_for(schemas.Event, False, fieldset.fields)
+
+    def build(session: Session):
+        event = (
+            session.query(models.Event)
+            .options(*options)
+            .filter(models.Event.id == event_id)
+            .first()
+        )
+        if event is None:
+            return None
+        headers = {}
+        if event.updated_at is not None:
+            headers["Last-Modified"] = http_date(event.updated_at)
+        return CachedResponse(serializer.dump_json(event), headers)
+
+    def last_modified(session: Session):
+        return (
+            session.query(models.Event.updated_at)
+            .filter(models.Event.id == event_id)
+            .scalar()
+        )
+
+    response = await cached_response(
+        request,
+        db,
+        ("event", event_id, fieldset),
+        EVENT_TABLES,
+        build,
+        last_modified,
+    )
+    if response is None:
+        raise HTTPException(status_code=404, detail="Event not found")
+    return response
+
+
+def _get_event_or_404(db: Session, event_id: int) -> models.Event:
+    db_event = db.query(models.Event).filter(models.Event.id == event_id).first()
+    if db_event is None:
         raise HTTPException(status_code=404, detail="Event not found")
-    return event
+    return db_event
 
 
 @router.post(
@@ -30,13 +219,19 @@ def read_event(event_id: int, db: Session = Depends(get_db)):
     response_model=schemas.Event,
     dependencies=[Depends(verify_api_key)],
 )
-def create_event(event: schemas.EventCreate, db: Session = Depends(get_db)):
+async def create_event(
+    event: schemas.EventCreate, db: DBSession = Depends(get_session)
+):
     """ADMIN: Tworzenie wydarzenia."""
-    db_event = models.Event(**event.model_dump())
-    db.add(db_event)
-    db.commit()
-    db.refresh(db_event)
-    return db_event
+
+    def create(session: Session):
+        db_event = models.Event(**event.model_dump())
+        session.add(db_event)
+        session.commit()
+        session.refresh(db_event)
+        return schemas.Event.model_validate(db_event)
+
+    return await db.run_sync(create)
 
 
 @router.put(
@@ -44,29 +239,89 @@ def create_event(event: schemas.EventCreate, db: Session = Depends(get_db)):
     response_model=schemas.Event,
     dependencies=[Depends(verify_api_key)],
 )
-def update_event(
-    event_id: int, event: schemas.EventCreate, db: Session = Depends(get_db)
+async def update_event(
+    event_id: int, event: schemas.EventCreate, db: DBSession = Depends(get_session)
 ):
     """ADMIN: Edycja wydarzenia."""
-    db_event = db.query(models.Event).filter(models.Event.id == event_id).first()
-    if db_event is None:
-        raise HTTPException(status_code=404, detail="Event not found")
 
-    update_data = event.model_dump(exclude_unset=True)
-    for key, value in update_data.items():
-        setattr(db_event, key, value)
+    def update(session: Session):
+        db_event = _get_event_or_404(session, event_id)
 
-    db.commit()
-    db.refresh(db_event)
-    return db_event
+        update_data = event.model_dump(exclude_unset=True)
+        for key, value in update_data.items():
+            setattr(db_event, key, value)
+
+        session.commit()
+        session.refresh(db_event)
+        return schemas.Event.model_validate(db_event)
+
+    return await db.run_sync(update)
 
 
 @router.delete("/admin/events/{event_id}", dependencies=[Depends(verify_api_key)])
-def delete_event(event_id: int, db: Session = Depends(get_db)):
+async def delete_event(event_id: int, db: DBSession = Depends(get_session)):
     """ADMIN: Usuwanie wydarzenia."""
-    db_event = db.query(models.Event).filter(models.Event.id == event_id).first()
-    if db_event is None:
-        raise HTTPException(status_code=404, detail="Event not found")
-    db.delete(db_event)
-    db.commit()
+
+    def delete(session: Session):
+        db_event = _get_event_or_404(session, event_id)
+        owned = owned_files(db_event)
+        session.delete(db_event)
+        session.commit()
+        release_files(session, owned)
+
+    await db.run_sync(delete)
     return {"message": "Event deleted successfully"}
+
+
+# --- OPERACJE ZBIORCZE ---
+
+_event_create_adapter = TypeAdapter(schemas.EventCreate)
+_event_update_adapter = TypeAdapter(schemas.EventBatchUpdate)
+
+
+@router.post(
+    "/admin/batch/events",
+    response_model=List[schemas.BatchItemResult],
+    dependencies=[Depends(verify_api_key)],
+)
+async def batch_create_events(
+    items: List[Any] = Body(..., max_length=batch.BATCH_MAX_ITEMS),
+    db: DBSession = Depends(get_session),
+):
+    """ADMIN: Tworzenie wielu wydarzeń w jednej transakcji."""
+    return await db.run_sync(
+        batch.batch_create, models.Event, _event_create_adapter, items
+    )
+
+
+@router.put(
+    "/admin/batch/events",
+    response_model=List[schemas.BatchItemResult],
+    dependencies=[Depends(verify_api_key)],
+)
+async def batch_update_events(
+    items: List[Any] = Body(..., max_length=batch.BATCH_MAX_ITEMS),
+    db: DBSession = Depends(get_session),
+):
+    """ADMIN: Edycja wielu wydarzeń (elementy z polem ``id``)."""
+    return await db.run_sync(
+        batch.batch_update, models.Event, _event_update_adapter, items
+    )
+
+
+@router.delete(
+    "/admin/batch/events",
+    response_model=List[schemas.BatchItemResult],
+    dependencies=[Depends(verify_api_key)],
+)
+async def batch_delete_events(
+    ids: List[int] = Body(..., max_length=batch.BATCH_MAX_ITEMS),
+    db: DBSession = Depends(get_session),
+):
+    """ADMIN: Usuwanie wielu wydarzeń."""
+    return await db.run_sync(
+        batch.batch_delete,
+        models.Event,
+        ids,
+        (selectinload(models.Event.images),),
+    )
@@ -1,35 +1,63 @@
+import asyncio
+import logging
 import os
-import shutil
-from this import s
-from typing import Optional
+from typing import List, Optional
 
 from fastapi import APIRouter, Depends, File, Form, HTTPException, UploadFile
 from sqlalchemy.orm import Session
 
-from ..dependencies import get_db, verify_api_key
+from ..batch import assign_ids
+from ..config import settings
+from ..dependencies import DBSession, get_session, verify_api_key
+from ..images import create_variants, remove_variants
 from ..models import models, schemas
+from ..storage import release_file, save_upload
 
 router = APIRouter()
 
+logger = logging.getLogger(__name__)
+
 # Katalog dla zdjęć
 IMG_DIR = "static/images"
 
 # Upewnij się, że katalog istnieje
 os.makedirs(IMG_DIR, exist_ok=True)
 
-
-def save_file(file: UploadFile, destination_dir: str) -> str:
-    if not os.path.exists(destination_dir):
-        os.makedirs(destination_dir)
-    file_path = os.path.join(destination_dir, str(file.filename))
-    with open(file_path, "wb") as buffer:
-        shutil.copyfileobj(file.file, buffer)
-    return file_path
+IMAGE_EXTENSIONS = ("jpg", "jpeg", "png", "gif", "webp")
+INVALID_IMAGE_DETAIL = "Invalid file type. Only images allowed."
 
 
 # --- OBRAZY (IMAGES) - DOSTĘP TYLKO DLA ADMINA (UPLOAD/DELETE) ---
 
 
+def _is_image_name(file_name: str) -> bool:
+    return file_name.split(".")[-1].lower() in IMAGE_EXTENSIONS
+
+
+async def _image_owner(
+    db: DBSession, event_id: Optional[int], project_id: Optional[int]
+) -> dict:
+    """Kolumny właściciela zdjęcia; 400/404, gdy brak lub nie istnieje."""
+    if event_id:
+        parent, parent_id, detail = models.Event, event_id, "Event not found"
+        owner = {"event_id": event_id}
+    elif project_id:
+        parent, parent_id, detail = models.Project, project_id, "Project not found"
+        owner = {"project_id": project_id}
+    else:
+        raise HTTPException(
+            status_code=400, detail="Either event_id or project_id must be provided"
+        )
+
+    def parent_exists(session: Session) -> bool:
+        query = session.query(parent.id).filter(parent.id == parent_id)
+        return query.first() is not None
+
+    if not await db.run_sync(parent_exists):
+        raise HTTPException(status_code=404, detail=detail)
+    return owner
+
+
 @router.post(
     "/admin/upload_image/",
     response_model=schemas.Image,
@@ -39,49 +67,111 @@ async def upload_image(
     file: UploadFile = File(...),
     event_id: Optional[int] = Form(None),
     project_id: Optional[int] = Form(None),
-    db: Session = Depends(get_db),
+    db: DBSession = Depends(get_session),
 ):
-    file_name = file.filename or "image"
-    file_extension = file_name.split(".")[-1]
-    if file_extension.lower() not in ["jpg", "jpeg", "png", "gif", "webp"]:
-        raise HTTPException(
-            status_code=400, detail="Invalid file type. Only images allowed."
-        )
+    if not _is_image_name(file.filename or "image"):
+        raise HTTPException(status_code=400, detail=INVALID_IMAGE_DETAIL)
 
-    file_path = save_file(file, IMG_DIR)
+    owner = await _image_owner(db, event_id, project_id)
 
-    db_image = None
-    if event_id:
-        if not db.query(models.Event).filter(models.Event.id == event_id).first():
-            raise HTTPException(status_code=404, detail="Event not found")
-        db_image = models.Image(file_path=file_path, event_id=event_id)
-    elif project_id:
-        if not db.query(models.Project).filter(models.Project.id == project_id).first():
-            raise HTTPException(status_code=404, detail="Project not found")
-        db_image = models.Image(file_path=file_path, project_id=project_id)
-    else:
+    file_path = await save_upload(file, IMG_DIR)
+    variants = await create_variants(file_path, IMG_DIR)
+
+    def create(session: Session):
+        db_image = models.Image(file_path=file_path, variants=variants, **owner)
+        session.add(db_image)
+        session.commit()
+        session.refresh(db_image)
+        return schemas.Image.model_validate(db_image)
+
+    return await db.run_sync(create)
+
+
+@router.post(
+    "/admin/upload_images/",
+    response_model=List[schemas.ImageUploadResult],
+    dependencies=[Depends(verify_api_key)],
+)
+async def upload_images(
+    files: List[UploadFile] = File(...),
+    event_id: Optional[int] = Form(None),
+    project_id: Optional[int] = Form(None),
+    db: DBSession = Depends(get_session),
+):
+    """
+    Admin: Wiele zdjęć jednego wydarzenia/projektu w jednym żądaniu.
+    Pliki są zapisywane równolegle (najwyżej ``image_upload_concurrency``
+    naraz), a wiersze ``Image`` dodawane jednym commitem. Błąd pliku nie
+    przerywa pozostałych - wynik jest raportowany dla każdego pliku osobno.
+    """
+    if len(files) > settings.image_upload_max_files:
         raise HTTPException(
-            status_code=400, detail="Either event_id or project_id must be provided"
+            status_code=400,
+            detail=f"Too many files (max {settings.image_upload_max_files})",
         )
 
-    db.add(db_image)
-    db.commit()
-    db.refresh(db_image)
-    return db_image
+    owner = await _image_owner(db, event_id, project_id)
+    in_flight = asyncio.Semaphore(max(1, settings.image_upload_concurrency))
+
+    async def store(file: UploadFile):
+        if not _is_image_name(file.filename or "image"):
+            return None, INVALID_IMAGE_DETAIL
+        async with in_flight:
+            try:
+                file_path = await save_upload(file, IMG_DIR)
+            except OSError:
+                logger.exception("Could not store uploaded image %s", file.filename)
+                return None, "Could not store file"
+            return (file_path, await create_variants(file_path, IMG_DIR)), None
+
+    stored = await asyncio.gather(*(store(file) for file in files))
+
+    def create(session: Session):
+        db_images = [
+            models.Image(file_path=saved[0], variants=saved[1], **owner)
+            for saved, _ in stored
+            if saved is not None
+        ]
+        assign_ids(session, db_images)
+        session.add_all(db_images)
+        session.flush()
+        # Walidacja przed commitem - po nim każdy obiekt trzeba by doczytać
+        images = [schemas.Image.model_validate(db_image) for db_image in db_images]
+        session.commit()
+        return iter(images)
+
+    images = await db.run_sync(create)
+    return [
+        schemas.ImageUploadResult(
+            index=index,
+            file_name=file.filename or "",
+            image=next(images) if saved is not None else None,
+            error=error,
+        )
+        for index, (file, (saved, error)) in enumerate(zip(files, stored))
+    ]
 
 
 @router.delete("/admin/images/{image_id}", dependencies=[Depends(verify_api_key)])
-def delete_image(image_id: int, db: Session = Depends(get_db)):
+async def delete_image(image_id: int, db: DBSession = Depends(get_session)):
     """
     Admin: Usuwa zdjęcie.
     """
-    db_image = db.query(models.Image).filter(models.Image.id == image_id).first()
-    if not db_image:
-        raise HTTPException(status_code=404, detail="Image not found")
 
-    if os.path.exists(str(db_image.file_path)):
-        os.remove(str(db_image.file_path))
-
-    db.delete(db_image)
-    db.commit()
+    def delete(session: Session):
+        db_image = (
+            session.query(models.Image).filter(models.Image.id == image_id).first()
+        )
+        if not db_image:
+            raise HTTPException(status_code=404, detail="Image not found")
+
+        file_path = str(db_image.file_path)
+        variants = db_image.variants
+        session.delete(db_image)
+        session.commit()
+        # Ten sam plik może być współdzielony przez inne wpisy
+        if release_file(session, file_path):
+            remove_variants(variants)
+
+    await db.run_sync(delete)
     return {"message": "Image deleted successfully"}
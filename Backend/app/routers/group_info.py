@@ -1,19 +1,65 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from pydantic import TypeAdapter
 from sqlalchemy.orm import Session
 
-from ..dependencies import get_db, verify_api_key
+from ..cache import (
+    CachedResponse,
+    cached_response,
+    dump_json,
+    http_date,
+    response_cache,
+)
+from ..dependencies import DBSession, get_session, verify_api_key
 from ..models import models, schemas
 
 router = APIRouter()
 
+GROUP_INFO_TABLES = ("group_info",)
+
+_group_info_adapter = TypeAdapter(schemas.GroupInfo)
+
+
+def get_group_info(db: Session):
+    return db.query(models.GroupInfo).first()
+
+
+def _build_group_info(db: Session) -> Optional[CachedResponse]:
+    group_info = get_group_info(db)
+    if group_info is None:
+        return None
+    headers = {}
+    if group_info.updated_at is not None:
+        headers["Last-Modified"] = http_date(group_info.updated_at)
+    return CachedResponse(dump_json(_group_info_adapter, group_info), headers)
+
+
+def group_info_section(db: Session) -> Optional[CachedResponse]:
+    """Zserializowane info o grupie (None, jeśli nie utworzono)."""
+    return response_cache.get_or_build(
+        "group_info", GROUP_INFO_TABLES, lambda: _build_group_info(db)
+    )
+
+
+def _group_info_modified(db: Session):
+    return db.query(models.GroupInfo.updated_at).limit(1).scalar()
+
 
 @router.get("/about/", response_model=schemas.GroupInfo)
-def read_group_info(db: Session = Depends(get_db)):
+async def read_group_info(request: Request, db: DBSession = Depends(get_session)):
     """PUBLICZNY: Informacje o grupie."""
-    group_info = db.query(models.GroupInfo).first()
-    if group_info is None:
+    response = await cached_response(
+        request,
+        db,
+        "group_info",
+        GROUP_INFO_TABLES,
+        _build_group_info,
+        _group_info_modified,
+    )
+    if response is None:
         raise HTTPException(status_code=404, detail="Group info not found")
-    return group_info
+    return response
 
 
 @router.post(
@@ -21,22 +67,26 @@ def read_group_info(db: Session = Depends(get_db)):
     response_model=schemas.GroupInfo,
     dependencies=[Depends(verify_api_key)],
 )
-def create_group_info(
-    group_info: schemas.GroupInfoCreate, db: Session = Depends(get_db)
+async def create_group_info(
+    group_info: schemas.GroupInfoCreate, db: DBSession = Depends(get_session)
 ):
     """ADMIN: Tworzenie info (tylko raz)."""
-    db_group_info = db.query(models.GroupInfo).first()
-    if db_group_info:
-        raise HTTPException(
-            status_code=status.HTTP_409_CONFLICT,
-            detail="Group info already exists, please update it.",
-        )
 
-    db_group_info = models.GroupInfo(**group_info.model_dump())
-    db.add(db_group_info)
-    db.commit()
-    db.refresh(db_group_info)
-    return db_group_info
+    def create(session: Session):
+        db_group_info = session.query(models.GroupInfo).first()
+        if db_group_info:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="Group info already exists, please update it.",
+            )
+
+        db_group_info = models.GroupInfo(**group_info.model_dump())
+        session.add(db_group_info)
+        session.commit()
+        session.refresh(db_group_info)
+        return schemas.GroupInfo.model_validate(db_group_info)
+
+    return await db.run_sync(create)
 
 
 @router.put(
@@ -44,20 +94,24 @@ def create_group_info(
     response_model=schemas.GroupInfo,
     dependencies=[Depends(verify_api_key)],
 )
-def update_group_info(
-    group_info: schemas.GroupInfoCreate, db: Session = Depends(get_db)
+async def update_group_info(
+    group_info: schemas.GroupInfoCreate, db: DBSession = Depends(get_session)
 ):
     """ADMIN: Aktualizacja info."""
-    db_group_info = db.query(models.GroupInfo).first()
-    if db_group_info is None:
-        raise HTTPException(
-            status_code=404, detail="Group info not found, please create it first."
-        )
-
-    update_data = group_info.model_dump(exclude_unset=True)
-    for key, value in update_data.items():
-        setattr(db_group_info, key, value)
-
-    db.commit()
-    db.refresh(db_group_info)
-    return db_group_info
+
+    def update(session: Session):
+        db_group_info = session.query(models.GroupInfo).first()
+        if db_group_info is None:
+            raise HTTPException(
+                status_code=404, detail="Group info not found, please create it first."
+            )
+
+        update_data = group_info.model_dump(exclude_unset=True)
+        for key, value in update_data.items():
+            setattr(db_group_info, key, value)
+
+        session.commit()
+        session.refresh(db_group_info)
+        return schemas.GroupInfo.model_validate(db_group_info)
+
+    return await db.run_sync(update)
@@ -0,0 +1,48 @@
+from fastapi import APIRouter, Depends, Query, Request
+from sqlalchemy.orm import Session
+
+from ..cache import CachedResponse, cached_response
+from ..dependencies import DBSession, get_session
+from ..models import schemas
+from . import events, group_info, projects
+
+router = APIRouter()
+
+HOME_TABLES = (
+    projects.PROJECT_TABLES + events.EVENT_TABLES + group_info.GROUP_INFO_TABLES
+)
+
+
+@router.get("/home", response_model=schemas.Home)
+async def read_home(
+    request: Request,
+    projects_limit: int = Query(100, ge=0),
+    events_limit: int = Query(100, ge=0),
+    db: DBSession = Depends(get_session),
+):
+    """
+    PUBLICZNY: Dane strony głównej (projekty, wydarzenia, info o grupie)
+    w jednym zapytaniu HTTP i jednej sesji bazy.
+    Każda sekcja jest brana z pamięci podręcznej niezależnie od pozostałych.
+    """
+
+    def build(session: Session):
+        projects_part = projects.projects_section(session, limit=projects_limit)
+        events_part = events.events_section(session, limit=events_limit)
+        about_part = group_info.group_info_section(session)
+        body = b"".join(
+            (
+                b'{"projects":',
+                projects_part.body,
+                b',"events":',
+                events_part.body,
+                b',"about":',
+                about_part.body if about_part is not None else b"null",
+                b"}",
+            )
+        )
+        return CachedResponse(body)
+
+    return await cached_response(
+        request, db, ("home", projects_limit, events_limit), HOME_TABLES, build
+    )
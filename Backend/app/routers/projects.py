@@ -1,14 +1,35 @@
 import os
-import shutil
-from fileinput import filename
-from typing import List
-
-from fastapi import APIRouter, Depends, File, Form, HTTPException, UploadFile, status
+from typing import Any, List, Literal, Optional
+
+from fastapi import (
+    APIRouter,
+    Body,
+    Depends,
+    File,
+    Form,
+    HTTPException,
+    Query,
+    Request,
+    UploadFile,
+    status,
+)
 from fastapi.responses import FileResponse
-from sqlalchemy.orm import Session
-
-from ..dependencies import get_db, verify_api_key
+from pydantic import TypeAdapter
+from sqlalchemy import select
+from sqlalchemy.orm import Session, selectinload
+
+from .. import batch, pagination
+from ..cache import (
+    CachedResponse,
+    cached_response,
+    http_date,
+    response_cache,
+)
+from ..dependencies import DBSession, get_session, verify_api_key
+from ..fieldsets import FIELDS_MAX_LENGTH, Fieldset, load_options, parse_fieldset
 from ..models import models, schemas
+from ..serialization import OrmSerializer, serializer_for
+from ..storage import owned_files, release_file, release_files, save_upload
 
 router = APIRouter()
 
@@ -19,20 +40,36 @@ EXE_DIR = "static/executables"
 os.makedirs(FILES_DIR, exist_ok=True)
 os.makedirs(EXE_DIR, exist_ok=True)
 
+# Relacje ładowane zawczasu - stała liczba zapytań niezależnie od liczby projektów.
+# Trzy kolekcje, więc selectin (joined mnożyłby wiersze przez iloczyn kartezjański).
+PROJECT_RELATIONS = {
+    "images": selectinload(models.Project.images),
+    "executable": selectinload(models.Project.executable),
+    "files": selectinload(models.Project.files),
+}
+PROJECT_LOAD_OPTIONS = tuple(PROJECT_RELATIONS.values())
 
-def save_file(file: UploadFile, destination_dir: str) -> str:
-    if not os.path.exists(destination_dir):
-        os.makedirs(destination_dir)
+# Tabele, z których budowane są odpowiedzi publiczne (wersje w kluczach cache)
+PROJECT_TABLES = ("projects", "images", "executable_file", "project_files")
+
+_projects_serializer = OrmSerializer(schemas.Project, many=True)
+_project_serializer = OrmSerializer(schemas.Project)
+
+
+ARCHIVE_EXTENSIONS = ["zip", "rar", "7z", "tar", "gz", "bz2"]
 
-    # NAPRAWA: Zabezpieczenie na wypadek braku nazwy pliku
-    file_name = file.filename or "unknown_file"
 
-    # Teraz filename jest na pewno typu 'str', więc join nie zgłosi błędu
-    file_path = os.path.join(destination_dir, file_name)
+def check_archive_name(file_name: str) -> None:
+    if file_name.split(".")[-1].lower() not in ARCHIVE_EXTENSIONS:
+        raise HTTPException(status_code=400, detail="Only archive files allowed.")
+
 
-    with open(file_path, "wb") as buffer:
-        shutil.copyfileobj(file.file, buffer)
-    return file_path
+def check_platform(platform: str) -> None:
+    allowed_platforms = [p.value for p in models.Platforms]
+    if platform not in allowed_platforms:
+        raise HTTPException(
+            status_code=400, detail=f"Invalid platform. Choose: {allowed_platforms}"
+        )
 
 
 # ==========================================
@@ -40,20 +77,202 @@ def save_file(file: UploadFile, destination_dir: str) -> str:
 # ==========================================
 
 
+ProjectSort = Literal["id", "-id", "year", "-year", "name", "-name"]
+
+# Kolumny kursora dla każdego sortowania - id na końcu ujednoznacznia kolejność.
+# Indeksy na year i name zawierają rowid (= id), więc pokrywają całe ORDER BY.
+_PROJECT_SORT_COLUMNS = {
+    "id": ((models.Project.id,), (int,)),
+    "year": ((models.Project.year, models.Project.id), (int, int)),
+    "name": ((models.Project.name, models.Project.id), (str, int)),
+}
+
+
+def _project_filters(year: Optional[int], technology: Optional[str]):
+    criteria = []
+    if year is not None:
+        criteria.append(models.Project.year == year)
+    if technology:
+        # Indeks NOCASE na nazwie tagu + indeks (technology_id, project_id)
+        tagged = (
+            select(models.project_technologies.c.project_id)
+            .join(models.Technology)
+            .where(models.Technology.name == technology.strip())
+        )
+        criteria.append(models.Project.id.in_(tagged))
+    return criteria
+
+
+def list_projects(
+    db: Session,
+    skip: int = 0,
+    limit: int = 100,
+    cursor=None,
+    year: Optional[int] = None,
+    technology: Optional[str] = None,
+    sort: ProjectSort = "id",
+    fieldset: Optional[Fieldset] = None,
+):
+    """Strona projektów wraz z relacjami: (wiersze, następny_kursor)."""
+    field, descending = pagination.parse_sort(sort)
+    columns, cursor_types = _PROJECT_SORT_COLUMNS[field]
+    options = load_options(
+        models.Project,
+        fieldset,
+        PROJECT_RELATIONS,
+        extra_columns=[column.key for column in columns],
+    )
+    return pagination.paginate(
+        db.query(models.Project)
+        .options(*options)
+        .filter(*_project_filters(year, technology)),
+        columns=columns,
+        cursor_types=cursor_types,
+        skip=skip,
+        limit=limit,
+        cursor=cursor,
+        descending=descending,
+    )
+
+
+def _build_projects_page(
+    db: Session,
+    skip: int,
+    limit: int,
+    cursor,
+    year: Optional[int] = None,
+    technology: Optional[str] = None,
+    sort: ProjectSort = "id",
+    fieldset: Optional[Fieldset] = None,
+) -> CachedResponse:
+    projects, next_cursor = list_projects(
+        db, skip, limit, cursor, year, technology, sort, fieldset
+    )
+    total = pagination.cached_count(
+        db, models.Project, *_project_filters(year, technology)
+    )
+    headers = {pagination.TOTAL_COUNT_HEADER: str(total)}
+    if next_cursor:
+        headers[pagination.NEXT_CURSOR_HEADER] = next_cursor
+    serializer = _projects_serializer
+    if fieldset is not None:
+        serializer = serializer_for(schemas.Project, True, fieldset.fields)
+    return CachedResponse(serializer.dump_json(projects), headers)
+
+
+def _projects_page_key(
+    skip: int,
+    limit: int,
+    cursor,
+    year: Optional[int] = None,
+    technology: Optional[str] = None,
+    sort: ProjectSort = "id",
+    fieldset: Optional[Fieldset] = None,
+) -> tuple:
+    """Klucz strony w cache - wspólny dla listy i sekcji ``/api/home``."""
+    return ("projects", skip, limit, cursor, year, technology, sort, fieldset)
+
+
+def projects_section(
+    db: Session, skip: int = 0, limit: int = 100, cursor=None
+) -> CachedResponse:
+    """Zserializowana strona projektów - z pamięci podręcznej, jeśli aktualna."""
+    return response_cache.get_or_build(
+        _projects_page_key(skip, limit, cursor),
+        PROJECT_TABLES,
+        lambda: _build_projects_page(db, skip, limit, cursor),
+    )
+
+
 @router.get("/projects/", response_model=List[schemas.Project])
-def read_projects(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    """PUBLICZNY: Lista projektów (wraz ze zdjęciami i info o plikach)."""
-    projects = db.query(models.Project).offset(skip).limit(limit).all()
-    return projects
+async def read_projects(
+    request: Request,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    year: Optional[int] = None,
+    technology: Optional[str] = Query(None, max_length=100),
+    sort: ProjectSort = "id",
+    fields: Optional[str] = Query(None, max_length=FIELDS_MAX_LENGTH),
+    include: Optional[str] = Query(None, max_length=FIELDS_MAX_LENGTH),
+    db: DBSession = Depends(get_session),
+):
+    """
+    PUBLICZNY: Lista projektów (wraz ze zdjęciami i info o plikach).
+    Filtry: `year`, `technology`; sortowanie `sort` (np. `-year` malejąco).
+    Kolejna strona przez `cursor` z nagłówka X-Next-Cursor.
+    Wybór kolumn `fields` i relacji `include`, np. `fields=id,name&include=images`.
+    """
+    fieldset = parse_fieldset(schemas.Project, models.Project, fields, include)
+    return await cached_response(
+        request,
+        db,
+        _projects_page_key(skip, limit, cursor, year, technology, sort, fieldset),
+        PROJECT_TABLES,
+        lambda session: _build_projects_page(
+            session, skip, limit, cursor, year, technology, sort, fieldset
+        ),
+    )
 
 
 @router.get("/projects/{project_id}", response_model=schemas.Project)
-def read_project(project_id: int, db: Session = Depends(get_db)):
-    """PUBLICZNY: Szczegóły projektu."""
-    project = db.query(models.Project).filter(models.Project.id == project_id).first()
-    if project is None:
+async def read_project(
+    project_id: int,
+    request: Request,
+    fields: Optional[str] = Query(None, max_length=FIELDS_MAX_LENGTH),
+    include: Optional[str] = Query(None, max_length=FIELDS_MAX_LENGTH),
+    db: DBSession = Depends(get_session),
+):
+    """PUBLICZNY: Szczegóły projektu (`fields`/`include` jak w liście)."""
+    fieldset = parse_fieldset(schemas.Project, models.Project, fields, include)
+    options = load_options(
+        models.Project, fieldset, PROJECT_RELATIONS, extra_columns=["updated_at"]
+    )
+    serializer = _project_serializer
+    if fieldset is not None:
+        serializer = serializer_for(schemas.Project, False, fieldset.fields)
+
+    def build(session: Session):
+        project = (
+            session.query(models.Project)
+            .options(*options)
+            .filter(models.Project.id == project_id)
+            .first()
+        )
+        if project is None:
+            return None
+        headers = {}
+        if project.updated_at is not None:
+            headers["Last-Modified"] = http_date(project.updated_at)
+        return CachedResponse(serializer.dump_json(project), headers)
+
+    def last_modified(session: Session):
+        return (
+            session.query(models.Project.updated_at)
+            .filter(models.Project.id == project_id)
+            .scalar()
+        )
+
+    response = await cached_response(
+        request,
+        db,
+        ("project", project_id, fieldset),
+        PROJECT_TABLES,
+        build,
+        last_modified,
+    )
+    if response is None:
+        raise HTTPException(status_code=404, detail="Project not found")
+    return response
+
+
+def _get_project_or_404(db: Session, project_id: int) -> models.Project:
+    db_project = (
+        db.query(models.Project).filter(models.Project.id == project_id).first()
+    )
+    if db_project is None:
         raise HTTPException(status_code=404, detail="Project not found")
-    return project
+    return db_project
 
 
 @router.post(
@@ -61,13 +280,19 @@ def read_project(project_id: int, db: Session = Depends(get_db)):
     response_model=schemas.Project,
     dependencies=[Depends(verify_api_key)],
 )
-def create_project(project: schemas.ProjectCreate, db: Session = Depends(get_db)):
+async def create_project(
+    project: schemas.ProjectCreate, db: DBSession = Depends(get_session)
+):
     """ADMIN: Tworzenie projektu."""
-    db_project = models.Project(**project.model_dump())
-    db.add(db_project)
-    db.commit()
-    db.refresh(db_project)
-    return db_project
+
+    def create(session: Session):
+        db_project = models.Project(**project.model_dump())
+        session.add(db_project)
+        session.commit()
+        session.refresh(db_project)
+        return schemas.Project.model_validate(db_project)
+
+    return await db.run_sync(create)
 
 
 @router.put(
@@ -75,38 +300,41 @@ def create_project(project: schemas.ProjectCreate, db: Session = Depends(get_db)
     response_model=schemas.Project,
     dependencies=[Depends(verify_api_key)],
 )
-def update_project(
-    project_id: int, project: schemas.ProjectCreate, db: Session = Depends(get_db)
+async def update_project(
+    project_id: int,
+    project: schemas.ProjectCreate,
+    db: DBSession = Depends(get_session),
 ):
     """ADMIN: Edycja projektu."""
-    db_project = (
-        db.query(models.Project).filter(models.Project.id == project_id).first()
-    )
-    if db_project is None:
-        raise HTTPException(status_code=404, detail="Project not found")
 
-    update_data = project.model_dump(exclude_unset=True)
-    for key, value in update_data.items():
-        setattr(db_project, key, value)
+    def update(session: Session):
+        db_project = _get_project_or_404(session, project_id)
 
-    db.commit()
-    db.refresh(db_project)
-    return db_project
+        update_data = project.model_dump(exclude_unset=True)
+        for key, value in update_data.items():
+            setattr(db_project, key, value)
+
+        session.commit()
+        session.refresh(db_project)
+        return schemas.Project.model_validate(db_project)
+
+    return await db.run_sync(update)
 
 
 @router.delete("/admin/projects/{project_id}", dependencies=[Depends(verify_api_key)])
-def delete_project(project_id: int, db: Session = Depends(get_db)):
+async def delete_project(project_id: int, db: DBSession = Depends(get_session)):
     """ADMIN: Usuwanie projektu."""
-    db_project = (
-        db.query(models.Project).filter(models.Project.id == project_id).first()
-    )
-    if db_project is None:
-        raise HTTPException(status_code=404, detail="Project not found")
 
-    # Uwaga: Pliki powiązane z projektem powinny zostać usunięte z dysku ręcznie
-    # lub przez logikę w Pythonie, jeśli baza ma tylko ON DELETE CASCADE.
-    db.delete(db_project)
-    db.commit()
+    def delete(session: Session):
+        db_project = _get_project_or_404(session, project_id)
+        # Zdjęcia i pliki usuwa kaskada; z dysku znikają po commicie, jeśli
+        # nie wskazuje na nie już żaden inny wiersz
+        owned = owned_files(db_project)
+        session.delete(db_project)
+        session.commit()
+        release_files(session, owned)
+
+    await db.run_sync(delete)
     return {"message": "Project deleted successfully"}
 
 
@@ -123,62 +351,79 @@ def delete_project(project_id: int, db: Session = Depends(get_db)):
 async def upload_project_file(
     file: UploadFile = File(...),
     project_id: int = Form(...),
-    db: Session = Depends(get_db),
+    db: DBSession = Depends(get_session),
 ):
     """ADMIN: Upload kodów źródłowych (ZIP)."""
-    if not db.query(models.Project).filter(models.Project.id == project_id).first():
-        raise HTTPException(status_code=404, detail="Project not found")
+    await db.run_sync(_get_project_or_404, project_id)
 
-    allowed_extensions = ["zip", "rar", "7z", "tar", "gz", "bz2"]
     file_name = file.filename or "unknown_file"
-    file_ext = file_name.split(".")[-1].lower()
-    if file_ext not in allowed_extensions:
-        raise HTTPException(status_code=400, detail="Only archive files allowed.")
+    check_archive_name(file_name)
+
+    file_path = await save_upload(file, FILES_DIR)
+
+    def create(session: Session):
+        db_file = models.ProjectFiles(
+            file_path=file_path,
+            file_name=os.path.basename(file_name),
+            project_id=project_id,
+        )
+        session.add(db_file)
+        session.commit()
+        session.refresh(db_file)
+        return schemas.ProjectFiles.model_validate(db_file)
 
-    file_path = save_file(file, FILES_DIR)
-    db_file = models.ProjectFiles(file_path=file_path, project_id=project_id)
-    db.add(db_file)
-    db.commit()
-    db.refresh(db_file)
-    return db_file
+    return await db.run_sync(create)
 
 
 @router.delete(
     "/admin/projects/files/{file_id}", dependencies=[Depends(verify_api_key)]
 )
-def delete_project_file(file_id: int, db: Session = Depends(get_db)):
+async def delete_project_file(file_id: int, db: DBSession = Depends(get_session)):
     """ADMIN: Usuwanie kodów źródłowych."""
-    db_file = (
-        db.query(models.ProjectFiles).filter(models.ProjectFiles.id == file_id).first()
-    )
-    if not db_file:
-        raise HTTPException(status_code=404, detail="File not found")
 
-    if os.path.exists(str(db_file.file_path)):
-        os.remove(str(db_file.file_path))
+    def delete(session: Session):
+        db_file = (
+            session.query(models.ProjectFiles)
+            .filter(models.ProjectFiles.id == file_id)
+            .first()
+        )
+        if not db_file:
+            raise HTTPException(status_code=404, detail="File not found")
+
+        file_path = str(db_file.file_path)
+        session.delete(db_file)
+        session.commit()
+        release_file(session, file_path)
 
-    db.delete(db_file)
-    db.commit()
+    await db.run_sync(delete)
     return {"message": "File deleted successfully"}
 
 
 @router.get(
     "/admin/projects/files/{file_id}/download", dependencies=[Depends(verify_api_key)]
 )
-def download_project_file_admin(file_id: int, db: Session = Depends(get_db)):
+async def download_project_file_admin(
+    file_id: int, db: DBSession = Depends(get_session)
+):
     """
     ADMIN: Pobieranie kodów źródłowych.
     Brak publicznego odpowiednika (wymaga klucza API).
     """
-    db_file = (
-        db.query(models.ProjectFiles).filter(models.ProjectFiles.id == file_id).first()
-    )
+
+    def fetch(session: Session):
+        return (
+            session.query(models.ProjectFiles.file_path, models.ProjectFiles.file_name)
+            .filter(models.ProjectFiles.id == file_id)
+            .first()
+        )
+
+    db_file = await db.run_sync(fetch)
     if not db_file or not os.path.exists(str(db_file.file_path)):
         raise HTTPException(status_code=404, detail="File not found")
 
     return FileResponse(
         path=str(db_file.file_path),
-        filename=os.path.basename(str(db_file.file_path)),
+        filename=db_file.file_name or os.path.basename(str(db_file.file_path)),
         media_type="application/octet-stream",
     )
 
@@ -198,60 +443,72 @@ async def upload_executable(
     project_id: int = Form(...),
     version: str = Form(...),
     platform: str = Form(...),
-    db: Session = Depends(get_db),
+    db: DBSession = Depends(get_session),
 ):
     """ADMIN: Upload pliku .exe."""
-    if not db.query(models.Project).filter(models.Project.id == project_id).first():
-        raise HTTPException(status_code=404, detail="Project not found")
+    await db.run_sync(_get_project_or_404, project_id)
 
-    allowed_platforms = [p.value for p in models.Platforms]
-    if platform not in allowed_platforms:
-        raise HTTPException(
-            status_code=400, detail=f"Invalid platform. Choose: {allowed_platforms}"
+    check_platform(platform)
+
+    file_path = await save_upload(file, EXE_DIR)
+
+    def create(session: Session):
+        db_exe = models.ExecutableFile(
+            file_path=file_path,
+            file_name=os.path.basename(file.filename or "") or None,
+            version=version,
+            platform=platform,
+            project_id=project_id,
         )
+        session.add(db_exe)
+        session.commit()
+        session.refresh(db_exe)
+        return schemas.ExecutableFile.model_validate(db_exe)
 
-    file_path = save_file(file, EXE_DIR)
-    db_exe = models.ExecutableFile(
-        file_path=file_path, version=version, platform=platform, project_id=project_id
-    )
-    db.add(db_exe)
-    db.commit()
-    db.refresh(db_exe)
-    return db_exe
+    return await db.run_sync(create)
 
 
 @router.delete(
     "/admin/projects/executables/{exe_id}", dependencies=[Depends(verify_api_key)]
 )
-def delete_executable(exe_id: int, db: Session = Depends(get_db)):
+async def delete_executable(exe_id: int, db: DBSession = Depends(get_session)):
     """ADMIN: Usuwanie pliku .exe."""
-    db_exe = (
-        db.query(models.ExecutableFile)
-        .filter(models.ExecutableFile.id == exe_id)
-        .first()
-    )
-    if not db_exe:
-        raise HTTPException(status_code=404, detail="Executable not found")
 
-    if os.path.exists(str(db_exe.file_path)):
-        os.remove(str(db_exe.file_path))
+    def delete(session: Session):
+        db_exe = (
+            session.query(models.ExecutableFile)
+            .filter(models.ExecutableFile.id == exe_id)
+            .first()
+        )
+        if not db_exe:
+            raise HTTPException(status_code=404, detail="Executable not found")
+
+        file_path = str(db_exe.file_path)
+        session.delete(db_exe)
+        session.commit()
+        release_file(session, file_path)
 
-    db.delete(db_exe)
-    db.commit()
+    await db.run_sync(delete)
     return {"message": "Executable deleted successfully"}
 
 
 @router.get("/download/executable/{exe_id}")
-def download_executable_public(exe_id: int, db: Session = Depends(get_db)):
+async def download_executable_public(exe_id: int, db: DBSession = Depends(get_session)):
     """
     PUBLICZNY: Pobieranie pliku .exe.
     Brak wymogu verify_api_key.
     """
-    db_exe = (
-        db.query(models.ExecutableFile)
-        .filter(models.ExecutableFile.id == exe_id)
-        .first()
-    )
+
+    def fetch(session: Session):
+        return (
+            session.query(
+                models.ExecutableFile.file_path, models.ExecutableFile.file_name
+            )
+            .filter(models.ExecutableFile.id == exe_id)
+            .first()
+        )
+
+    db_exe = await db.run_sync(fetch)
     if not db_exe:
         raise HTTPException(status_code=404, detail="Executable not found")
 
@@ -260,6 +517,68 @@ def download_executable_public(exe_id: int, db: Session = Depends(get_db)):
 
     return FileResponse(
         path=str(db_exe.file_path),
-        filename=os.path.basename(str(db_exe.file_path)),
+        filename=db_exe.file_name or os.path.basename(str(db_exe.file_path)),
         media_type="application/octet-stream",
     )
+
+
+# ==========================================
+# OPERACJE ZBIORCZE - TYLKO ADMIN
+# ==========================================
+
+_project_create_adapter = TypeAdapter(schemas.ProjectCreate)
+_project_update_adapter = TypeAdapter(schemas.ProjectBatchUpdate)
+# _sync_tags czyta obecne tagi każdego projektu - ładujemy je jednym zapytaniem
+_BATCH_LOAD_OPTIONS = (selectinload(models.Project.tags),)
+
+
+@router.post(
+    "/admin/batch/projects",
+    response_model=List[schemas.BatchItemResult],
+    dependencies=[Depends(verify_api_key)],
+)
+async def batch_create_projects(
+    items: List[Any] = Body(..., max_length=batch.BATCH_MAX_ITEMS),
+    db: DBSession = Depends(get_session),
+):
+    """ADMIN: Tworzenie wielu projektów w jednej transakcji."""
+    return await db.run_sync(
+        batch.batch_create, models.Project, _project_create_adapter, items
+    )
+
+
+@router.put(
+    "/admin/batch/projects",
+    response_model=List[schemas.BatchItemResult],
+    dependencies=[Depends(verify_api_key)],
+)
+async def batch_update_projects(
+    items: List[Any] = Body(..., max_length=batch.BATCH_MAX_ITEMS),
+    db: DBSession = Depends(get_session),
+):
+    """ADMIN: Edycja wielu projektów (elementy z polem ``id``)."""
+    return await db.run_sync(
+        batch.batch_update,
+        models.Project,
+        _project_update_adapter,
+        items,
+        _BATCH_LOAD_OPTIONS,
+    )
+
+
+@router.delete(
+    "/admin/batch/projects",
+    response_model=List[schemas.BatchItemResult],
+    dependencies=[Depends(verify_api_key)],
+)
+async def batch_delete_projects(
+    ids: List[int] = Body(..., max_length=batch.BATCH_MAX_ITEMS),
+    db: DBSession = Depends(get_session),
+):
+    """ADMIN: Usuwanie wielu projektów."""
+    return await db.run_sync(
+        batch.batch_delete,
+        models.Project,
+        ids,
+        _BATCH_LOAD_OPTIONS + PROJECT_LOAD_OPTIONS,
+    )
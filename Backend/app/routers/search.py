@@ -0,0 +1,39 @@
+from typing import List
+
+from fastapi import APIRouter, Depends, Query, Request
+from pydantic import TypeAdapter
+from sqlalchemy.orm import Session
+
+from ..cache import CachedResponse, cached_response, dump_json
+from ..db import search as search_index
+from ..dependencies import DBSession, get_session
+from ..models import schemas
+
+router = APIRouter()
+
+# Indeks jest aktualizowany w tych samych commitach co te tabele
+SEARCH_TABLES = ("projects", "events")
+
+_results_adapter = TypeAdapter(List[schemas.SearchResult])
+
+
+@router.get("/search", response_model=List[schemas.SearchResult])
+async def search_content(
+    request: Request,
+    q: str = Query(..., min_length=1, max_length=200),
+    limit: int = Query(20, ge=1, le=100),
+    db: DBSession = Depends(get_session),
+):
+    """
+    PUBLICZNY: Wyszukiwanie pełnotekstowe w projektach i wydarzeniach.
+    Wyniki posortowane od najlepiej dopasowanych; ostatnie słowo może być
+    niepełne ("kol" znajdzie "koło").
+    """
+
+    def build(session: Session) -> CachedResponse:
+        results = search_index.search(session, q, limit)
+        return CachedResponse(dump_json(_results_adapter, results))
+
+    return await cached_response(
+        request, db, ("search", q, limit), SEARCH_TABLES, build
+    )
@@ -0,0 +1,40 @@
+from typing import List
+
+from fastapi import APIRouter, Depends, Request
+from pydantic import TypeAdapter
+from sqlalchemy.orm import Session
+
+from ..cache import CachedResponse, cached_response, dump_json
+from ..dependencies import DBSession, get_session
+from ..models import models, schemas
+
+router = APIRouter()
+
+TECHNOLOGY_TABLES = ("technologies",)
+
+_technologies_adapter = TypeAdapter(List[schemas.Technology])
+
+
+def list_technologies(db: Session) -> List[models.Technology]:
+    """Tagi używane przez co najmniej jeden projekt, najpopularniejsze pierwsze."""
+    return (
+        db.query(models.Technology)
+        .filter(models.Technology.project_count > 0)
+        .order_by(models.Technology.project_count.desc(), models.Technology.name)
+        .all()
+    )
+
+
+@router.get("/technologies", response_model=List[schemas.Technology])
+async def read_technologies(request: Request, db: DBSession = Depends(get_session)):
+    """
+    PUBLICZNY: Technologie z liczbą projektów (do filtra `technology`).
+    Liczniki są utrzymywane przy zapisie projektów - odczyt to zwykły SELECT.
+    """
+
+    def build(session: Session) -> CachedResponse:
+        return CachedResponse(
+            dump_json(_technologies_adapter, list_technologies(session))
+        )
+
+    return await cached_response(request, db, "technologies", TECHNOLOGY_TABLES, build)
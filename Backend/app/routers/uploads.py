@@ -0,0 +1,393 @@
+"""
+Wznawialne przesyłanie dużych plików wykonywalnych i archiwów.
+
+1. POST   /admin/uploads/                 - utworzenie sesji
+2. PUT    /admin/uploads/{id}?offset=N    - kolejny kawałek (surowe bajty)
+3. GET    /admin/uploads/{id}             - ile bajtów serwer już ma
+4. POST   /admin/uploads/{id}/finalize    - utworzenie ExecutableFile/ProjectFiles
+
+Kawałki są dopisywane bezpośrednio do pliku roboczego, a skrót SHA-256
+jest liczony na bieżąco, więc finalizacja nie czyta ponownie całego pliku
+(chyba że serwer był w międzyczasie restartowany). Porzucone sesje są
+usuwane przy tworzeniu nowej sesji, przy każdej finalizacji oraz w tle co
+``settings.upload_purge_interval`` sekund.
+
+Blokada sesji działa w obrębie procesu; między workerami offset chroni
+warunkowy UPDATE (``WHERE received = :offset``) - PUT, który przegrał
+wyścig, dostaje 409 i klient wznawia od aktualnego ``received``.
+"""
+
+import asyncio
+import hashlib
+import logging
+import os
+import uuid
+from contextlib import asynccontextmanager
+from datetime import timedelta
+from typing import BinaryIO, Dict, Tuple, Union
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from sqlalchemy import update
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+from starlette.requests import ClientDisconnect
+
+from ..config import settings
+from ..db.database import SessionLocal
+from ..dependencies import DBSession, get_session, verify_api_key
+from ..models import models, schemas
+from ..storage import CHUNK_SIZE, adopt_file, file_extension, sha256_of
+from . import projects
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+STAGING_DIR = settings.upload_staging_dir
+
+# Skróty liczone przyrostowo: id sesji -> (liczba zahaszowanych bajtów, hasher)
+_hashers: Dict[str, Tuple[int, "hashlib._Hash"]] = {}
+# Jedna operacja naraz dla danej sesji; blokada znika razem z sesją
+_locks: Dict[str, asyncio.Lock] = {}
+
+
+def staging_path(upload_id: str) -> str:
+    return os.path.join(STAGING_DIR, upload_id + ".part")
+
+
+def _expires_at():
+    return models.utcnow() + timedelta(seconds=settings.upload_session_ttl)
+
+
+def _discard(upload_id: str) -> None:
+    _hashers.pop(upload_id, None)
+    _locks.pop(upload_id, None)
+    try:
+        os.remove(staging_path(upload_id))
+    except FileNotFoundError:
+        pass
+
+
+def purge_expired_sessions(db: Session) -> int:
+    """Usuwa porzucone sesje wraz z ich plikami roboczymi."""
+    expired = (
+        db.query(models.UploadSession)
+        .filter(models.UploadSession.expires_at < models.utcnow())
+        .all()
+    )
+    purged = 0
+    for upload in expired:
+        lock = _locks.get(upload.id)
+        if lock is not None and lock.locked():
+            # Trwa zapis kawałka - po nim sesja i tak dostanie nowy termin
+            continue
+        _discard(upload.id)
+        db.delete(upload)
+        purged += 1
+    if purged:
+        db.commit()
+    return purged
+
+
+def _purge_in_new_session() -> int:
+    with SessionLocal() as db:
+        return purge_expired_sessions(db)
+
+
+async def purge_periodically(interval: float) -> None:
+    """Zadanie w tle: co ``interval`` sekund usuwa porzucone sesje."""
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            purged = await run_in_threadpool(_purge_in_new_session)
+        except Exception:
+            logger.exception("Purging expired upload sessions failed")
+            continue
+        if purged:
+            logger.info("Purged %d expired upload sessions", purged)
+
+
+def _get_session(db: Session, upload_id: str) -> models.UploadSession:
+    upload = (
+        db.query(models.UploadSession)
+        .filter(models.UploadSession.id == upload_id)
+        .first()
+    )
+    if upload is None or upload.expires_at < models.utcnow():
+        raise HTTPException(status_code=404, detail="Upload session not found")
+    return upload
+
+
+@asynccontextmanager
+async def _session_lock(db: DBSession, upload_id: str):
+    """
+    Blokada sesji przesyłania. Tworzona dopiero dla istniejącej sesji, a gdy
+    sesja zniknie w czasie oczekiwania (finalizacja, przerwanie, wygaśnięcie),
+    blokada jest zwalniana razem z nią.
+    """
+    await db.run_sync(_get_session, upload_id)
+    lock = _locks.setdefault(upload_id, asyncio.Lock())
+    async with lock:
+        try:
+            yield
+        except HTTPException as exc:
+            if exc.status_code == 404:
+                _locks.pop(upload_id, None)
+            raise
+
+
+@router.post(
+    "/admin/uploads/",
+    response_model=schemas.UploadSession,
+    dependencies=[Depends(verify_api_key)],
+)
+async def create_upload_session(
+    upload: schemas.UploadSessionCreate, db: DBSession = Depends(get_session)
+):
+    """ADMIN: Rozpoczęcie przesyłania pliku w kawałkach."""
+
+    def create(session: Session):
+        purge_expired_sessions(session)
+
+        project = (
+            session.query(models.Project)
+            .filter(models.Project.id == upload.project_id)
+            .first()
+        )
+        if project is None:
+            raise HTTPException(status_code=404, detail="Project not found")
+        if upload.kind == schemas.UploadKind.PROJECT_FILE:
+            projects.check_archive_name(upload.file_name)
+        else:
+            if not upload.version or upload.platform is None:
+                raise HTTPException(
+                    status_code=400,
+                    detail="Executable uploads require version and platform",
+                )
+            projects.check_platform(upload.platform)
+
+        db_upload = models.UploadSession(
+            id=uuid.uuid4().hex,
+            kind=upload.kind.value,
+            file_name=os.path.basename(upload.file_name),
+            total_size=upload.total_size,
+            received=0,
+            project_id=upload.project_id,
+            version=upload.version,
+            platform=upload.platform,
+            expires_at=_expires_at(),
+        )
+        os.makedirs(STAGING_DIR, exist_ok=True)
+        open(staging_path(db_upload.id), "wb").close()
+        _hashers[db_upload.id] = (0, hashlib.sha256())
+
+        session.add(db_upload)
+        session.commit()
+        session.refresh(db_upload)
+        return schemas.UploadSession.model_validate(db_upload)
+
+    return await db.run_sync(create)
+
+
+@router.get(
+    "/admin/uploads/{upload_id}",
+    response_model=schemas.UploadSession,
+    dependencies=[Depends(verify_api_key)],
+)
+async def read_upload_session(upload_id: str, db: DBSession = Depends(get_session)):
+    """ADMIN: Stan sesji - `received` to offset, od którego należy wznowić."""
+
+    def read(session: Session):
+        return schemas.UploadSession.model_validate(_get_session(session, upload_id))
+
+    return await db.run_sync(read)
+
+
+def _open_at(path: str, offset: int) -> BinaryIO:
+    staging = open(path, "r+b")
+    staging.seek(offset)
+    return staging
+
+
+@router.put(
+    "/admin/uploads/{upload_id}",
+    response_model=schemas.UploadSession,
+    dependencies=[Depends(verify_api_key)],
+)
+async def upload_chunk(
+    upload_id: str,
+    request: Request,
+    offset: int = Query(..., ge=0),
+    db: DBSession = Depends(get_session),
+):
+    """
+    ADMIN: Kolejny kawałek pliku jako surowe ciało żądania.
+    `offset` musi być równy liczbie bajtów już odebranych (inaczej 409).
+    """
+
+    def check_offset(session: Session) -> int:
+        upload = _get_session(session, upload_id)
+        if offset != upload.received:
+            raise HTTPException(
+                status_code=409,
+                detail=f"Offset mismatch, expected {upload.received}",
+            )
+        return upload.total_size
+
+    def record_progress(session: Session, position: int):
+        # Warunek na `received` - blokada obejmuje tylko ten proces, a równoległy
+        # PUT w innym workerze mógł już przesunąć offset
+        updated = session.execute(
+            update(models.UploadSession)
+            .where(
+                models.UploadSession.id == upload_id,
+                models.UploadSession.received == offset,
+            )
+            .values(received=position, expires_at=_expires_at())
+        ).rowcount
+        session.commit()
+        if not updated:
+            _hashers.pop(upload_id, None)
+            raise HTTPException(
+                status_code=409, detail="Upload session changed concurrently"
+            )
+        upload = _get_session(session, upload_id)
+        session.refresh(upload)
+        return schemas.UploadSession.model_validate(upload)
+
+    async with _session_lock(db, upload_id):
+        total_size = await db.run_sync(check_offset)
+
+        hashed_upto, hasher = _hashers.get(upload_id, (None, None))
+        if hashed_upto != offset:
+            # Po restarcie procesu skrót zostanie policzony przy finalizacji
+            hasher = None
+
+        # Plik otwierany raz na żądanie; kawałki ciała (ok. 64 KiB) są
+        # zbierane i zapisywane po kolei paczkami po CHUNK_SIZE
+        staging = await run_in_threadpool(_open_at, staging_path(upload_id), offset)
+        position = offset
+        pending = bytearray()
+
+        async def flush():
+            nonlocal position, pending
+            if pending:
+                await run_in_threadpool(staging.write, pending)
+                if hasher is not None:
+                    hasher.update(pending)
+                position += len(pending)
+                pending = bytearray()
+
+        try:
+            async for chunk in request.stream():
+                if position + len(pending) + len(chunk) > total_size:
+                    raise HTTPException(
+                        status_code=413, detail="Chunk exceeds declared file size"
+                    )
+                pending += chunk
+                if len(pending) >= CHUNK_SIZE:
+                    await flush()
+        except ClientDisconnect:
+            # Zapisujemy to, co dotarło - klient wznowi od `received`
+            pass
+        finally:
+            try:
+                await flush()
+            finally:
+                await run_in_threadpool(staging.close)
+                if hasher is not None:
+                    _hashers[upload_id] = (position, hasher)
+                else:
+                    _hashers.pop(upload_id, None)
+                result = await db.run_sync(record_progress, position)
+
+    return result
+
+
+async def _adopt_staging_file(upload: models.UploadSession) -> str:
+    """Przenosi kompletny plik roboczy do magazynu plików projektu."""
+    path = staging_path(upload.id)
+    hashed_upto, hasher = _hashers.get(upload.id, (None, None))
+    if hasher is not None and hashed_upto == upload.total_size:
+        digest = hasher.hexdigest()
+    else:
+
+        def rehash():
+            with open(path, "rb") as staging:
+                return sha256_of(staging)
+
+        digest = await run_in_threadpool(rehash)
+
+    if upload.kind == models.UploadKind.EXECUTABLE:
+        destination_dir = projects.EXE_DIR
+    else:
+        destination_dir = projects.FILES_DIR
+    return await run_in_threadpool(
+        adopt_file, path, destination_dir, digest, file_extension(upload.file_name)
+    )
+
+
+@router.post(
+    "/admin/uploads/{upload_id}/finalize",
+    response_model=Union[schemas.ExecutableFile, schemas.ProjectFiles],
+    dependencies=[Depends(verify_api_key)],
+)
+async def finalize_upload(upload_id: str, db: DBSession = Depends(get_session)):
+    """ADMIN: Zakończenie przesyłania - plik trafia do magazynu i do bazy."""
+
+    def check_complete(session: Session) -> models.UploadSession:
+        purge_expired_sessions(session)
+        upload = _get_session(session, upload_id)
+        if upload.received != upload.total_size:
+            raise HTTPException(
+                status_code=409,
+                detail=f"Upload incomplete: {upload.received}/{upload.total_size}"
+                " bytes",
+            )
+        return upload
+
+    def create(session: Session, upload: models.UploadSession, file_path: str):
+        is_executable = upload.kind == models.UploadKind.EXECUTABLE
+        if is_executable:
+            db_file = models.ExecutableFile(
+                file_path=file_path,
+                file_name=upload.file_name,
+                version=upload.version,
+                platform=upload.platform,
+                project_id=upload.project_id,
+            )
+        else:
+            db_file = models.ProjectFiles(
+                file_path=file_path,
+                file_name=upload.file_name,
+                project_id=upload.project_id,
+            )
+        session.add(db_file)
+        session.delete(upload)
+        session.commit()
+        session.refresh(db_file)
+        if is_executable:
+            return schemas.ExecutableFile.model_validate(db_file)
+        return schemas.ProjectFiles.model_validate(db_file)
+
+    # Pod blokadą - równoległa finalizacja dostaje 404 zamiast drugiego zapisu
+    async with _session_lock(db, upload_id):
+        upload = await db.run_sync(check_complete)
+        file_path = await _adopt_staging_file(upload)
+        result = await db.run_sync(create, upload, file_path)
+        _discard(upload_id)
+    return result
+
+
+@router.delete("/admin/uploads/{upload_id}", dependencies=[Depends(verify_api_key)])
+async def abort_upload(upload_id: str, db: DBSession = Depends(get_session)):
+    """ADMIN: Przerwanie przesyłania i usunięcie pliku roboczego."""
+
+    def abort(session: Session):
+        session.delete(_get_session(session, upload_id))
+        session.commit()
+
+    async with _session_lock(db, upload_id):
+        await db.run_sync(abort)
+        _discard(upload_id)
+    return {"message": "Upload aborted successfully"}
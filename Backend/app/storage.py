@@ -0,0 +1,279 @@
+"""
+Zapis przesłanych plików na dysk bez blokowania pętli zdarzeń.
+
+Kopiowanie odbywa się w puli wątków, w kawałkach o stałym rozmiarze, do
+pliku tymczasowego w katalogu docelowym. Dopiero kompletny plik jest
+atomowo przemianowywany (``os.replace``), więc równoległe odczyty
+(np. przez ``/static``) nigdy nie widzą połowy pliku.
+
+Pliki są adresowane treścią: nazwą jest skrót SHA-256, a katalog jest
+dzielony na podkatalogi po pierwszych znakach skrótu
+(``static/images/ab/cd/abcd...ef.jpg``). Ten sam plik przesłany wiele razy
+zajmuje miejsce raz - skrót jest liczony z buforu uploadu (pamięć albo plik
+tymczasowy Starlette), a kopiowanie odbywa się tylko, gdy pliku jeszcze nie
+ma. Plik jest usuwany z dysku dopiero, gdy nie wskazuje na niego żaden
+wiersz ``Image``/``ProjectFiles``/``ExecutableFile``.
+
+Ponowne użycie istniejącego pliku (sprawdzenie + oznaczenie) i usuwanie
+nieużywanego (sprawdzenie referencji + ``os.remove``) są wykonywane pod
+wspólną blokadą ``_blob_lock``, więc upload nie może dostać ścieżki pliku,
+który za chwilę zostanie usunięty. Ponowne użycie odświeża też czas
+modyfikacji pliku - okres karencji ``app.reconciler`` działa między procesami.
+"""
+
+import hashlib
+import os
+import re
+import shutil
+import tempfile
+import threading
+import time
+from itertools import chain
+from typing import BinaryIO, Dict, Iterable, List, Sequence, Set, Tuple
+
+from fastapi import UploadFile
+from sqlalchemy import func, select, union_all
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from .models import models
+
+CHUNK_SIZE = 1024 * 1024  # 1 MiB
+
+# Ile sekund po ponownym użyciu pliku nie wolno go usunąć - upload, który
+# właśnie trafił na istniejący plik, mógł jeszcze nie zatwierdzić swojego wiersza.
+REUSE_GRACE_SECONDS = 60.0
+
+_EXTENSION_RE = re.compile(r"^\.[a-z0-9]{1,10}$")
+
+# Tabele przechowujące ścieżki do plików (liczenie referencji)
+FILE_MODELS = (models.Image, models.ProjectFiles, models.ExecutableFile)
+
+_reused_lock = threading.Lock()
+# Ponowne użycie pliku vs usunięcie nieużywanego (patrz opis modułu)
+_blob_lock = threading.Lock()
+_recently_reused: Dict[str, float] = {}
+
+# Liczba ścieżek sprawdzanych jednym zapytaniem w referenced_paths
+REFERENCE_BATCH = 500
+
+TEMP_PREFIX = ".upload-"
+TEMP_SUFFIX = ".part"
+
+
+def _unlink_quietly(path: str) -> None:
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+def write_atomically(source: BinaryIO, destination_dir: str, file_name: str) -> str:
+    """Synchronicznie kopiuje ``source`` do ``destination_dir/file_name``."""
+    os.makedirs(destination_dir, exist_ok=True)
+    file_path = os.path.join(destination_dir, file_name)
+
+    fd, temp_path = tempfile.mkstemp(
+        dir=destination_dir, prefix=TEMP_PREFIX, suffix=TEMP_SUFFIX
+    )
+    try:
+        with os.fdopen(fd, "wb") as buffer:
+            shutil.copyfileobj(source, buffer, CHUNK_SIZE)
+        # mkstemp tworzy plik 0600 - pliki statyczne muszą być czytelne
+        os.chmod(temp_path, 0o644)
+        os.replace(temp_path, file_path)
+    except BaseException:
+        _unlink_quietly(temp_path)
+        raise
+    return file_path
+
+
+def file_extension(file_name: str) -> str:
+    """Rozszerzenie (z kropką, małymi literami) albo pusty napis."""
+    extension = os.path.splitext(file_name)[1].lower()
+    return extension if _EXTENSION_RE.match(extension) else ""
+
+
+def blob_path(destination_dir: str, digest: str, extension: str = "") -> str:
+    return os.path.join(destination_dir, digest[:2], digest[2:4], digest + extension)
+
+
+def sha256_of(source: BinaryIO) -> str:
+    hasher = hashlib.sha256()
+    while chunk := source.read(CHUNK_SIZE):
+        hasher.update(chunk)
+    return hasher.hexdigest()
+
+
+def _mark_reused(path: str) -> None:
+    now = time.monotonic()
+    with _reused_lock:
+        _recently_reused[path] = now
+        # Sprzątanie starych wpisów, żeby słownik nie rósł bez końca
+        for stale in [
+            p for p, t in _recently_reused.items() if now - t > REUSE_GRACE_SECONDS
+        ]:
+            del _recently_reused[stale]
+
+
+def _reuse_existing(path: str) -> bool:
+    """Oznacza istniejący plik jako użyty ponownie; False - pliku nie ma."""
+    with _blob_lock:
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            return False
+        _mark_reused(path)
+    return True
+
+
+def recently_reused(path: str) -> bool:
+    """Plik trafił niedawno do uploadu - jego wiersz może nie być jeszcze w bazie."""
+    with _reused_lock:
+        reused_at = _recently_reused.get(path)
+    return reused_at is not None and time.monotonic() - reused_at < REUSE_GRACE_SECONDS
+
+
+def store_content_addressed(
+    source: BinaryIO, destination_dir: str, extension: str = ""
+) -> str:
+    """
+    Synchronicznie zapisuje ``source`` pod ścieżką wyznaczoną przez jego skrót.
+    Jeśli taki plik już istnieje, nic nie jest zapisywane.
+    """
+    source.seek(0)
+    digest = sha256_of(source)
+    path = blob_path(destination_dir, digest, extension)
+    if _reuse_existing(path):
+        return path
+    source.seek(0)
+    return write_atomically(source, os.path.dirname(path), os.path.basename(path))
+
+
+async def save_upload(file: UploadFile, destination_dir: str) -> str:
+    """Zapisuje przesłany plik (adresowany treścią) i zwraca jego ścieżkę."""
+    extension = file_extension(file.filename or "")
+    return await run_in_threadpool(
+        store_content_addressed, file.file, destination_dir, extension
+    )
+
+
+def count_references(db: Session, file_path: str) -> int:
+    """Liczba wierszy (we wszystkich tabelach plików) wskazujących na ścieżkę."""
+    references = union_all(
+        *(select(model.id).where(model.file_path == file_path) for model in FILE_MODELS)
+    ).subquery()
+    return db.execute(select(func.count()).select_from(references)).scalar_one()
+
+
+def referenced_paths(db: Session, paths: Sequence[str]) -> Set[str]:
+    """Które z podanych ścieżek wskazuje jakiś wiersz (wyszukanie po indeksach)."""
+    found = set()
+    # Paczki - limit parametrów w jednym zapytaniu SQLite
+    for start in range(0, len(paths), REFERENCE_BATCH):
+        chunk = paths[start : start + REFERENCE_BATCH]
+        references = union_all(
+            *(
+                select(model.file_path).where(model.file_path.in_(chunk))
+                for model in FILE_MODELS
+            )
+        )
+        found.update(db.execute(references).scalars())
+    return found
+
+
+def release_file(db: Session, file_path: str) -> bool:
+    """
+    Usuwa plik z dysku, jeśli nie wskazuje na niego już żaden wiersz.
+    Wywoływać po commicie usunięcia wiersza. Zwraca True, gdy plik usunięto.
+    """
+    with _blob_lock:
+        if recently_reused(file_path) or count_references(db, file_path) > 0:
+            return False
+        try:
+            os.remove(file_path)
+        except FileNotFoundError:
+            return False
+    return True
+
+
+def adopt_file(
+    temp_path: str, destination_dir: str, digest: str, extension: str = ""
+) -> str:
+    """
+    Przenosi gotowy plik (o znanym skrócie) do magazynu adresowanego treścią.
+    Plik jest przemianowywany, a nie kopiowany; duplikat jest po prostu usuwany.
+    """
+    path = blob_path(destination_dir, digest, extension)
+    if _reuse_existing(path):
+        _unlink_quietly(temp_path)
+        return path
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    os.chmod(temp_path, 0o644)
+    try:
+        os.replace(temp_path, path)
+    except OSError:
+        # Katalog tymczasowy na innym systemie plików - kopiujemy atomowo
+        with open(temp_path, "rb") as source:
+            write_atomically(source, os.path.dirname(path), os.path.basename(path))
+        _unlink_quietly(temp_path)
+    return path
+
+
+# Plik wraz z plikami pochodnymi (warianty zdjęcia) - usuwane razem
+OwnedFile = Tuple[str, List[str]]
+
+
+def owned_files(obj) -> List[OwnedFile]:
+    """Pliki należące do wydarzenia/projektu; zebrać przed usunięciem wiersza."""
+    owned = [
+        (image.file_path, [v["file_path"] for v in image.variants or []])
+        for image in obj.images
+    ]
+    for file in chain(getattr(obj, "files", ()), getattr(obj, "executable", ())):
+        owned.append((file.file_path, []))
+    return owned
+
+
+def release_files(db: Session, files: Iterable[OwnedFile]) -> int:
+    """
+    Zbiorczy ``release_file``: jedno zapytanie o referencje dla wszystkich
+    ścieżek. Wywoływać po commicie; zwraca liczbę usuniętych plików.
+    """
+    files = [(path, derived) for path, derived in files if path]
+    removed = 0
+    with _blob_lock:
+        still_used = referenced_paths(db, list({path for path, _ in files}))
+        for path, derived in files:
+            if path in still_used or recently_reused(path):
+                continue
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                continue
+            removed += 1
+            for derived_path in derived:
+                _unlink_quietly(derived_path)
+    return removed
+
+
+def remove_orphans(db: Session, paths: Sequence[str], older_than: float) -> List[str]:
+    """
+    Usuwa pliki, na które nadal nie wskazuje żaden wiersz, nieużyte niedawno
+    ponownie i niezmienione od ``older_than`` (znacznik czasu). Referencje są
+    sprawdzane ponownie pod ``_blob_lock``; zwraca usunięte ścieżki.
+    """
+    removed = []
+    with _blob_lock:
+        still_used = referenced_paths(db, list(paths))
+        for path in paths:
+            if path in still_used or recently_reused(path):
+                continue
+            try:
+                if os.stat(path).st_mtime > older_than:
+                    continue
+                os.remove(path)
+            except FileNotFoundError:
+                continue
+            removed.append(path)
+    return removed
@@ -0,0 +1,483 @@
+"""
+Opóźnienia i liczba zapytań SQL dla endpointów API na dużym, syntetycznym
+zbiorze danych.
+
+Zbiór (domyślnie 50k wydarzeń, 10k projektów ze zdjęciami, plikami
+i wersjami do pobrania) jest wstawiany masowo do tymczasowej bazy, a każdy
+endpoint - publiczny i administracyjny - jest wywoływany przez aplikację
+ASGI (``TestClient``, bez sieci). Wynik to p50/p95/p99, przepustowość
+i liczba zapytań SQL na żądanie dla każdego endpointu, zapisywane do JSON.
+
+Uruchomienie (z katalogu Backend):
+    python -m benchmarks.bench_api --output bench.json
+    python -m benchmarks.bench_api --events 5000 --projects 1000 \\
+        --baseline bench.json --output bench-new.json
+
+Parametry żądań są losowane z ustalonego ziarna, więc dwa przebiegi z tymi
+samymi argumentami wysyłają te same żądania i dają porównywalne wyniki.
+"""
+
+import argparse
+import itertools
+import json
+import os
+import platform
+import random
+import sqlite3
+import statistics
+import subprocess
+import tempfile
+import time
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, NamedTuple, Optional
+
+import sqlalchemy
+from sqlalchemy import event, insert
+from sqlalchemy.orm import sessionmaker
+
+from app.cache import response_cache
+from app.config import settings
+from app.db import search
+from app.db.database import Base, create_db_engine
+from app.db.migrations import migrate_technology_tags
+from app.dependencies import SyncSessionRunner, get_db, get_session
+from app.models import models
+from app.pagination import clear_count_cache
+
+API_KEY_HEADERS = {"X-API-Key": settings.admin_api_key}
+
+TECHNOLOGIES = (
+    "Python FastAPI React C++ Rust Go Unity Godot Arduino ROS OpenCV PyTorch "
+    "TensorFlow Raylib SDL Vue Svelte Kotlin Swift Java Docker Kubernetes"
+).split()
+WORDS = (
+    "robot gra silnik sieć dron czujnik aplikacja serwer konkurs warsztaty "
+    "drukarka symulacja fizyka grafika shader mapa audio kamera lidar"
+).split()
+
+INSERT_CHUNK = 5000
+
+
+class Dataset(NamedTuple):
+    events: int
+    projects: int
+    images_per_project: int
+    files_per_project: int
+    images_per_event: int
+
+
+def _text(rng: random.Random, length: int) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(length))
+
+
+def _insert_chunked(conn, model, rows: List[dict]) -> None:
+    for start in range(0, len(rows), INSERT_CHUNK):
+        conn.execute(insert(model.__table__), rows[start : start + INSERT_CHUNK])
+
+
+def seed(engine, dataset: Dataset, rng: random.Random) -> None:
+    """Masowe INSERT-y (executemany) z pominięciem ORM; potem tagi i indeks FTS."""
+    start_date = datetime(2015, 1, 1)
+    with engine.begin() as conn:
+        _insert_chunked(
+            conn,
+            models.Event,
+            [
+                {
+                    "id": i,
+                    "name": f"{_text(rng, 2)} {i}",
+                    "date": start_date + timedelta(hours=rng.randrange(24 * 3650)),
+                    "description": _text(rng, 30),
+                    "updated_at": models.utcnow(),
+                }
+                for i in range(1, dataset.events + 1)
+            ],
+        )
+        _insert_chunked(
+            conn,
+            models.Project,
+            [
+                {
+                    "id": i,
+                    "name": f"{_text(rng, 2)} {i}",
+                    "description": _text(rng, 40),
+                    "technologies": ", ".join(rng.sample(TECHNOLOGIES, 3)),
+                    "year": rng.randint(2015, 2025),
+                    "updated_at": models.utcnow(),
+                }
+                for i in range(1, dataset.projects + 1)
+            ],
+        )
+        images = [
+            {
+                "file_path": f"static/images/bench/p{i}-{n}.jpg",
+                "project_id": i,
+                "event_id": None,
+            }
+            for i in range(1, dataset.projects + 1)
+            for n in range(dataset.images_per_project)
+        ]
+        images += [
+            {
+                "file_path": f"static/images/bench/e{i}-{n}.jpg",
+                "project_id": None,
+                "event_id": i,
+            }
+            for i in range(1, dataset.events + 1)
+            for n in range(dataset.images_per_event)
+        ]
+        _insert_chunked(conn, models.Image, images)
+        _insert_chunked(
+            conn,
+            models.ProjectFiles,
+            [
+                {
+                    "file_path": f"static/project_files/bench/{i}-{n}.zip",
+                    "file_name": f"source-{n}.zip",
+                    "project_id": i,
+                }
+                for i in range(1, dataset.projects + 1)
+                for n in range(dataset.files_per_project)
+            ],
+        )
+        _insert_chunked(
+            conn,
+            models.ExecutableFile,
+            [
+                {
+                    "file_path": f"static/executables/bench/{i}.exe",
+                    "file_name": "setup.exe",
+                    "version": "1.0",
+                    "platform": models.Platforms.WIN.name,
+                    "project_id": i,
+                }
+                for i in range(1, dataset.projects + 1)
+            ],
+        )
+        conn.execute(
+            insert(models.GroupInfo.__table__),
+            {"name": "Koło", "description": _text(rng, 50), "contact": "a@b.pl"},
+        )
+        # Masowe INSERT-y omijają hooki sesji - indeks i tagi budujemy osobno
+        search.rebuild_search_index(conn)
+    migrate_technology_tags(engine)
+
+
+class Scenario(NamedTuple):
+    name: str  # szablon trasy, np. "GET /api/projects/{project_id}"
+    method: str
+    path: Callable[[random.Random], str]
+    params: Callable[[random.Random], Optional[dict]] = lambda rng: None
+    json: Callable[[random.Random], object] = lambda rng: None
+    admin: bool = False
+
+
+def scenarios(dataset: Dataset) -> List[Scenario]:
+    created_events = itertools.count(dataset.events + 1)
+
+    def project_id(rng):
+        return rng.randint(1, dataset.projects)
+
+    def event_id(rng):
+        return rng.randint(1, dataset.events)
+
+    def event_body(rng):
+        return {
+            "name": _text(rng, 2),
+            "date": datetime(2024, 1, 1).isoformat(),
+            "description": _text(rng, 20),
+        }
+
+    def project_body(rng):
+        return {
+            "name": _text(rng, 2),
+            "description": _text(rng, 20),
+            "technologies": ", ".join(rng.sample(TECHNOLOGIES, 2)),
+            "year": 2024,
+        }
+
+    return [
+        Scenario("GET /api/home", "GET", lambda rng: "/api/home"),
+        Scenario(
+            "GET /api/projects/",
+            "GET",
+            lambda rng: "/api/projects/",
+            lambda rng: {"limit": rng.choice((20, 50, 100))},
+        ),
+        Scenario(
+            "GET /api/projects/?year&technology&sort",
+            "GET",
+            lambda rng: "/api/projects/",
+            lambda rng: {
+                "year": rng.randint(2015, 2025),
+                "technology": rng.choice(TECHNOLOGIES),
+                "sort": rng.choice(("-year", "name", "-id")),
+                "limit": 50,
+            },
+        ),
+        Scenario(
+            "GET /api/projects/{project_id}",
+            "GET",
+            lambda rng: f"/api/projects/{project_id(rng)}",
+        ),
+        Scenario(
+            "GET /api/events/",
+            "GET",
+            lambda rng: "/api/events/",
+            lambda rng: {"limit": rng.choice((20, 50, 100))},
+        ),
+        Scenario(
+            "GET /api/events/?from&to&sort",
+            "GET",
+            lambda rng: "/api/events/",
+            lambda rng: {
+                "from": f"{rng.randint(2015, 2024)}-01-01T00:00:00",
+                "to": "2025-01-01T00:00:00",
+                "sort": rng.choice(("date", "-date")),
+                "limit": 50,
+            },
+        ),
+        Scenario(
+            "GET /api/events/{event_id}",
+            "GET",
+            lambda rng: f"/api/events/{event_id(rng)}",
+        ),
+        Scenario("GET /api/about/", "GET", lambda rng: "/api/about/"),
+        Scenario("GET /api/technologies", "GET", lambda rng: "/api/technologies"),
+        Scenario(
+            "GET /api/search",
+            "GET",
+            lambda rng: "/api/search",
+            lambda rng: {"q": rng.choice(WORDS + TECHNOLOGIES)[: rng.randint(3, 8)]},
+        ),
+        Scenario(
+            "POST /api/admin/events/",
+            "POST",
+            lambda rng: "/api/admin/events/",
+            json=event_body,
+            admin=True,
+        ),
+        Scenario(
+            "PUT /api/admin/events/{event_id}",
+            "PUT",
+            lambda rng: f"/api/admin/events/{event_id(rng)}",
+            json=event_body,
+            admin=True,
+        ),
+        Scenario(
+            "POST /api/admin/projects/",
+            "POST",
+            lambda rng: "/api/admin/projects/",
+            json=project_body,
+            admin=True,
+        ),
+        Scenario(
+            "PUT /api/admin/projects/{project_id}",
+            "PUT",
+            lambda rng: f"/api/admin/projects/{project_id(rng)}",
+            json=project_body,
+            admin=True,
+        ),
+        Scenario(
+            "POST /api/admin/batch/events (100)",
+            "POST",
+            lambda rng: "/api/admin/batch/events",
+            json=lambda rng: [event_body(rng) for _ in range(100)],
+            admin=True,
+        ),
+        Scenario(
+            "DELETE /api/admin/events/{event_id}",
+            "DELETE",
+            # Kolejno wiersze dodane przez scenariusze wyżej (każdy usuwany raz)
+            lambda rng: f"/api/admin/events/{next(created_events)}",
+            admin=True,
+        ),
+    ]
+
+
+def _summary(timings: List[float], queries: List[int], errors: int) -> Dict:
+    quantiles = (
+        statistics.quantiles(timings, n=100) if len(timings) > 1 else timings * 99
+    )
+    total = sum(timings)
+    return {
+        "requests": len(timings),
+        "errors": errors,
+        "mean_ms": statistics.fmean(timings),
+        "p50_ms": quantiles[49],
+        "p95_ms": quantiles[94],
+        "p99_ms": quantiles[98],
+        "throughput_rps": len(timings) / (total / 1000) if total else 0.0,
+        "queries_mean": statistics.fmean(queries),
+        "queries_max": max(queries),
+    }
+
+
+def run_scenarios(client, engine, dataset: Dataset, args) -> Dict[str, Dict]:
+    statements = [0]
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def count(conn, cursor, statement, parameters, context, executemany):
+        statements[0] += 1
+
+    results = {}
+    for scenario in scenarios(dataset):
+        if args.only and not any(part in scenario.name for part in args.only):
+            continue
+        # Ziarno zależne od scenariusza - wynik nie zależy od tego, które uruchomiono
+        rng = random.Random(f"{args.seed}:{scenario.name}")
+        headers = API_KEY_HEADERS if scenario.admin else None
+        timings, queries, errors = [], [], 0
+        for n in range(args.warmup + args.requests):
+            if args.no_cache:
+                response_cache.clear()
+                clear_count_cache()
+            request = dict(
+                params=scenario.params(rng), json=scenario.json(rng), headers=headers
+            )
+            before = statements[0]
+            start = time.perf_counter()
+            response = client.request(scenario.method, scenario.path(rng), **request)
+            elapsed = (time.perf_counter() - start) * 1000
+            if n < args.warmup:
+                continue
+            timings.append(elapsed)
+            queries.append(statements[0] - before)
+            errors += response.status_code >= 400
+        results[scenario.name] = _summary(timings, queries, errors)
+    event.remove(engine, "before_cursor_execute", count)
+    return results
+
+
+def _git_revision() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(dataset: Dataset, args) -> Dict:
+    from fastapi.testclient import TestClient
+
+    from app.main import app
+
+    # Bez zadań w tle - mierzymy tylko obsługę żądań
+    settings.snapshot_enabled = False
+    settings.reconcile_interval = 0
+
+    rng = random.Random(args.seed)
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_db_engine(f"sqlite:///{os.path.join(tmp, 'bench.db')}")
+        Base.metadata.create_all(bind=engine)
+        started = time.perf_counter()
+        seed(engine, dataset, rng)
+        seed_seconds = time.perf_counter() - started
+        Session = sessionmaker(bind=engine, autoflush=False)
+
+        def override_get_db():
+            with Session() as db:
+                yield db
+
+        async def override_get_session():
+            with Session() as db:
+                yield SyncSessionRunner(db)
+
+        app.dependency_overrides[get_db] = override_get_db
+        app.dependency_overrides[get_session] = override_get_session
+        response_cache.clear()
+        clear_count_cache()
+        try:
+            with TestClient(app) as client:
+                endpoints = run_scenarios(client, engine, dataset, args)
+        finally:
+            app.dependency_overrides.clear()
+            engine.dispose()
+
+    return {
+        "meta": {
+            "dataset": dataset._asdict(),
+            "requests": args.requests,
+            "warmup": args.warmup,
+            "seed": args.seed,
+            "response_cache": not args.no_cache,
+            "seed_seconds": round(seed_seconds, 2),
+            "git_revision": _git_revision(),
+            "python": platform.python_version(),
+            "sqlalchemy": sqlalchemy.__version__,
+            "sqlite": sqlite3.sqlite_version,
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+        },
+        "endpoints": endpoints,
+    }
+
+
+def print_report(result: Dict, baseline: Optional[Dict] = None) -> None:
+    previous = (baseline or {}).get("endpoints", {})
+    print(
+        f"{'endpoint':<44} {'p50':>8} {'p95':>8} {'p99':>8} "
+        f"{'req/s':>8} {'SQL':>5}" + ("  p50 vs baseline" if baseline else "")
+    )
+    for name, stats in result["endpoints"].items():
+        line = (
+            f"{name:<44} {stats['p50_ms']:>8.2f} {stats['p95_ms']:>8.2f} "
+            f"{stats['p99_ms']:>8.2f} {stats['throughput_rps']:>8.0f} "
+            f"{stats['queries_mean']:>5.1f}"
+        )
+        if name in previous:
+            change = stats["p50_ms"] / previous[name]["p50_ms"] - 1
+            line += f"  {change:+.0%}"
+        if stats["errors"]:
+            line += f"  ({stats['errors']} errors)"
+        print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--events", type=int, default=50000)
+    parser.add_argument("--projects", type=int, default=10000)
+    parser.add_argument("--images-per-project", type=int, default=4)
+    parser.add_argument("--files-per-project", type=int, default=2)
+    parser.add_argument("--images-per-event", type=int, default=2)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--warmup", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="czyść cache odpowiedzi przed każdym żądaniem (zimne odczyty)",
+    )
+    parser.add_argument(
+        "--only", nargs="*", help="tylko scenariusze zawierające podany tekst"
+    )
+    parser.add_argument("--output", help="plik JSON z wynikami")
+    parser.add_argument("--baseline", help="wcześniejszy wynik JSON do porównania")
+    args = parser.parse_args()
+
+    dataset = Dataset(
+        args.events,
+        args.projects,
+        args.images_per_project,
+        args.files_per_project,
+        args.images_per_event,
+    )
+    result = run(dataset, args)
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+    print_report(result, baseline)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(result, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
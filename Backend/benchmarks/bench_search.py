@@ -0,0 +1,100 @@
+"""
+Opóźnienie wyszukiwania FTS5 (``app.db.search``) przy dużej liczbie wierszy.
+
+Uruchomienie (z katalogu Backend):
+    python -m benchmarks.bench_search --rows 50000 --queries 500
+
+Zapytania to losowe słowa lub ich początki (jak przy wpisywaniu w polu
+wyszukiwania), więc obejmują też szerokie prefiksy z tysiącami trafień.
+"""
+
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+from datetime import datetime
+
+from sqlalchemy.orm import sessionmaker
+
+from app.db import search
+from app.db.database import Base, create_db_engine
+from app.models import models
+
+COMMON_WORDS = (
+    "robot arduino python react koło naukowe warsztaty konkurs gra silnik "
+    "sieć neuronowa drukarka dron czujnik mikrokontroler aplikacja serwer "
+    "baza danych hackathon prezentacja projekt zespół"
+).split()
+
+
+def make_vocabulary(rng: random.Random, size: int) -> list:
+    # Kilka częstych słów i długi ogon rzadkich - jak w prawdziwych opisach
+    letters = "abcdefghijklmnoprstuwyz"
+    rare = {
+        "".join(rng.choice(letters) for _ in range(rng.randint(4, 10)))
+        for _ in range(size)
+    }
+    return COMMON_WORDS * 20 + sorted(rare)
+
+
+def sentence(rng: random.Random, words: list, length: int) -> str:
+    return " ".join(rng.choice(words) for _ in range(length))
+
+
+def run(rows: int, queries: int, vocabulary: int = 5000, seed: int = 0) -> dict:
+    rng = random.Random(seed)
+    words = make_vocabulary(rng, vocabulary)
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_db_engine(f"sqlite:///{os.path.join(tmp, 'bench.db')}")
+        Base.metadata.create_all(bind=engine)
+        Session = sessionmaker(bind=engine)
+
+        with Session() as db:
+            for _ in range(rows // 2):
+                db.add(
+                    models.Project(
+                        name=sentence(rng, words, 3),
+                        description=sentence(rng, words, 40),
+                        technologies=sentence(rng, words, 3),
+                    )
+                )
+                db.add(
+                    models.Event(
+                        name=sentence(rng, words, 3),
+                        description=sentence(rng, words, 40),
+                        date=datetime.now(),
+                    )
+                )
+            db.commit()
+
+        timings = []
+        with Session() as db:
+            for _ in range(queries):
+                q = sentence(rng, words, rng.randint(1, 2))[: rng.randint(3, 20)]
+                start = time.perf_counter()
+                search.search(db, q, limit=20)
+                timings.append((time.perf_counter() - start) * 1000)
+        engine.dispose()
+
+    quantiles = statistics.quantiles(timings, n=100)
+    return {"p50_ms": quantiles[49], "p95_ms": quantiles[94], "p99_ms": quantiles[98]}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=20000)
+    parser.add_argument("--queries", type=int, default=300)
+    parser.add_argument("--vocabulary", type=int, default=5000)
+    args = parser.parse_args()
+
+    result = run(args.rows, args.queries, args.vocabulary)
+    print(
+        f"{args.rows} rows: p50={result['p50_ms']:.2f} ms  "
+        f"p95={result['p95_ms']:.2f} ms  p99={result['p99_ms']:.2f} ms"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+"""
+Czas CPU serializacji stron ``/api/projects/`` i ``/api/events/``:
+walidacja schematem (``app.cache.dump_json``) vs ``app.serialization``.
+
+Uruchomienie (z katalogu Backend):
+    python -m benchmarks.bench_serialization --sizes 100 1000 --repeat 30
+
+Strona jest wczytywana raz (jak w endpoincie, z relacjami), a mierzona jest
+tylko jej serializacja - zapytania SQL są w obu ścieżkach takie same.
+"""
+
+import argparse
+import os
+import statistics
+import tempfile
+import time
+from datetime import datetime, timedelta
+from typing import Callable, List
+
+from pydantic import TypeAdapter
+from sqlalchemy.orm import sessionmaker
+
+from app.cache import dump_json
+from app.db.database import Base, create_db_engine
+from app.models import models, schemas
+from app.routers import events as events_router
+from app.routers import projects as projects_router
+from app.serialization import OrmSerializer, orjson
+
+IMAGES_PER_ITEM = 3
+
+
+def images(prefix: str) -> List[models.Image]:
+    return [
+        models.Image(
+            file_path=f"static/images/{prefix}-{i}.png",
+            variants=[
+                {
+                    "width": w,
+                    "height": w * 3 // 4,
+                    "file_path": f"{prefix}-{i}-{w}.webp",
+                }
+                for w in (320, 800, 1600)
+            ],
+        )
+        for i in range(IMAGES_PER_ITEM)
+    ]
+
+
+def seed(db, count: int) -> None:
+    start = datetime(2024, 1, 1, 12, 30, 15, 123456)
+    for i in range(count):
+        project = models.Project(
+            name=f"Projekt {i}",
+            description="Opis projektu koła naukowego. " * 10,
+            technologies="Python, FastAPI, React",
+            year=2020 + i % 5,
+        )
+        project.images = images(f"p{i}")
+        project.files = [
+            models.ProjectFiles(file_path=f"f{i}.zip", file_name="src.zip")
+        ]
+        project.executable = [
+            models.ExecutableFile(
+                file_path=f"e{i}.exe", version="1.0", platform=models.Platforms.WIN
+            )
+        ]
+        event = models.Event(
+            name=f"Wydarzenie {i}",
+            description="Opis wydarzenia. " * 10,
+            date=start + timedelta(days=i),
+        )
+        event.images = images(f"e{i}")
+        db.add_all([project, event])
+    db.commit()
+
+
+def cpu_ms(fn: Callable[[], bytes], repeat: int) -> float:
+    """Mediana czasu CPU (process_time) jednego wywołania w ms."""
+    fn()
+    samples = []
+    for _ in range(repeat):
+        start = time.process_time()
+        fn()
+        samples.append((time.process_time() - start) * 1000)
+    return statistics.median(samples)
+
+
+def run(sizes: List[int], repeat: int) -> List[dict]:
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_db_engine(f"sqlite:///{os.path.join(tmp, 'bench.db')}")
+        Base.metadata.create_all(bind=engine)
+        Session = sessionmaker(bind=engine)
+        with Session() as db:
+            seed(db, max(sizes))
+
+        pages = (
+            ("projects", schemas.Project, projects_router.list_projects),
+            ("events", schemas.Event, events_router.list_events),
+        )
+        for name, schema, list_page in pages:
+            adapter = TypeAdapter(List[schema])
+            serializer = OrmSerializer(schema, many=True)
+            for size in sizes:
+                with Session() as db:
+                    rows, _ = list_page(db, limit=size)
+                    assert serializer.dump_json(rows) == dump_json(adapter, rows)
+                    validated = cpu_ms(lambda: dump_json(adapter, rows), repeat)
+                    fast = cpu_ms(lambda: serializer.dump_json(rows), repeat)
+                results.append(
+                    {"page": name, "items": size, "validated": validated, "fast": fast}
+                )
+        engine.dispose()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000])
+    parser.add_argument("--repeat", type=int, default=30)
+    args = parser.parse_args()
+
+    print(f"JSON encoder: {'orjson' if orjson is not None else 'pydantic_core'}")
+    for row in run(args.sizes, args.repeat):
+        saved = row["validated"] - row["fast"]
+        print(
+            f"{row['page']:>8} x{row['items']:<5} validated={row['validated']:7.2f} ms"
+            f"  fast={row['fast']:7.2f} ms  saved={saved:7.2f} ms"
+            f" ({row['validated'] / row['fast']:.1f}x)"
+        )
+
+
+if __name__ == "__main__":
+    main()
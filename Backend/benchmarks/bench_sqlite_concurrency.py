@@ -0,0 +1,106 @@
+"""
+Przepustowość odczytów SQLite przy równoległych zapisach: rollback journal
+(DELETE) kontra WAL, przy pozostałych pragmach z ``Settings``.
+
+Uruchomienie (z katalogu Backend):
+    python -m benchmarks.bench_sqlite_concurrency --seconds 5 --readers 4
+"""
+
+import argparse
+import os
+import tempfile
+import threading
+import time
+from datetime import datetime
+
+from sqlalchemy import text
+from sqlalchemy.orm import sessionmaker
+
+from app.config import Settings
+from app.db.database import Base, create_db_engine
+from app.models import models
+
+
+def run(journal_mode: str, seconds: float, readers: int, rows: int) -> dict:
+    config = Settings(
+        sqlite_journal_mode=journal_mode,
+        db_pool_size=readers + 1,
+        db_max_overflow=0,
+    )
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_db_engine(f"sqlite:///{os.path.join(tmp, 'bench.db')}", config)
+        Base.metadata.create_all(bind=engine)
+        Session = sessionmaker(bind=engine)
+
+        with Session() as db:
+            db.add_all(
+                models.Event(
+                    name=f"Event {i}", description="x" * 200, date=datetime.now()
+                )
+                for i in range(rows)
+            )
+            db.commit()
+
+        stop = threading.Event()
+        reads = [0] * readers
+        writes = [0]
+        errors = [0]
+
+        def reader(slot: int):
+            with engine.connect() as conn:
+                while not stop.is_set():
+                    try:
+                        conn.execute(
+                            text("SELECT * FROM events ORDER BY date, id LIMIT 50")
+                        ).fetchall()
+                        conn.commit()
+                        reads[slot] += 1
+                    except Exception:
+                        errors[0] += 1
+
+        def writer():
+            while not stop.is_set():
+                with Session() as db:
+                    db.add(
+                        models.Event(name="new", description="y", date=datetime.now())
+                    )
+                    db.commit()
+                    writes[0] += 1
+
+        threads = [threading.Thread(target=reader, args=(i,)) for i in range(readers)]
+        threads.append(threading.Thread(target=writer))
+        for thread in threads:
+            thread.start()
+        time.sleep(seconds)
+        stop.set()
+        for thread in threads:
+            thread.join()
+        engine.dispose()
+
+    return {
+        "journal_mode": journal_mode,
+        "reads_per_second": sum(reads) / seconds,
+        "writes_per_second": writes[0] / seconds,
+        "read_errors": errors[0],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--seconds", type=float, default=3.0)
+    parser.add_argument("--readers", type=int, default=4)
+    parser.add_argument("--rows", type=int, default=5000)
+    args = parser.parse_args()
+
+    for mode in ("DELETE", "WAL"):
+        result = run(mode, args.seconds, args.readers, args.rows)
+        print(
+            f"{result['journal_mode']:>7}: "
+            f"{result['reads_per_second']:10.0f} reads/s  "
+            f"{result['writes_per_second']:8.0f} writes/s  "
+            f"errors={result['read_errors']}"
+        )
+
+
+if __name__ == "__main__":
+    main()
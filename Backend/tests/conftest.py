@@ -1,15 +1,33 @@
+import difflib
+import re
+from collections import Counter
+from contextlib import contextmanager
+from itertools import groupby
+from typing import List, Optional
+
 import pytest
 from fastapi.testclient import TestClient
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import Session, sessionmaker
-from sqlalchemy.pool import StaticPool  # <--- WAŻNY IMPORT
+from sqlalchemy.pool import NullPool, StaticPool  # <--- WAŻNY IMPORT
 
+from app.config import settings
 from app.db.database import Base
-from app.dependencies import get_db
+from app.cache import response_cache
+from app.dependencies import SyncSessionRunner, get_db, get_session
 from app.main import app
+from app.pagination import clear_count_cache
 
 SQLALCHEMY_DATABASE_URL = "sqlite:///:memory:"
 
+# Testy nie publikują migawek do static/ (test_publisher wywołuje publish() sam)
+settings.snapshot_enabled = False
+# ...ani nie uzgadniają static/ i nie sprzątają sesji przesyłania w tle
+# (test_reconciler i test_uploads robią to jawnie)
+settings.reconcile_interval = 0
+settings.upload_purge_interval = 0
+
 engine = create_engine(
     SQLALCHEMY_DATABASE_URL,
     connect_args={"check_same_thread": False},
@@ -18,22 +36,60 @@ engine = create_engine(
 
 TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+DB_MODES = ["sync", "async"]
+
+
+def pytest_generate_tests(metafunc):
+    # Testy korzystające z klienta HTTP przechodzą w obu trybach sesji
+    if "client" in metafunc.fixturenames:
+        metafunc.parametrize("db_mode", DB_MODES, indirect=True)
+
+
+@pytest.fixture()
+def db_mode(request):
+    return getattr(request, "param", "sync")
+
+
+@pytest.fixture()
+def db_engine(db_mode, tmp_path):
+    """Silnik synchroniczny dla testów; w trybie async - baza w pliku."""
+    if db_mode == "sync":
+        yield engine
+        return
+    # aiosqlite nie widzi bazy :memory: innego połączenia, więc plik tymczasowy
+    file_engine = create_engine(f"sqlite:///{tmp_path / 'test.db'}")
+    yield file_engine
+    file_engine.dispose()
+
+
+@pytest.fixture()
+def async_engine(db_mode, db_engine):
+    if db_mode == "sync":
+        yield None
+        return
+    # NullPool - połączenia nie przeżywają pętli zdarzeń TestClienta
+    url = db_engine.url.set(drivername="sqlite+aiosqlite")
+    yield create_async_engine(url, poolclass=NullPool)
+
 
 @pytest.fixture()
-def db():
+def db(db_engine):
     # Tworzymy tabele
-    Base.metadata.create_all(bind=engine)
-    db = TestingSessionLocal()
+    Base.metadata.create_all(bind=db_engine)
+    # Pamięć procesu nie wie o drop_all z poprzedniego testu
+    clear_count_cache()
+    response_cache.clear()
+    db = TestingSessionLocal(bind=db_engine)
     try:
         yield db
     finally:
         db.close()
         # Czyścimy bazę po teście
-        Base.metadata.drop_all(bind=engine)
+        Base.metadata.drop_all(bind=db_engine)
 
 
 @pytest.fixture()
-def client(db: Session):
+def client(db: Session, async_engine):
     # Nadpisujemy zależność get_db, aby używała sesji testowej
     def override_get_db():
         try:
@@ -41,10 +97,161 @@ def client(db: Session):
         finally:
             pass
 
+    if async_engine is None:
+
+        async def override_get_session():
+            yield SyncSessionRunner(db)
+
+    else:
+        AsyncTestingSession = async_sessionmaker(
+            async_engine, autoflush=False, expire_on_commit=False
+        )
+
+        async def override_get_session():
+            async with AsyncTestingSession() as session:
+                yield session
+
     app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_session] = override_get_session
 
     with TestClient(app) as c:
         yield c
 
     # Czyścimy override po zakończeniu testów klienta
     app.dependency_overrides.clear()
+
+
+@pytest.fixture()
+def query_counter(db_engine, async_engine):
+    """Zlicza zapytania SQL wysłane przez silnik używany przez aplikację."""
+    statements = []
+    target = async_engine.sync_engine if async_engine is not None else db_engine
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, many):
+        statements.append(statement)
+
+    event.listen(target, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(target, "before_cursor_execute", before_cursor_execute)
+
+
+@pytest.fixture()
+def query_plan(db: Session):
+    """EXPLAIN QUERY PLAN pierwszego zapytania wykonanego przez ``fn``."""
+
+    def explain(fn) -> str:
+        executed = []
+
+        def capture(conn, cursor, statement, parameters, context, many):
+            executed.append((statement, parameters))
+
+        event.listen(db.get_bind(), "before_cursor_execute", capture)
+        try:
+            fn()
+        finally:
+            event.remove(db.get_bind(), "before_cursor_execute", capture)
+        statement, parameters = executed[0]
+        rows = db.connection().exec_driver_sql(
+            "EXPLAIN QUERY PLAN " + statement, parameters
+        )
+        return " | ".join(row[-1] for row in rows)
+
+    return explain
+
+
+def _normalize_statement(statement: str) -> str:
+    """Zapytanie w jednej linii, bez aliasów kolumn i z listami IN jako (...)."""
+    statement = " ".join(statement.split())
+    statement = re.sub(r"(\w+\.\w+) AS \w+", r"\1", statement)
+    return re.sub(r"IN \((?:\?, )*\?\)", "IN (...)", statement)
+
+
+def _collapse_repeats(statements: List[str]) -> List[str]:
+    """Kolejne identyczne zapytania (typowe N+1) jako jedna linia ``[xN]``."""
+    lines = []
+    for statement, group in groupby(statements):
+        count = len(list(group))
+        lines.append(statement if count == 1 else f"{statement}  [x{count}]")
+    return lines
+
+
+class QueryBudget:
+    """
+    Limit zapytań SQL (i opcjonalnie wczytanych obiektów ORM) dla fragmentu
+    testu. Po przekroczeniu test kończy się różnicą względem zapytań
+    z ostatniego udanego przebiegu (zapamiętanych w ``.pytest_cache``)::
+
+        with query_budget(4, rows=100):
+            client.get("/api/projects/?limit=20")
+    """
+
+    CACHE_PREFIX = "query_budget/"
+
+    def __init__(self, engine, cache, node_id: str):
+        self.engine = engine
+        self.cache = cache
+        self.node_id = node_id
+        self._calls = 0
+
+    @contextmanager
+    def __call__(
+        self, queries: int, rows: Optional[int] = None, label: Optional[str] = None
+    ):
+        self._calls += 1
+        label = label or str(self._calls)
+        statements: List[str] = []
+        loaded: Counter = Counter()
+
+        def before_cursor_execute(conn, cursor, statement, parameters, context, many):
+            statements.append(_normalize_statement(statement))
+
+        def on_load(target, context):
+            loaded[type(target).__name__] += 1
+
+        event.listen(self.engine, "before_cursor_execute", before_cursor_execute)
+        event.listen(Base, "load", on_load, propagate=True)
+        try:
+            yield statements
+        finally:
+            event.remove(self.engine, "before_cursor_execute", before_cursor_execute)
+            event.remove(Base, "load", on_load)
+
+        problems = []
+        if len(statements) > queries:
+            problems.append(f"{len(statements)} queries > budget {queries}")
+        total_rows = sum(loaded.values())
+        if rows is not None and total_rows > rows:
+            per_class = ", ".join(f"{name}: {n}" for name, n in loaded.most_common())
+            problems.append(f"{total_rows} ORM rows > budget {rows} ({per_class})")
+
+        key = f"{self.CACHE_PREFIX}{self.node_id}/{label}"
+        current = _collapse_repeats(statements)
+        if not problems:
+            if self.cache is not None:
+                self.cache.set(key, current)
+            return
+
+        previous = self.cache.get(key, None) if self.cache is not None else None
+        if previous is None:
+            report = ["Statements:"] + [f"  {line}" for line in current]
+        else:
+            report = ["Statements compared with the last passing run:"]
+            report += difflib.unified_diff(
+                previous, current, "last passing", "current", lineterm="", n=1
+            )
+        pytest.fail(
+            f"Query budget '{label}' exceeded: "
+            + "; ".join(problems)
+            + "\n"
+            + "\n".join(report),
+            pytrace=False,
+        )
+
+
+@pytest.fixture()
+def query_budget(request, db_engine, async_engine):
+    """``with query_budget(n, rows=m): ...`` - patrz ``QueryBudget``."""
+    target = async_engine.sync_engine if async_engine is not None else db_engine
+    return QueryBudget(target, request.config.cache, request.node.nodeid)
@@ -0,0 +1,154 @@
+import time
+
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+
+from app.models import models
+
+HEADERS = {"X-API-Key": "test_api_key"}
+
+
+def test_batch_create_events_reports_each_item(client: TestClient, db: Session):
+    response = client.post(
+        "/api/admin/batch/events",
+        json=[
+            {"name": "A", "date": "2025-01-01T10:00:00", "description": "D"},
+            {"name": "B", "date": "not a date", "description": "D"},
+            {"name": "C", "date": "2025-02-01T10:00:00", "description": "D"},
+        ],
+        headers=HEADERS,
+    )
+    assert response.status_code == 200
+    results = response.json()
+    assert [r["status"] for r in results] == ["created", "invalid", "created"]
+    assert results[1]["errors"][0]["loc"] == ["date"]
+
+    names = {e.id: e.name for e in db.query(models.Event)}
+    assert names == {results[0]["id"]: "A", results[2]["id"]: "C"}
+
+
+def test_batch_requires_api_key(client: TestClient):
+    response = client.post(
+        "/api/admin/batch/events", json=[], headers={"X-API-Key": "bad"}
+    )
+    assert response.status_code == 401
+
+
+def test_batch_update_and_delete_events(client: TestClient, db: Session):
+    created = client.post(
+        "/api/admin/batch/events",
+        json=[
+            {"name": f"E{i}", "date": "2025-01-01T10:00:00", "description": "D"}
+            for i in range(3)
+        ],
+        headers=HEADERS,
+    ).json()
+    ids = [r["id"] for r in created]
+
+    updated = client.put(
+        "/api/admin/batch/events",
+        json=[
+            {
+                "id": ids[0],
+                "name": "Renamed",
+                "date": "2025-03-01T10:00:00",
+                "description": "D",
+            },
+            {"id": 9999, "name": "X", "date": "2025-03-01T10:00:00", "description": ""},
+            {"name": "no id", "date": "2025-03-01T10:00:00", "description": ""},
+        ],
+        headers=HEADERS,
+    ).json()
+    assert [r["status"] for r in updated] == ["updated", "not_found", "invalid"]
+    assert client.get(f"/api/events/{ids[0]}").json()["name"] == "Renamed"
+
+    deleted = client.request(
+        "DELETE",
+        "/api/admin/batch/events",
+        json=[ids[1], 9999, ids[1]],
+        headers=HEADERS,
+    ).json()
+    assert [r["status"] for r in deleted] == ["deleted", "not_found", "not_found"]
+    assert client.get(f"/api/events/{ids[1]}").status_code == 404
+    assert client.get("/api/events/").headers["X-Total-Count"] == "2"
+
+
+def test_batch_projects_keep_tags_and_search_in_sync(client: TestClient, db: Session):
+    created = client.post(
+        "/api/admin/batch/projects",
+        json=[
+            {"name": "Robot", "description": "D", "technologies": "Python, ROS"},
+            {"name": "Gra", "description": "D", "technologies": "python"},
+        ],
+        headers=HEADERS,
+    ).json()
+    ids = [r["id"] for r in created]
+    tags = client.get("/api/technologies").json()
+    assert {t["name"]: t["project_count"] for t in tags} == {"Python": 2, "ROS": 1}
+
+    client.put(
+        "/api/admin/batch/projects",
+        json=[{"id": ids[0], "name": "Dron", "description": "D", "technologies": "C"}],
+        headers=HEADERS,
+    )
+    search = client.get("/api/search", params={"q": "dron"}).json()
+    assert [r["id"] for r in search] == [ids[0]]
+
+    client.request(
+        "DELETE", "/api/admin/batch/projects", json=[ids[1]], headers=HEADERS
+    )
+    tags = client.get("/api/technologies").json()
+    assert {t["name"]: t["project_count"] for t in tags if t["project_count"]} == {
+        "C": 1
+    }
+
+
+def test_batch_update_keeps_omitted_fields(client: TestClient, db: Session):
+    created = client.post(
+        "/api/admin/batch/projects",
+        json=[{"name": "P", "description": "D", "technologies": "C", "year": 2020}],
+        headers=HEADERS,
+    ).json()
+    project_id = created[0]["id"]
+
+    updated = client.put(
+        "/api/admin/batch/projects",
+        json=[{"id": project_id, "name": "Q", "description": "D", "technologies": "C"}],
+        headers=HEADERS,
+    ).json()
+
+    assert updated[0]["status"] == "updated"
+    project = client.get(f"/api/projects/{project_id}").json()
+    assert (project["name"], project["year"]) == ("Q", 2020)
+
+
+def test_batch_rejects_oversized_requests(client: TestClient):
+    response = client.request(
+        "DELETE", "/api/admin/batch/events", json=list(range(6000)), headers=HEADERS
+    )
+    assert response.status_code == 422
+
+
+def test_batch_create_thousands_of_projects_quickly(
+    client: TestClient, db: Session, query_counter
+):
+    items = [
+        {
+            "name": f"Project {i}",
+            "description": "Desc",
+            "technologies": f"Python, Lib{i % 50}",
+            "year": 2000 + i % 25,
+        }
+        for i in range(2000)
+    ]
+    query_counter.clear()
+    start = time.perf_counter()
+    response = client.post("/api/admin/batch/projects", json=items, headers=HEADERS)
+    elapsed = time.perf_counter() - start
+
+    assert response.status_code == 200
+    assert all(r["status"] == "created" for r in response.json())
+    assert db.query(models.Project).count() == 2000
+    # Jeden executemany zamiast INSERT-u na wiersz
+    assert len(query_counter) < 100
+    assert elapsed < 3.0
@@ -0,0 +1,189 @@
+from datetime import datetime
+
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+
+from app import cache
+from app.cache import ResponseCache
+from app.models import models
+
+HEADERS = {"X-API-Key": "test_api_key"}
+
+
+def cache_stats(client: TestClient):
+    return client.get("/api/admin/cache/", headers=HEADERS).json()
+
+
+def test_repeated_get_served_from_cache(client: TestClient, db: Session, query_counter):
+    db.add(models.Event(name="Cached", description="D", date=datetime.now()))
+    db.commit()
+
+    first = client.get("/api/events/")
+    query_counter.clear()
+    second = client.get("/api/events/")
+
+    assert second.json() == first.json()
+    assert second.headers["X-Total-Count"] == "1"
+    assert query_counter == []
+    stats = cache_stats(client)
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+
+
+def test_admin_write_invalidates_cache(client: TestClient, db: Session):
+    response = client.post(
+        "/api/admin/events/",
+        json={"name": "Old", "description": "D", "date": datetime.now().isoformat()},
+        headers=HEADERS,
+    )
+    event_id = response.json()["id"]
+    assert client.get(f"/api/events/{event_id}").json()["name"] == "Old"
+
+    client.put(
+        f"/api/admin/events/{event_id}",
+        json={"name": "New", "description": "D", "date": datetime.now().isoformat()},
+        headers=HEADERS,
+    )
+    assert client.get(f"/api/events/{event_id}").json()["name"] == "New"
+    assert client.get("/api/events/").json()[0]["name"] == "New"
+
+
+def test_image_write_invalidates_project_cache(client: TestClient, db: Session):
+    project = models.Project(name="P", description="D", technologies="C")
+    db.add(project)
+    db.commit()
+    project_id = project.id
+    assert client.get(f"/api/projects/{project_id}").json()["images"] == []
+
+    db.add(models.Image(file_path="static/images/x.png", project_id=project_id))
+    db.commit()
+    assert len(client.get(f"/api/projects/{project_id}").json()["images"]) == 1
+
+
+def test_missing_group_info_is_cached_until_created(client: TestClient, db: Session):
+    assert client.get("/api/about/").status_code == 404
+    assert client.get("/api/about/").status_code == 404
+
+    client.post(
+        "/api/admin/about/",
+        json={"name": "Koło", "description": "Opis", "contact": "a@b.pl"},
+        headers=HEADERS,
+    )
+    assert client.get("/api/about/").status_code == 200
+
+
+def test_cache_stats_require_api_key(client: TestClient):
+    assert (
+        client.get("/api/admin/cache/", headers={"X-API-Key": "bad"}).status_code == 401
+    )
+
+
+def test_response_cache_lru_eviction():
+    cache = ResponseCache(maxsize=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert cache.stats()["evictions"] == 1
+    assert cache.stats()["size"] == 2
+
+
+def test_response_cache_ttl_expiry():
+    cache = ResponseCache(maxsize=2, ttl=0)
+    cache.set("a", 1)
+    assert cache.stats()["size"] == 1
+    cache.get("a")
+    assert cache.stats()["hits"] == 0
+    assert cache.stats()["size"] == 0
+
+
+def test_etag_not_modified(client: TestClient, db: Session, query_counter):
+    db.add(models.Event(name="E", description="D", date=datetime.now()))
+    db.commit()
+
+    first = client.get("/api/events/")
+    etag = first.headers["ETag"]
+
+    query_counter.clear()
+    second = client.get("/api/events/", headers={"If-None-Match": etag})
+    assert second.status_code == 304
+    assert second.content == b""
+    assert second.headers["ETag"] == etag
+    assert query_counter == []
+
+
+def test_etag_changes_after_write(client: TestClient, db: Session):
+    etag = client.get("/api/projects/").headers["ETag"]
+
+    client.post(
+        "/api/admin/projects/",
+        json={"name": "P", "description": "D", "technologies": "Go"},
+        headers=HEADERS,
+    )
+    response = client.get("/api/projects/", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+
+
+def test_etag_survives_cache_expiry(client: TestClient, db: Session):
+    # ETag wynika z treści - nie zmienia się po wygaśnięciu wpisu ani restarcie
+    etag = client.get("/api/events/").headers["ETag"]
+    cache.response_cache.clear()
+
+    response = client.get("/api/events/", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.headers["ETag"] == etag
+
+
+def test_if_none_match_star_requires_existing_resource(client: TestClient, db: Session):
+    event = models.Event(name="E", description="D", date=datetime.now())
+    db.add(event)
+    db.commit()
+
+    star = {"If-None-Match": "*"}
+    assert client.get(f"/api/events/{event.id}", headers=star).status_code == 304
+    assert client.get("/api/events/999999", headers=star).status_code == 404
+
+
+def test_last_modified_on_detail(client: TestClient, db: Session):
+    response = client.post(
+        "/api/admin/events/",
+        json={"name": "E", "description": "D", "date": datetime.now().isoformat()},
+        headers=HEADERS,
+    )
+    event_id = response.json()["id"]
+
+    detail = client.get(f"/api/events/{event_id}")
+    last_modified = detail.headers["Last-Modified"]
+
+    not_modified = client.get(
+        f"/api/events/{event_id}", headers={"If-Modified-Since": last_modified}
+    )
+    assert not_modified.status_code == 304
+
+    stale = client.get(
+        f"/api/events/{event_id}",
+        headers={"If-Modified-Since": "Mon, 01 Jan 2001 00:00:00 GMT"},
+    )
+    assert stale.status_code == 200
+
+
+def test_image_upload_touches_parent_updated_at(client: TestClient, db: Session):
+    event = models.Event(name="E", description="D", date=datetime(2020, 1, 1))
+    db.add(event)
+    db.commit()
+    event.updated_at = datetime(2020, 1, 1)
+    db.commit()
+
+    db.add(models.Image(file_path="static/images/new.png", event_id=event.id))
+    db.commit()
+    db.refresh(event)
+    assert event.updated_at > datetime(2020, 1, 1)
+
+
+def test_home_etag(client: TestClient, db: Session):
+    etag = client.get("/api/home").headers["ETag"]
+    assert client.get("/api/home", headers={"If-None-Match": etag}).status_code == 304
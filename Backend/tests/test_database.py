@@ -0,0 +1,39 @@
+from sqlalchemy import text
+
+from app.config import Settings
+from app.db.database import async_database_url, create_db_engine
+
+
+def test_engine_applies_sqlite_pragmas(tmp_path):
+    config = Settings(
+        sqlite_journal_mode="WAL",
+        sqlite_synchronous="NORMAL",
+        sqlite_cache_size=-4000,
+        sqlite_busy_timeout=1234,
+        db_pool_size=3,
+        db_max_overflow=1,
+    )
+    engine = create_db_engine(f"sqlite:///{tmp_path / 'tuned.db'}", config)
+
+    with engine.connect() as conn:
+        assert conn.execute(text("PRAGMA journal_mode")).scalar() == "wal"
+        # NORMAL = 1
+        assert conn.execute(text("PRAGMA synchronous")).scalar() == 1
+        assert conn.execute(text("PRAGMA cache_size")).scalar() == -4000
+        assert conn.execute(text("PRAGMA busy_timeout")).scalar() == 1234
+
+    assert engine.pool.size() == 3
+    engine.dispose()
+
+
+def test_in_memory_engine_skips_pool_settings():
+    engine = create_db_engine("sqlite:///:memory:")
+    with engine.connect() as conn:
+        assert conn.execute(text("SELECT 1")).scalar() == 1
+    engine.dispose()
+
+
+def test_async_database_url_uses_aiosqlite():
+    url = async_database_url("sqlite:///./sql_app.db")
+    assert url == "sqlite+aiosqlite:///./sql_app.db"
+    assert async_database_url("postgresql://u:p@h/db") == "postgresql://u:p@h/db"
@@ -1,4 +1,4 @@
-from datetime import datetime
+from datetime import datetime, timedelta
 
 from fastapi.testclient import TestClient
 from sqlalchemy.orm import Session
@@ -95,3 +95,195 @@ def test_delete_event(client: TestClient, db: Session):
 
     event_in_db = db.query(models.Event).filter(models.Event.id == event.id).first()
     assert event_in_db is None
+
+
+def test_delete_event_removes_its_images(client: TestClient, db: Session, tmp_path):
+    event = models.Event(name="Gallery", description="D", date=datetime.now())
+    photo = tmp_path / "photo.jpg"
+    variant = tmp_path / "photo-320.webp"
+    photo.write_bytes(b"jpg")
+    variant.write_bytes(b"webp")
+    event.images = [
+        models.Image(
+            file_path=str(photo),
+            variants=[{"width": 320, "height": 200, "file_path": str(variant)}],
+        )
+    ]
+    db.add(event)
+    db.commit()
+    event_id = event.id
+
+    response = client.delete(
+        f"/api/admin/events/{event_id}", headers={"X-API-Key": "test_api_key"}
+    )
+
+    assert response.status_code == 200
+    assert not photo.exists() and not variant.exists()
+    db.expire_all()
+    assert db.query(models.Image).count() == 0
+
+
+def test_read_events_query_count_is_constant(
+    client: TestClient, db: Session, query_counter
+):
+    for i in range(20):
+        event = models.Event(name=f"Event {i}", description="D", date=datetime.now())
+        event.images = [models.Image(file_path=f"static/images/{i}.png")]
+        db.add(event)
+    db.commit()
+
+    # Rozgrzewka: licznik wierszy jest liczony raz i trzymany w pamięci
+    client.get("/api/events/?limit=1")
+    query_counter.clear()
+    assert len(client.get("/api/events/?limit=2").json()) == 2
+    small_page = len(query_counter)
+
+    query_counter.clear()
+    data = client.get("/api/events/?limit=20").json()
+    assert all(len(e["images"]) == 1 for e in data)
+    assert len(query_counter) == small_page == 2
+
+
+def test_event_endpoints_query_budget(client: TestClient, db: Session, query_budget):
+    for i in range(20):
+        event = models.Event(name=f"Event {i}", description="D", date=datetime.now())
+        event.images = [models.Image(file_path=f"static/images/{i}.png")]
+        db.add(event)
+    db.commit()
+    client.get("/api/events/?limit=1")  # licznik wierszy trafia do pamięci
+
+    with query_budget(2, rows=20 * 2, label="list"):
+        assert len(client.get("/api/events/?limit=20").json()) == 20
+    with query_budget(1, rows=2, label="detail"):
+        assert client.get("/api/events/1").status_code == 200
+
+
+def test_read_event_single_query(client: TestClient, db: Session, query_counter):
+    event = models.Event(name="Gallery", description="D", date=datetime.now())
+    event.images = [models.Image(file_path="static/images/a.png")]
+    db.add(event)
+    db.commit()
+    event_id = event.id
+
+    query_counter.clear()
+    response = client.get(f"/api/events/{event_id}")
+    assert len(response.json()["images"]) == 1
+    assert len(query_counter) == 1
+
+
+def test_read_events_sparse_fieldset(client: TestClient, db: Session, query_counter):
+    event = models.Event(name="Gallery", description="D", date=datetime(2024, 5, 1))
+    event.images = [models.Image(file_path="static/images/a.png")]
+    db.add(event)
+    db.commit()
+    db.expunge_all()
+
+    query_counter.clear()
+    data = client.get("/api/events/?fields=name,date&include=").json()
+    assert data == [{"name": "Gallery", "date": "2024-05-01T00:00:00", "id": 1}]
+    assert not any("images" in q for q in query_counter)
+
+    detail = client.get("/api/events/1?fields=name").json()
+    assert detail["images"][0]["file_path"] == "static/images/a.png"
+    assert "description" not in detail
+
+
+def test_read_events_cursor_pagination(client: TestClient, db: Session):
+    start = datetime(2024, 1, 1)
+    # Dwa wydarzenia z tą samą datą - kolejność rozstrzyga id
+    dates = [start + timedelta(days=d) for d in (3, 1, 2, 2, 0)]
+    for i, date in enumerate(dates):
+        db.add(models.Event(name=f"Event {i}", description="D", date=date))
+    db.commit()
+
+    seen = []
+    response = client.get("/api/events/?limit=2")
+    assert response.headers["X-Total-Count"] == "5"
+    while True:
+        seen.extend(e["name"] for e in response.json())
+        cursor = response.headers.get("X-Next-Cursor")
+        if cursor is None:
+            break
+        response = client.get("/api/events/", params={"limit": 2, "cursor": cursor})
+
+    assert seen == ["Event 4", "Event 1", "Event 2", "Event 3", "Event 0"]
+
+
+def test_read_events_cursor_stable_under_inserts(client: TestClient, db: Session):
+    for day in range(1, 5):
+        db.add(
+            models.Event(
+                name=f"Day {day}", description="D", date=datetime(2024, 1, day)
+            )
+        )
+    db.commit()
+
+    first = client.get("/api/events/?limit=2")
+    # Admin dodaje wcześniejsze wydarzenie w trakcie stronicowania
+    db.add(models.Event(name="Day 0", description="D", date=datetime(2023, 12, 31)))
+    db.commit()
+
+    second = client.get(
+        "/api/events/", params={"limit": 2, "cursor": first.headers["X-Next-Cursor"]}
+    )
+    assert [e["name"] for e in second.json()] == ["Day 3", "Day 4"]
+    assert second.headers["X-Total-Count"] == "5"
+
+
+def test_read_events_invalid_cursor(client: TestClient):
+    response = client.get("/api/events/?cursor=not-a-cursor")
+    assert response.status_code == 400
+
+
+def seed_dated_events(db: Session):
+    dates = [datetime(2024, 11, 5), datetime(2025, 1, 10), datetime(2025, 2, 20)]
+    for i, date in enumerate(dates):
+        db.add(models.Event(name=f"Event {i}", description="D", date=date))
+    db.commit()
+
+
+def test_read_events_date_range(client: TestClient, db: Session):
+    seed_dated_events(db)
+
+    response = client.get(
+        "/api/events/", params={"from": "2025-01-01T00:00", "to": "2025-02-20T00:00"}
+    )
+    assert [e["name"] for e in response.json()] == ["Event 1"]
+    assert response.headers["X-Total-Count"] == "1"
+
+    upcoming = client.get("/api/events/", params={"from": "2025-01-01T00:00"})
+    assert [e["name"] for e in upcoming.json()] == ["Event 1", "Event 2"]
+
+
+def test_read_events_sorted_descending_with_cursor(client: TestClient, db: Session):
+    seed_dated_events(db)
+
+    names = []
+    response = client.get("/api/events/", params={"sort": "-date", "limit": 2})
+    while True:
+        names += [e["name"] for e in response.json()]
+        cursor = response.headers.get("X-Next-Cursor")
+        if cursor is None:
+            break
+        response = client.get(
+            "/api/events/", params={"sort": "-date", "limit": 2, "cursor": cursor}
+        )
+    assert names == ["Event 2", "Event 1", "Event 0"]
+
+    assert client.get("/api/events/", params={"sort": "name"}).status_code == 422
+
+
+def test_events_date_range_uses_index(db: Session, query_plan):
+    from app.routers.events import list_events
+
+    plan = query_plan(
+        lambda: list_events(
+            db, date_from=datetime(2025, 1, 1), date_to=datetime(2025, 3, 1)
+        )
+    )
+    assert "SEARCH events USING INDEX ix_events_date_id (date>? AND date<?)" in plan
+    assert "TEMP B-TREE" not in plan
+
+    plan = query_plan(lambda: list_events(db, sort="-date"))
+    assert "USING INDEX ix_events_date_id" in plan
+    assert "TEMP B-TREE" not in plan
@@ -1,3 +1,5 @@
+import asyncio
+import io
 import os
 from datetime import datetime
 
@@ -119,17 +121,207 @@ def test_delete_image(client: TestClient, db: Session, tmp_path):
     db.add(db_image)
     db.commit()
     db.refresh(db_image)
+    image_id = db_image.id
 
     assert os.path.exists(full_path)
 
     response = client.delete(
-        f"/api/admin/images/{db_image.id}", headers={"X-API-Key": "test_api_key"}
+        f"/api/admin/images/{image_id}", headers={"X-API-Key": "test_api_key"}
     )
 
     assert response.status_code == 200
 
     db.expire_all()
-    deleted_img = db.query(models.Image).filter(models.Image.id == db_image.id).first()
+    deleted_img = db.query(models.Image).filter(models.Image.id == image_id).first()
     assert deleted_img is None
 
     assert not os.path.exists(full_path)
+
+
+def test_upload_same_image_twice_is_deduplicated(
+    client: TestClient, db: Session, tmp_path
+):
+    files_router.IMG_DIR = str(tmp_path)
+    event = create_dummy_event(db)
+
+    paths = []
+    for name in ("first.jpg", "second.jpg"):
+        response = client.post(
+            "/api/admin/upload_image/",
+            files={"file": (name, b"identical_content", "image/jpeg")},
+            data={"event_id": event.id},
+            headers={"X-API-Key": "test_api_key"},
+        )
+        assert response.status_code == 200
+        paths.append(response.json())
+
+    assert paths[0]["file_path"] == paths[1]["file_path"]
+    assert paths[0]["id"] != paths[1]["id"]
+
+    # Usunięcie jednego wpisu nie usuwa pliku współdzielonego z drugim
+    client.delete(
+        f"/api/admin/images/{paths[0]['id']}", headers={"X-API-Key": "test_api_key"}
+    )
+    assert os.path.exists(paths[1]["file_path"])
+
+
+def test_upload_different_images_with_same_name(
+    client: TestClient, db: Session, tmp_path
+):
+    files_router.IMG_DIR = str(tmp_path)
+    event = create_dummy_event(db)
+
+    paths = set()
+    for content in (b"one", b"two"):
+        response = client.post(
+            "/api/admin/upload_image/",
+            files={"file": ("photo.jpg", content, "image/jpeg")},
+            data={"event_id": event.id},
+            headers={"X-API-Key": "test_api_key"},
+        )
+        paths.add(response.json()["file_path"])
+
+    assert len(paths) == 2
+
+
+def make_png(width: int, height: int) -> bytes:
+    PILImage = pytest.importorskip("PIL.Image")
+    buffer = io.BytesIO()
+    PILImage.new("RGB", (width, height), (200, 30, 30)).save(buffer, "PNG")
+    return buffer.getvalue()
+
+
+def test_upload_image_creates_variants(client: TestClient, db: Session, tmp_path):
+    files_router.IMG_DIR = str(tmp_path)
+    event = create_dummy_event(db)
+
+    response = client.post(
+        "/api/admin/upload_image/",
+        files={"file": ("photo.png", make_png(1000, 500), "image/png")},
+        data={"event_id": event.id},
+        headers={"X-API-Key": "test_api_key"},
+    )
+
+    assert response.status_code == 200
+    variants = response.json()["variants"]
+    # 1600 px pominięte - oryginał jest węższy (bez powiększania)
+    assert [(v["width"], v["height"]) for v in variants] == [(320, 160), (800, 400)]
+    for variant in variants:
+        assert variant["file_path"].endswith(".webp")
+        assert os.path.exists(variant["file_path"])
+
+    event_images = client.get(f"/api/events/{event.id}").json()["images"]
+    assert event_images[0]["variants"] == variants
+
+    client.delete(
+        f"/api/admin/images/{response.json()['id']}",
+        headers={"X-API-Key": "test_api_key"},
+    )
+    assert not any(os.path.exists(v["file_path"]) for v in variants)
+
+
+def test_upload_unreadable_image_has_no_variants(
+    client: TestClient, db: Session, tmp_path
+):
+    files_router.IMG_DIR = str(tmp_path)
+    event = create_dummy_event(db)
+
+    response = client.post(
+        "/api/admin/upload_image/",
+        files={"file": ("broken.png", b"not really a png", "image/png")},
+        data={"event_id": event.id},
+        headers={"X-API-Key": "test_api_key"},
+    )
+
+    assert response.status_code == 200
+    assert response.json()["variants"] == []
+
+
+def test_upload_many_images_in_one_request(
+    client: TestClient, db: Session, tmp_path, query_counter
+):
+    files_router.IMG_DIR = str(tmp_path)
+    event = create_dummy_event(db)
+
+    files = [
+        ("files", (f"photo{i}.jpg", f"img{i}".encode(), "image/jpeg")) for i in range(5)
+    ]
+    files.insert(2, ("files", ("notes.txt", b"text", "text/plain")))
+
+    query_counter.clear()
+    response = client.post(
+        "/api/admin/upload_images/",
+        files=files,
+        data={"event_id": event.id},
+        headers={"X-API-Key": "test_api_key"},
+    )
+
+    assert response.status_code == 200
+    results = response.json()
+    assert [r["file_name"] for r in results][:3] == [
+        "photo0.jpg",
+        "photo1.jpg",
+        "notes.txt",
+    ]
+    assert results[2]["image"] is None
+    assert "Invalid file type" in results[2]["error"]
+
+    images = [r["image"] for r in results if r["image"] is not None]
+    assert len(images) == 5
+    assert all(image["event_id"] == event.id for image in images)
+    assert all(os.path.exists(image["file_path"]) for image in images)
+    # Wszystkie wiersze jednym INSERT-em (bez osobnego commitu na plik)
+    inserts = [q for q in query_counter if q.startswith("INSERT INTO images")]
+    assert len(inserts) == 1
+
+    assert len(client.get(f"/api/events/{event.id}").json()["images"]) == 5
+
+
+def test_upload_many_images_bounds_concurrency(
+    client: TestClient, db: Session, tmp_path, monkeypatch
+):
+    files_router.IMG_DIR = str(tmp_path)
+    monkeypatch.setattr(files_router.settings, "image_upload_concurrency", 2)
+    event = create_dummy_event(db)
+
+    in_flight, peak = 0, 0
+    original_save = files_router.save_upload
+
+    async def tracking_save(file, destination_dir):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        try:
+            await asyncio.sleep(0.01)
+            return await original_save(file, destination_dir)
+        finally:
+            in_flight -= 1
+
+    monkeypatch.setattr(files_router, "save_upload", tracking_save)
+
+    response = client.post(
+        "/api/admin/upload_images/",
+        files=[("files", (f"{i}.png", f"{i}".encode(), "image/png")) for i in range(6)],
+        data={"event_id": event.id},
+        headers={"X-API-Key": "test_api_key"},
+    )
+
+    assert response.status_code == 200
+    assert all(r["error"] is None for r in response.json())
+    assert peak == 2
+
+
+def test_upload_many_images_rejects_missing_parent(
+    client: TestClient, db: Session, tmp_path
+):
+    files_router.IMG_DIR = str(tmp_path)
+
+    response = client.post(
+        "/api/admin/upload_images/",
+        files=[("files", ("a.png", b"a", "image/png"))],
+        data={"project_id": 999},
+        headers={"X-API-Key": "test_api_key"},
+    )
+
+    assert response.status_code == 404
+    assert list(tmp_path.rglob("*.png")) == []
@@ -0,0 +1,76 @@
+from datetime import datetime
+
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+
+from app.cache import response_cache
+from app.models import models
+
+
+def seed_content(db: Session):
+    for i in range(3):
+        project = models.Project(
+            name=f"Project {i}", description="Desc", technologies="Rust", year=2024
+        )
+        project.images = [models.Image(file_path=f"static/images/p{i}.png")]
+        db.add(project)
+        event = models.Event(name=f"Event {i}", description="Desc", date=datetime.now())
+        event.images = [models.Image(file_path=f"static/images/e{i}.png")]
+        db.add(event)
+    db.add(models.GroupInfo(name="Koło", description="Opis", contact="a@b.pl"))
+    db.commit()
+
+
+def test_read_home(client: TestClient, db: Session):
+    seed_content(db)
+
+    response = client.get("/api/home")
+    assert response.status_code == 200
+    data = response.json()
+    assert len(data["projects"]) == 3
+    assert len(data["events"]) == 3
+    assert data["projects"][0]["images"][0]["file_path"] == "static/images/p0.png"
+    assert data["about"]["contact"] == "a@b.pl"
+
+
+def test_read_home_limits(client: TestClient, db: Session):
+    seed_content(db)
+
+    data = client.get("/api/home?projects_limit=1&events_limit=2").json()
+    assert len(data["projects"]) == 1
+    assert len(data["events"]) == 2
+
+
+def test_read_home_without_group_info(client: TestClient, db: Session):
+    response = client.get("/api/home")
+    assert response.status_code == 200
+    assert response.json() == {"projects": [], "events": [], "about": None}
+
+
+def test_read_home_query_count(client: TestClient, db: Session, query_counter):
+    seed_content(db)
+
+    query_counter.clear()
+    client.get("/api/home")
+    # projekty + 3 relacje + licznik, wydarzenia + zdjęcia + licznik, info
+    assert len(query_counter) == 9
+
+    query_counter.clear()
+    client.get("/api/home")
+    assert query_counter == []
+
+
+def test_read_home_reuses_list_pages(client: TestClient, db: Session, query_counter):
+    seed_content(db)
+    projects = client.get("/api/projects/").json()
+    events = client.get("/api/events/").json()
+    hits = response_cache.stats()["hits"]
+
+    query_counter.clear()
+    data = client.get("/api/home").json()
+
+    assert data["projects"] == projects
+    assert data["events"] == events
+    # Obie strony z cache list, zapytanie tylko o info o grupie
+    assert response_cache.stats()["hits"] == hits + 2
+    assert len(query_counter) == 1
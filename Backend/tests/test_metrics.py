@@ -0,0 +1,102 @@
+import re
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session
+
+from app import metrics
+from app.models import models
+
+HEADERS = {"X-API-Key": "test_api_key"}
+
+
+@pytest.fixture()
+def registry(db_engine, async_engine):
+    # Silniki testowe zastępują silnik aplikacji - instrumentujemy je osobno
+    metrics.instrument_engine(db_engine)
+    if async_engine is not None:
+        metrics.instrument_engine(async_engine.sync_engine)
+    metrics.registry.clear()
+    yield metrics.registry
+    metrics.registry.clear()
+
+
+def sample(text: str, name: str, **labels) -> float:
+    """Wartość jednej serii z tekstu w formacie Prometheusa."""
+    for line in text.splitlines():
+        match = re.match(r"^(\w+)\{(.*)\} (\S+)$", line)
+        if not match or match.group(1) != name:
+            continue
+        found = dict(re.findall(r'(\w+)="((?:[^"\\]|\\.)*)"', match.group(2)))
+        if all(found.get(key) == str(value) for key, value in labels.items()):
+            return float(match.group(3))
+    raise AssertionError(f"{name} {labels} not found")
+
+
+def test_metrics_are_recorded_per_route_template(
+    client: TestClient, db: Session, registry
+):
+    db.add(models.Project(name="P", description="D", technologies="C"))
+    db.commit()
+
+    for path in ("/api/projects/1", "/api/projects/1", "/api/projects/999"):
+        client.get(path)
+    client.get("/api/does-not-exist")
+
+    text = client.get("/metrics", headers=HEADERS).text
+    route = {"method": "GET", "route": "/api/projects/{project_id}"}
+    assert sample(text, "http_requests_total", status=200, **route) == 2
+    assert sample(text, "http_requests_total", status=404, **route) == 1
+    assert sample(text, "http_request_duration_seconds_count", **route) == 3
+    assert sample(text, "http_request_duration_seconds_bucket", le="+Inf", **route) == 3
+    assert sample(text, "http_response_size_bytes_total", **route) > 0
+    assert sample(text, "db_statements_total", **route) >= 3
+    assert sample(text, "db_statement_seconds_total", **route) > 0
+    assert sample(text, "http_requests_in_flight", **route) == 0
+    # Surowe ścieżki nie tworzą osobnych serii
+    assert "/api/projects/1" not in text
+    assert sample(text, "http_requests_total", route="<unmatched>", status=404) == 1
+
+
+def test_failed_statement_leaves_no_timing_state(db_engine):
+    metrics.instrument_engine(db_engine)
+    sql, token = metrics.track_sql({})
+    try:
+        with db_engine.connect() as conn:
+            for _ in range(3):
+                with pytest.raises(OperationalError):
+                    conn.execute(text("SELECT * FROM no_such_table"))
+            conn.execute(text("SELECT 1"))
+            # Czasy startu nie zostają na połączeniu z puli
+            assert not any(isinstance(value, list) for value in conn.info.values())
+    finally:
+        metrics.untrack_sql(token)
+    assert sql.statements == 1
+
+
+def test_metrics_require_api_key(client: TestClient, registry):
+    response = client.get("/metrics", headers={"X-API-Key": "bad"})
+    assert response.status_code == 401
+
+
+def test_metrics_content_type(client: TestClient, registry):
+    response = client.get("/metrics", headers=HEADERS)
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+
+
+def test_histogram_buckets_are_cumulative():
+    registry = metrics.MetricsRegistry(buckets=(0.1, 1.0))
+    key = ("GET", '/a"b')
+    for duration in (0.05, 0.1, 0.5, 3.0):
+        registry.finished(key, 200, duration, 10, metrics.SQLStats())
+
+    text = registry.render()
+    labels = {"method": "GET", "route": '/a\\"b'}
+    assert sample(text, "http_request_duration_seconds_bucket", le="0.1", **labels) == 2
+    assert sample(text, "http_request_duration_seconds_bucket", le="1.0", **labels) == 3
+    assert (
+        sample(text, "http_request_duration_seconds_bucket", le="+Inf", **labels) == 4
+    )
+    assert sample(text, "http_request_duration_seconds_sum", **labels) == 3.65
@@ -0,0 +1,105 @@
+import sys
+import threading
+import time
+
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+
+from app.models import models
+from app import profiler
+from app.profiler import SPEEDSCOPE_SCHEMA, Sampler
+
+PROFILE = {"X-Profile": "1", "X-API-Key": "test_api_key"}
+
+
+def busy(seconds):
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        pass
+
+
+def assert_speedscope(profile: dict):
+    assert profile["$schema"] == SPEEDSCOPE_SCHEMA
+    frame_count = len(profile["shared"]["frames"])
+    for item in profile["profiles"]:
+        assert item["type"] == "sampled"
+        assert len(item["samples"]) == len(item["weights"])
+        assert all(0 <= i < frame_count for stack in item["samples"] for i in stack)
+
+
+def test_profile_replaces_response(client: TestClient, db: Session):
+    db.add(models.Project(name="P", description="D", technologies="C"))
+    db.commit()
+    switch_interval = sys.getswitchinterval()
+
+    response = client.get("/api/projects/1", headers=PROFILE)
+
+    assert response.status_code == 200
+    assert response.headers["X-Profiled-Status"] == "200"
+    assert "speedscope" in response.headers["Content-Disposition"]
+    profile = response.json()
+    assert profile["name"] == "GET /api/projects/1 -> 200"
+    assert_speedscope(profile)
+    assert sys.getswitchinterval() == switch_interval
+
+
+def test_profile_via_query_flag(client: TestClient):
+    response = client.get(
+        "/api/projects/999?_profile=1", headers={"X-API-Key": "test_api_key"}
+    )
+    assert response.headers["X-Profiled-Status"] == "404"
+    assert_speedscope(response.json())
+
+
+def test_profile_requires_api_key(client: TestClient):
+    response = client.get("/api/projects/", headers={**PROFILE, "X-API-Key": "bad"})
+    assert response.status_code == 401
+
+    response = client.get("/api/projects/", headers={"X-Profile": "1"})
+    assert response.status_code == 401
+
+
+def test_ordinary_requests_are_not_profiled(client: TestClient):
+    for headers in ({}, {**PROFILE, "X-Profile": "0"}):
+        response = client.get("/api/projects/", headers=headers)
+        assert response.status_code == 200
+        assert "X-Profiled-Status" not in response.headers
+        assert isinstance(response.json(), list)
+
+
+def test_sampler_records_busy_thread():
+    switch_interval = sys.getswitchinterval()
+    sampler = Sampler(threading.get_ident(), interval=0.001)
+    sampler.start()
+    busy(0.05)
+    sampler.stop()
+
+    profile = sampler.speedscope("busy")
+    assert_speedscope(profile)
+    assert profile["profiles"][0]["name"].startswith("event loop")
+    names = [frame["name"] for frame in profile["shared"]["frames"]]
+    assert any(name.endswith("busy") for name in names)
+    assert sys.getswitchinterval() == switch_interval
+
+
+def test_sampler_skips_threads_of_other_requests():
+    sampler = Sampler(threading.get_ident(), interval=0.001)
+    token = profiler._current_sampler.set(sampler)
+    try:
+        own_work = profiler.sampled_in_thread(busy)
+    finally:
+        profiler._current_sampler.reset(token)
+    threads = [
+        threading.Thread(target=own_work, args=(0.05,)),
+        threading.Thread(target=busy, args=(0.05,)),
+    ]
+
+    sampler.start()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    sampler.stop()
+
+    assert set(sampler.samples) == {threading.get_ident(), threads[0].ident}
+    assert not sampler.workers
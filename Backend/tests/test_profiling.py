@@ -0,0 +1,101 @@
+import logging
+import re
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session
+
+from app import metrics
+from app.db import profiling
+from app.main import app
+from app.models import models
+
+LOGGER = "app.db.profiling"
+
+
+@pytest.fixture()
+def slow_log(db_engine, async_engine):
+    # Próg 0 - każde zapytanie jest "wolne"
+    log = profiling.SlowQueryLog(threshold=0)
+    engines = [db_engine]
+    if async_engine is not None:
+        engines.append(async_engine.sync_engine)
+    for engine in engines:
+        log.attach(engine)
+    yield log
+    for engine in engines:
+        log.detach(engine)
+
+
+def test_slow_query_log_includes_parameters_and_plan(db: Session, slow_log, caplog):
+    db.add(models.Project(name="P", description="D", technologies="C"))
+    db.commit()
+    caplog.clear()
+
+    with caplog.at_level(logging.WARNING, logger=LOGGER):
+        db.execute(text("SELECT name FROM projects WHERE id = :id"), {"id": 1})
+
+    record = caplog.records[-1]
+    assert record.route == "(outside request)"
+    assert record.parameters == "(1,)"
+    assert record.plan == ["SEARCH projects USING INTEGER PRIMARY KEY (rowid=?)"]
+    assert "SELECT name FROM projects" in record.getMessage()
+
+
+def test_slow_query_log_names_the_route(
+    client: TestClient, db: Session, slow_log, caplog, monkeypatch
+):
+    # Bez statystyk SQL z app.metrics - trasę podaje własne middleware logu
+    monkeypatch.setattr(metrics, "track_sql", lambda scope: (metrics.SQLStats(), None))
+    db.add(models.Project(name="P", description="D", technologies="C"))
+    db.commit()
+    caplog.clear()
+
+    logged = TestClient(profiling.SlowQueryMiddleware(app))
+    with caplog.at_level(logging.WARNING, logger=LOGGER):
+        assert logged.get("/api/projects/1").status_code == 200
+
+    routes = {record.route for record in caplog.records}
+    assert routes == {"GET /api/projects/{project_id}"}
+    assert all(record.plan for record in caplog.records)
+
+
+def test_slow_query_log_respects_threshold(db: Session, db_engine, caplog):
+    log = profiling.SlowQueryLog(threshold=60)
+    log.attach(db_engine)
+    try:
+        with caplog.at_level(logging.WARNING, logger=LOGGER):
+            db.query(models.Project).all()
+    finally:
+        log.detach(db_engine)
+    assert not caplog.records
+
+
+def test_failed_statement_leaves_no_start_time(db_engine, slow_log, caplog):
+    with db_engine.connect() as conn:
+        for _ in range(3):
+            with pytest.raises(OperationalError):
+                conn.execute(text("SELECT * FROM no_such_table"))
+        # Czasy startu nie zostają na połączeniu z puli
+        assert not any(isinstance(value, list) for value in conn.info.values())
+        with caplog.at_level(logging.WARNING, logger=LOGGER):
+            conn.execute(text("SELECT 1"))
+    assert [record.statement for record in caplog.records] == ["SELECT 1"]
+
+
+def test_server_timing_header(client: TestClient, db: Session, db_engine, async_engine):
+    metrics.instrument_engine(db_engine)
+    if async_engine is not None:
+        metrics.instrument_engine(async_engine.sync_engine)
+    db.add(models.Project(name="P", description="D", technologies="C"))
+    db.commit()
+
+    # Middleware jest opcjonalne - w testach owijamy nim aplikację ręcznie
+    timed = TestClient(profiling.ServerTimingMiddleware(app))
+    response = timed.get("/api/projects/1")
+
+    value = response.headers[profiling.SERVER_TIMING_HEADER]
+    match = re.fullmatch(r'db;dur=[\d.]+;desc="(\d+) queries", app;dur=[\d.]+', value)
+    assert match and int(match.group(1)) >= 1
@@ -47,6 +47,137 @@ def test_read_projects(client: TestClient, db: Session):
     assert response.json()[0]["technologies"] == "Python, Raylib"
 
 
+def create_projects_with_relations(db: Session, count: int):
+    for i in range(count):
+        project = models.Project(
+            name=f"Project {i}", description="Desc", technologies="C++", year=2024
+        )
+        project.images = [models.Image(file_path=f"static/images/{i}.png")]
+        project.files = [models.ProjectFiles(file_path=f"static/project_files/{i}.zip")]
+        project.executable = [
+            models.ExecutableFile(
+                file_path=f"static/executables/{i}.exe",
+                version="1.0",
+                platform=models.Platforms.WIN.value,
+            )
+        ]
+        db.add(project)
+    db.commit()
+
+
+def test_read_projects_query_count_is_constant(
+    client: TestClient, db: Session, query_counter
+):
+    create_projects_with_relations(db, 20)
+
+    # Rozgrzewka: licznik wierszy jest liczony raz i trzymany w pamięci
+    client.get("/api/projects/?limit=1")
+    query_counter.clear()
+    response = client.get("/api/projects/?limit=2")
+    assert len(response.json()) == 2
+    small_page = len(query_counter)
+
+    query_counter.clear()
+    response = client.get("/api/projects/?limit=20")
+    data = response.json()
+    assert len(data) == 20
+    assert all(len(p["images"]) == 1 and len(p["files"]) == 1 for p in data)
+    assert len(query_counter) == small_page == 4
+
+
+def test_project_endpoints_query_budget(client: TestClient, db: Session, query_budget):
+    create_projects_with_relations(db, 20)
+    client.get("/api/projects/?limit=1")  # licznik wierszy trafia do pamięci
+
+    # Projekt + zdjęcie, plik i plik wykonywalny; wspólny tag technologii
+    with query_budget(4, rows=20 * 4 + 1, label="list"):
+        assert len(client.get("/api/projects/?limit=20").json()) == 20
+    with query_budget(4, rows=5, label="detail"):
+        assert client.get("/api/projects/1").status_code == 200
+
+
+def test_read_projects_sparse_fieldset(client: TestClient, db: Session, query_counter):
+    create_projects_with_relations(db, 3)
+    db.expunge_all()  # obiekty z pełnymi danymi nie mogą pochodzić z sesji
+
+    query_counter.clear()
+    response = client.get("/api/projects/?fields=id,name,year&include=images")
+
+    assert response.status_code == 200
+    card = response.json()[0]
+    assert list(card) == ["name", "year", "id", "images"]
+    assert card["images"][0]["file_path"] == "static/images/0.png"
+    selects = [q for q in query_counter if q.startswith("SELECT projects.")]
+    assert len(selects) == 1 and "description" not in selects[0]
+    assert not any(
+        "executable_file" in q or "project_files" in q for q in query_counter
+    )
+
+    # Pełna odpowiedź ma osobny wpis w pamięci podręcznej
+    full = client.get("/api/projects/").json()[0]
+    assert full["description"] == "Desc" and len(full["files"]) == 1
+
+
+def test_read_project_without_relations(client: TestClient, db: Session, query_counter):
+    create_projects_with_relations(db, 1)
+    db.expunge_all()
+
+    query_counter.clear()
+    response = client.get("/api/projects/1?fields=name&include=")
+
+    assert response.json() == {"name": "Project 0", "id": 1}
+    assert "Last-Modified" in response.headers
+    assert len(query_counter) == 1
+
+
+def test_read_projects_unknown_fields(client: TestClient, db: Session):
+    response = client.get("/api/projects/?fields=name,secret")
+    assert response.status_code == 400
+    assert "secret" in response.json()["detail"]
+
+    # Relacje wybiera się przez include, nie fields
+    assert client.get("/api/projects/?fields=images").status_code == 400
+    assert client.get("/api/projects/?include=tags").status_code == 400
+
+
+def test_read_projects_cursor_pagination(client: TestClient, db: Session):
+    create_projects_with_relations(db, 5)
+
+    first = client.get("/api/projects/?limit=3")
+    assert [p["name"] for p in first.json()] == ["Project 0", "Project 1", "Project 2"]
+    assert first.headers["X-Total-Count"] == "5"
+
+    second = client.get(
+        "/api/projects/", params={"limit": 3, "cursor": first.headers["X-Next-Cursor"]}
+    )
+    assert [p["name"] for p in second.json()] == ["Project 3", "Project 4"]
+    assert "X-Next-Cursor" not in second.headers
+
+
+def test_project_count_refreshed_after_write(client: TestClient, db: Session):
+    create_dummy_project(db)
+    assert client.get("/api/projects/").headers["X-Total-Count"] == "1"
+
+    client.post(
+        "/api/admin/projects/",
+        json={"name": "B", "description": "D", "technologies": "Go"},
+        headers={"X-API-Key": "test_api_key"},
+    )
+    assert client.get("/api/projects/").headers["X-Total-Count"] == "2"
+
+
+def test_read_project_loads_relations_eagerly(
+    client: TestClient, db: Session, query_counter
+):
+    create_projects_with_relations(db, 1)
+
+    query_counter.clear()
+    response = client.get("/api/projects/1")
+    assert response.status_code == 200
+    assert len(response.json()["executable"]) == 1
+    assert len(query_counter) == 4
+
+
 def test_update_project(client: TestClient, db: Session):
     project = create_dummy_project(db)
     response = client.put(
@@ -97,6 +228,14 @@ def test_upload_project_file_zip(client: TestClient, db: Session, tmp_path):
 
     saved_path = data["file_path"]
     assert os.path.exists(saved_path)
+    assert data["file_name"] == "source.zip"
+
+    download = client.get(
+        f"/api/admin/projects/files/{data['id']}/download",
+        headers={"X-API-Key": "test_api_key"},
+    )
+    assert download.content == file_content
+    assert "source.zip" in download.headers["content-disposition"]
 
 
 def test_upload_project_file_invalid_extension(
@@ -128,16 +267,17 @@ def test_delete_project_file(client: TestClient, db: Session, tmp_path):
     db.add(db_file)
     db.commit()
     db.refresh(db_file)
+    file_id = db_file.id
 
     response = client.delete(
-        f"/api/admin/projects/files/{db_file.id}", headers={"X-API-Key": "test_api_key"}
+        f"/api/admin/projects/files/{file_id}", headers={"X-API-Key": "test_api_key"}
     )
 
     assert response.status_code == 200
     assert not fake_file.exists()
 
     db.expire_all()
-    assert db.query(models.ProjectFiles).filter_by(id=db_file.id).first() is None
+    assert db.query(models.ProjectFiles).filter_by(id=file_id).first() is None
 
 
 def test_upload_executable(client: TestClient, db: Session, tmp_path):
@@ -214,3 +354,100 @@ def test_download_executable_public(client: TestClient, db: Session, tmp_path):
 
     assert response.status_code == 200
     assert response.content == b"EXEDATA"
+
+
+def seed_filterable_projects(db: Session):
+    for name, year, technologies in [
+        ("Alpha", 2023, "Python, FastAPI"),
+        ("Beta", 2024, "CPython-ish, C"),
+        ("Gamma", 2023, "Rust"),
+        ("Delta", None, "Python"),
+    ]:
+        db.add(
+            models.Project(
+                name=name, description="D", year=year, technologies=technologies
+            )
+        )
+    db.commit()
+
+
+def test_read_projects_filters(client: TestClient, db: Session):
+    seed_filterable_projects(db)
+
+    by_year = client.get("/api/projects/", params={"year": 2023})
+    assert [p["name"] for p in by_year.json()] == ["Alpha", "Gamma"]
+    assert by_year.headers["X-Total-Count"] == "2"
+
+    # Całe słowo, a nie podciąg - "CPython-ish" nie pasuje
+    python = client.get("/api/projects/", params={"technology": "python"})
+    assert [p["name"] for p in python.json()] == ["Alpha", "Delta"]
+
+    both = client.get("/api/projects/", params={"technology": "Python", "year": 2023})
+    assert [p["name"] for p in both.json()] == ["Alpha"]
+
+
+def test_read_projects_sorted_by_year_with_cursor(client: TestClient, db: Session):
+    seed_filterable_projects(db)
+
+    for sort, expected in [
+        ("year", ["Delta", "Alpha", "Gamma", "Beta"]),
+        ("-year", ["Beta", "Gamma", "Alpha", "Delta"]),
+        ("-name", ["Gamma", "Delta", "Beta", "Alpha"]),
+    ]:
+        names = []
+        params = {"sort": sort, "limit": 1}
+        while True:
+            response = client.get("/api/projects/", params=params)
+            names += [p["name"] for p in response.json()]
+            if "X-Next-Cursor" not in response.headers:
+                break
+            params["cursor"] = response.headers["X-Next-Cursor"]
+        assert names == expected, sort
+
+
+def test_projects_year_filter_uses_index(db: Session, query_plan):
+    plan = query_plan(lambda: projects_router.list_projects(db, year=2023))
+    assert "SEARCH projects USING INDEX ix_projects_year (year=?)" in plan
+    assert "TEMP B-TREE" not in plan
+
+    plan = query_plan(lambda: projects_router.list_projects(db, sort="-year"))
+    assert "USING INDEX ix_projects_year" in plan
+    assert "TEMP B-TREE" not in plan
+
+
+def test_delete_project_removes_its_files(client: TestClient, db: Session, tmp_path):
+    project = create_dummy_project(db)
+    paths = [tmp_path / name for name in ("cover.png", "source.zip", "game.exe")]
+    for path in paths:
+        path.write_bytes(b"data")
+    shared = tmp_path / "shared.png"
+    shared.write_bytes(b"data")
+    other = create_dummy_project(db)
+    db.add_all(
+        [
+            models.Image(file_path=str(paths[0]), project_id=project.id),
+            models.Image(file_path=str(shared), project_id=project.id),
+            models.Image(file_path=str(shared), project_id=other.id),
+            models.ProjectFiles(file_path=str(paths[1]), project_id=project.id),
+            models.ExecutableFile(
+                file_path=str(paths[2]),
+                version="1.0",
+                platform=models.Platforms.WIN.value,
+                project_id=project.id,
+            ),
+        ]
+    )
+    db.commit()
+    project_id = project.id
+
+    response = client.delete(
+        f"/api/admin/projects/{project_id}", headers={"X-API-Key": "test_api_key"}
+    )
+
+    assert response.status_code == 200
+    assert not any(path.exists() for path in paths)
+    # Plik wskazywany przez inny projekt zostaje
+    assert shared.exists()
+    db.expire_all()
+    assert db.query(models.Image).filter_by(project_id=project_id).count() == 0
+    assert db.query(models.ExecutableFile).count() == 0
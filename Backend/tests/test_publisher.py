@@ -0,0 +1,104 @@
+import gzip
+import json
+import threading
+from datetime import datetime
+
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+
+from app import publisher
+from app.models import models
+
+
+def seed(db: Session):
+    db.add(models.Project(name="P", description="D", technologies="Go"))
+    db.add(models.Event(name="E", description="D", date=datetime(2025, 1, 1)))
+    db.add(models.GroupInfo(name="Koło", description="Opis", contact="a@b.pl"))
+    db.commit()
+
+
+def test_publish_writes_json_and_gzip(db: Session, tmp_path):
+    seed(db)
+
+    changed = publisher.publish(db, str(tmp_path))
+    assert sorted(changed) == [
+        "about.json",
+        "events.json",
+        "home.json",
+        "projects.json",
+        "technologies.json",
+    ]
+
+    home = json.loads((tmp_path / "home.json").read_bytes())
+    assert [p["name"] for p in home["projects"]] == ["P"]
+    assert home["about"]["name"] == "Koło"
+    assert json.loads((tmp_path / "technologies.json").read_bytes()) == [
+        {"name": "Go", "project_count": 1}
+    ]
+    compressed = (tmp_path / "events.json.gz").read_bytes()
+    assert gzip.decompress(compressed) == (tmp_path / "events.json").read_bytes()
+    # Brak plików tymczasowych po atomowej podmianie
+    assert not [p for p in tmp_path.iterdir() if p.name.startswith(".")]
+
+
+def test_publish_skips_unchanged_files(db: Session, tmp_path):
+    seed(db)
+    publisher.publish(db, str(tmp_path))
+
+    db.add(models.Event(name="E2", description="D", date=datetime(2025, 2, 1)))
+    db.commit()
+
+    assert sorted(publisher.publish(db, str(tmp_path))) == ["events.json", "home.json"]
+    assert publisher.publish(db, str(tmp_path)) == []
+
+
+def test_snapshot_publisher_debounces():
+    calls = []
+    done = threading.Event()
+
+    def publish_fn():
+        calls.append(1)
+        done.set()
+
+    debounced = publisher.SnapshotPublisher(publish_fn, delay=0.05)
+    for _ in range(5):
+        debounced.schedule()
+    assert done.wait(2)
+    assert calls == [1]
+
+    debounced.schedule()
+    debounced.flush()
+    assert calls == [1, 1]
+
+
+def test_snapshot_publisher_caps_delay_under_steady_writes():
+    done = threading.Event()
+    debounced = publisher.SnapshotPublisher(done.set, delay=10, max_delay=0.05)
+
+    # Zapisy co 10 ms nie dają ciszy, a publikacja i tak następuje
+    for _ in range(200):
+        debounced.schedule()
+        if done.wait(0.01):
+            break
+    assert done.is_set()
+    debounced.cancel()
+
+
+def test_admin_write_schedules_publication(
+    client: TestClient, db: Session, monkeypatch
+):
+    scheduled = []
+    monkeypatch.setattr(publisher.settings, "snapshot_enabled", True)
+    monkeypatch.setattr(publisher.publisher, "schedule", lambda: scheduled.append(1))
+
+    client.post(
+        "/api/admin/events/",
+        json={"name": "E", "description": "D", "date": "2025-01-01T00:00"},
+        headers={"X-API-Key": "test_api_key"},
+    )
+    assert scheduled
+
+    scheduled.clear()
+    # Zapisy tabel niepublicznych nie wymagają publikacji
+    publisher._publish_on_change({"upload_sessions"})
+    assert scheduled == []
@@ -0,0 +1,54 @@
+import pytest
+from sqlalchemy.orm import Session
+
+from app.models import models
+
+
+def create_projects(db: Session, count: int):
+    for i in range(count):
+        project = models.Project(name=f"P{i}", description="D", technologies="C")
+        project.images = [models.Image(file_path=f"static/images/{i}.png")]
+        db.add(project)
+    db.commit()
+    db.expire_all()
+
+
+def test_query_budget_passes_within_limits(db: Session, query_budget):
+    create_projects(db, 3)
+
+    with query_budget(1, rows=3) as statements:
+        db.query(models.Project).all()
+
+    assert statements == [
+        "SELECT projects.id, projects.name, projects.description, "
+        "projects.technologies, projects.year, projects.updated_at FROM projects"
+    ]
+
+
+def test_query_budget_diffs_against_last_passing_run(db: Session, query_budget):
+    create_projects(db, 3)
+    with query_budget(1, label="projects"):
+        db.query(models.Project).all()
+    db.expire_all()
+
+    # Leniwe ładowanie zdjęć - klasyczne N+1
+    with pytest.raises(pytest.fail.Exception) as failure:
+        with query_budget(1, label="projects"):
+            for project in db.query(models.Project).all():
+                project.images
+
+    message = str(failure.value)
+    assert "Query budget 'projects' exceeded: 4 queries > budget 1" in message
+    assert "--- last passing" in message
+    assert "+SELECT images.id" in message
+    assert message.rstrip().endswith("[x3]")
+
+
+def test_query_budget_limits_loaded_rows(db: Session, query_budget):
+    create_projects(db, 3)
+
+    with pytest.raises(pytest.fail.Exception) as failure:
+        with query_budget(10, rows=2):
+            db.query(models.Project).all()
+
+    assert "3 ORM rows > budget 2 (Project: 3)" in str(failure.value)
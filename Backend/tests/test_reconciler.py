@@ -0,0 +1,185 @@
+import asyncio
+import os
+import time
+
+import pytest
+from sqlalchemy.orm import Session
+
+from app import reconciler as reconciler_module
+from app.models import models
+from app.reconciler import Reconciler
+from app.routers import files as files_router
+from app.routers import projects as projects_router
+
+OLD = time.time() - 2 * 3600
+
+
+@pytest.fixture()
+def storage(tmp_path, monkeypatch):
+    dirs = {name: tmp_path / name for name in ("images", "files", "exe")}
+    for path in dirs.values():
+        path.mkdir()
+    monkeypatch.setattr(files_router, "IMG_DIR", str(dirs["images"]))
+    monkeypatch.setattr(projects_router, "FILES_DIR", str(dirs["files"]))
+    monkeypatch.setattr(projects_router, "EXE_DIR", str(dirs["exe"]))
+    return dirs
+
+
+def make_file(directory, name: str, mtime: float = OLD) -> str:
+    path = os.path.join(str(directory), name)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "wb") as f:
+        f.write(b"data")
+    os.utime(path, (mtime, mtime))
+    return path
+
+
+def make_reconciler(db: Session, batch_size: int = 1000) -> Reconciler:
+    return Reconciler(
+        batch_size=batch_size,
+        grace=3600,
+        session_factory=lambda: Session(bind=db.get_bind()),
+    )
+
+
+def seed(db: Session, storage):
+    """Po jednym przypadku każdego rodzaju; zwraca oczekiwane rozbieżności."""
+    event = models.Event(name="E", description="D")
+    project = models.Project(name="P", description="D", technologies="C")
+    db.add_all([event, project])
+    db.flush()
+
+    kept_image = make_file(storage["images"], "ab/cd/kept.jpg")
+    variant = make_file(storage["images"], "variants/ab/cd/kept-320.webp")
+    db.add(
+        models.Image(
+            file_path=kept_image,
+            event_id=event.id,
+            variants=[{"width": 320, "height": 1, "file_path": variant}],
+        )
+    )
+    db.add(
+        models.ProjectFiles(
+            file_path=make_file(storage["files"], "src.zip"), project_id=project.id
+        )
+    )
+    missing = os.path.join(str(storage["exe"]), "gone.exe")
+    db.add(
+        models.ExecutableFile(
+            file_path=missing, version="1", platform="WIN", project_id=project.id
+        )
+    )
+    db.commit()
+
+    orphans = {
+        make_file(storage["images"], "ef/01/orphan.png"),
+        make_file(storage["images"], "variants/ef/01/orphan-320.webp"),
+        make_file(storage["exe"], ".upload-abc.part"),
+    }
+    # Świeży plik - upload mógł jeszcze nie zatwierdzić wiersza
+    make_file(storage["files"], "fresh.zip", mtime=time.time())
+    return orphans, missing
+
+
+def test_reconciler_reports_orphans_and_dangling_rows(db: Session, storage):
+    orphans, missing = seed(db, storage)
+
+    report = make_reconciler(db).run()
+
+    assert set(report.orphan_files) == orphans
+    assert [(t, p) for t, _, p in report.dangling_rows] == [
+        ("executable_file", missing)
+    ]
+    assert report.scanned_files == 7
+    assert report.scanned_rows == 3
+    # Tylko raport - nic nie znika
+    assert all(os.path.exists(path) for path in orphans)
+    assert db.query(models.ExecutableFile).count() == 1
+
+
+def test_reconciler_removes_when_asked(db: Session, storage):
+    orphans, _ = seed(db, storage)
+
+    report = make_reconciler(db).run(remove=True)
+
+    assert report.removed
+    assert not any(os.path.exists(path) for path in orphans)
+    db.expire_all()
+    assert db.query(models.ExecutableFile).count() == 0
+    assert db.query(models.Image).count() == 1
+    assert make_reconciler(db).run().orphan_files == []
+
+
+def test_reconciler_steps_are_incremental(db: Session, storage):
+    orphans, missing = seed(db, storage)
+    rec = make_reconciler(db, batch_size=2)
+
+    found, steps = set(), 0
+    while not rec.pass_done:
+        report = rec.step()
+        assert report.scanned_files <= 2
+        found.update(report.orphan_files)
+        steps += 1
+    assert found == orphans
+    assert steps == 4
+    assert rec.passes == 1
+
+    # Kolejny krok zaczyna nowe przejście od początku
+    assert rec.step().scanned_files == 2
+    assert rec.passes == 1
+
+
+def test_reconciler_cli(db: Session, storage, monkeypatch, capsys):
+    orphans, _ = seed(db, storage)
+    monkeypatch.setattr(
+        reconciler_module, "SessionLocal", lambda: Session(bind=db.get_bind())
+    )
+    monkeypatch.setattr("sys.argv", ["reconciler"])
+
+    reconciler_module.main()
+
+    out = capsys.readouterr().out
+    assert "3 orphan files, 1 dangling rows" in out
+    assert all(f"orphan file: {path}" in out for path in orphans)
+
+
+def test_reconciler_rechecks_orphans_before_removing(db: Session, storage):
+    orphans, _ = seed(db, storage)
+    rec = make_reconciler(db)
+    reused = make_file(storage["images"], "ef/02/reused.png")
+    adopted = make_file(storage["images"], "ef/03/adopted.png")
+    check_files = rec._check_files
+
+    def check_then_upload(session, report):
+        check_files(session, report)
+        # Między wykryciem a usunięciem: ponowne użycie w innym procesie
+        # (odświeżony czas modyfikacji) i wiersz zatwierdzony przez upload
+        os.utime(reused)
+        db.add(models.Image(file_path=adopted))
+        db.commit()
+
+    rec._check_files = check_then_upload
+    report = rec.step(remove=True)
+
+    assert os.path.exists(reused) and os.path.exists(adopted)
+    assert set(report.orphan_files) == orphans
+    assert not any(os.path.exists(path) for path in orphans)
+
+
+def test_background_pass_is_paced_until_done(db: Session, storage, monkeypatch):
+    seed(db, storage)
+    rec = make_reconciler(db, batch_size=2)
+    monkeypatch.setattr(reconciler_module, "reconciler", rec)
+    delays = []
+
+    async def fake_sleep(delay):
+        delays.append(delay)
+        if len(delays) > 5:
+            raise asyncio.CancelledError
+
+    monkeypatch.setattr(reconciler_module.asyncio, "sleep", fake_sleep)
+    with pytest.raises(asyncio.CancelledError):
+        asyncio.run(reconciler_module.run_periodically(300))
+
+    pause = reconciler_module.STEP_PAUSE
+    assert delays == [300, pause, pause, pause, 300, pause]
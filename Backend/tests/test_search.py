@@ -0,0 +1,118 @@
+from datetime import datetime
+
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.db.search import build_match_query, rebuild_search_index
+from app.models import models
+
+HEADERS = {"X-API-Key": "test_api_key"}
+
+
+def seed(db: Session):
+    db.add_all(
+        [
+            models.Project(
+                name="Robot sumo",
+                description="Autonomiczny robot na zawody",
+                technologies="C++, Arduino",
+            ),
+            models.Project(
+                name="Strona koła",
+                description="Aplikacja webowa z panelem robotów",
+                technologies="Python, React",
+            ),
+            models.Event(
+                name="Warsztaty z Arduino",
+                description="Budujemy pierwszy układ",
+                date=datetime(2025, 3, 1),
+            ),
+        ]
+    )
+    db.commit()
+
+
+def test_build_match_query_quotes_user_input():
+    assert build_match_query('robot" OR name:*') == '"robot" "OR" "name"*'
+    assert build_match_query("  ***  ") is None
+
+
+def test_search_ranks_name_matches_first(client: TestClient, db: Session):
+    seed(db)
+
+    response = client.get("/api/search", params={"q": "robot"})
+    assert response.status_code == 200
+    results = response.json()
+    # "robot*" pasuje też do "robotów" w opisie drugiego projektu
+    assert [r["name"] for r in results] == ["Robot sumo", "Strona koła"]
+    assert "<mark>" in results[0]["snippet"]
+
+    # Prefiks ostatniego słowa i wyszukiwanie bez polskich znaków
+    assert len(client.get("/api/search", params={"q": "rob"}).json()) == 2
+    unaccented = client.get("/api/search", params={"q": "robotow"}).json()
+    assert [r["name"] for r in unaccented] == ["Strona koła"]
+
+
+def test_search_spans_projects_and_events(client: TestClient, db: Session):
+    seed(db)
+
+    results = client.get("/api/search", params={"q": "arduino"}).json()
+    assert {r["kind"] for r in results} == {"project", "event"}
+    # Trafienie w nazwie ma wyższą wagę niż w technologiach
+    assert results[0]["kind"] == "event"
+    assert results[0]["score"] > results[1]["score"]
+
+
+def test_search_follows_admin_writes(client: TestClient, db: Session):
+    created = client.post(
+        "/api/admin/events/",
+        json={"name": "Hackathon", "description": "48h", "date": "2025-05-01T09:00"},
+        headers=HEADERS,
+    ).json()
+    assert [r["id"] for r in client.get("/api/search?q=hackathon").json()] == [
+        created["id"]
+    ]
+
+    client.put(
+        f"/api/admin/events/{created['id']}",
+        json={"name": "Game jam", "description": "48h", "date": "2025-05-01T09:00"},
+        headers=HEADERS,
+    )
+    assert client.get("/api/search?q=hackathon").json() == []
+    assert len(client.get("/api/search?q=jam").json()) == 1
+
+    client.delete(f"/api/admin/events/{created['id']}", headers=HEADERS)
+    assert client.get("/api/search?q=jam").json() == []
+
+
+def test_search_rejects_empty_query(client: TestClient, db: Session):
+    assert client.get("/api/search", params={"q": ""}).status_code == 422
+    assert client.get("/api/search", params={"q": "!!!"}).json() == []
+
+
+def test_rebuild_indexes_existing_rows(db: Session):
+    seed(db)
+    conn = db.connection()
+    conn.execute(text("DELETE FROM search_index"))
+
+    rebuild_search_index(conn)
+    count = conn.execute(text("SELECT count(*) FROM search_index")).scalar()
+    assert count == 3
+
+
+def test_snippet_escapes_stored_html(client: TestClient, db: Session):
+    db.add(
+        models.Project(
+            name="Maszyna",
+            description='<img src=x onerror="alert(1)"> robot <b>',
+            technologies="C",
+        )
+    )
+    db.commit()
+
+    results = client.get("/api/search", params={"q": "robot"}).json()
+    snippet = results[0]["snippet"]
+    assert "<img" not in snippet and "<b>" not in snippet
+    assert "&lt;img src=x onerror=&quot;alert(1)&quot;&gt;" in snippet
+    assert "<mark>robot</mark>" in snippet
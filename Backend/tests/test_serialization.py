@@ -0,0 +1,76 @@
+from datetime import datetime
+from typing import List
+
+import pytest
+from pydantic import TypeAdapter
+from sqlalchemy.orm import Session, selectinload
+
+from app import serialization
+from app.cache import dump_json
+from app.config import settings
+from app.models import models, schemas
+from app.routers import projects as projects_router
+from app.serialization import OrmSerializer
+
+
+def seed(db: Session):
+    first = models.Project(name="Gra ż", description="D", technologies="C")
+    first.images = [
+        models.Image(
+            file_path="a.png",
+            variants=[{"width": 320, "height": 240, "file_path": "a-320.webp"}],
+        ),
+        models.Image(file_path="b.png", variants=None),
+    ]
+    first.executable = [
+        models.ExecutableFile(
+            file_path="a.exe", version="1", platform=models.Platforms.LINUX
+        )
+    ]
+    first.files = [models.ProjectFiles(file_path="a.zip", file_name="a.zip")]
+    second = models.Project(name="P", description="D", technologies="C", year=2024)
+    event = models.Event(
+        name="E", description="D", date=datetime(2024, 5, 1, 10, 0, 0, 1500)
+    )
+    event.images = [models.Image(file_path="e.png")]
+    db.add_all([first, second, event])
+    db.commit()
+    db.expire_all()
+
+
+def test_output_matches_validated_serialization(db: Session):
+    seed(db)
+    projects, _ = projects_router.list_projects(db)
+    events = db.query(models.Event).options(selectinload(models.Event.images)).all()
+
+    for schema, rows in ((schemas.Project, projects), (schemas.Event, events)):
+        adapter = TypeAdapter(List[schema])
+        assert OrmSerializer(schema, many=True).dump_json(rows) == dump_json(
+            adapter, rows
+        )
+        single = OrmSerializer(schema).dump_json(rows[0])
+        assert single == dump_json(TypeAdapter(schema), rows[0])
+
+
+def test_unloaded_relationships_are_loaded_lazily(db: Session):
+    seed(db)
+    project = db.get(models.Project, 1)
+    assert "images" not in project.__dict__
+
+    data = OrmSerializer(schemas.Project).to_python(project)
+
+    assert [image["file_path"] for image in data["images"]] == ["a.png", "b.png"]
+    assert data["images"][1]["variants"] == []
+    assert data["executable"][0]["platform"] == "Linux"
+
+
+@pytest.mark.parametrize("fast", [True, False])
+def test_serialization_switch_and_fallback_encoder(db: Session, monkeypatch, fast):
+    seed(db)
+    projects, _ = projects_router.list_projects(db)
+    expected = dump_json(TypeAdapter(List[schemas.Project]), projects)
+
+    monkeypatch.setattr(settings, "fast_serialization", fast)
+    monkeypatch.setattr(serialization, "orjson", None)
+
+    assert OrmSerializer(schemas.Project, many=True).dump_json(projects) == expected
@@ -0,0 +1,130 @@
+import asyncio
+import hashlib
+import io
+import os
+import threading
+
+import pytest
+from fastapi import UploadFile
+from sqlalchemy.orm import Session
+
+from app import storage
+from app.models import models
+
+
+class FailingReader(io.BytesIO):
+    def read(self, size=-1):
+        data = super().read(size)
+        if self.tell() > storage.CHUNK_SIZE:
+            raise OSError("connection reset")
+        return data
+
+
+def test_write_atomically_in_chunks(tmp_path, monkeypatch):
+    monkeypatch.setattr(storage, "CHUNK_SIZE", 4)
+
+    path = storage.write_atomically(
+        io.BytesIO(b"0123456789"), str(tmp_path / "out"), "data.bin"
+    )
+
+    assert path == os.path.join(str(tmp_path / "out"), "data.bin")
+    with open(path, "rb") as f:
+        assert f.read() == b"0123456789"
+    assert os.listdir(tmp_path / "out") == ["data.bin"]
+
+
+def test_failed_write_leaves_no_partial_file(tmp_path, monkeypatch):
+    monkeypatch.setattr(storage, "CHUNK_SIZE", 4)
+    existing = tmp_path / "data.bin"
+    existing.write_bytes(b"old")
+
+    with pytest.raises(OSError):
+        storage.write_atomically(
+            FailingReader(b"0123456789"), str(tmp_path), "data.bin"
+        )
+
+    # Poprzednia wersja pliku nietknięta, brak plików tymczasowych
+    assert os.listdir(tmp_path) == ["data.bin"]
+    assert existing.read_bytes() == b"old"
+
+
+def test_save_upload_is_content_addressed(tmp_path):
+    content = b"same bytes"
+    digest = hashlib.sha256(content).hexdigest()
+
+    upload = UploadFile(io.BytesIO(content), filename="../../Photo.JPG")
+    path = asyncio.run(storage.save_upload(upload, str(tmp_path)))
+
+    assert path == os.path.join(str(tmp_path), digest[:2], digest[2:4], digest + ".jpg")
+    with open(path, "rb") as f:
+        assert f.read() == content
+
+
+def test_duplicate_upload_does_not_rewrite(tmp_path, monkeypatch):
+    first = asyncio.run(
+        storage.save_upload(
+            UploadFile(io.BytesIO(b"dup"), filename="a.png"), str(tmp_path)
+        )
+    )
+    os.utime(first, (1, 1))
+
+    def fail_write(*args, **kwargs):
+        raise AssertionError("duplicate content must not be written again")
+
+    monkeypatch.setattr(storage, "write_atomically", fail_write)
+    monkeypatch.setattr(storage.tempfile, "mkstemp", fail_write)
+    second = asyncio.run(
+        storage.save_upload(
+            UploadFile(io.BytesIO(b"dup"), filename="b.png"), str(tmp_path)
+        )
+    )
+
+    assert first == second
+    # Czas modyfikacji odświeżony - karencja reconcilera w innych procesach
+    assert os.stat(second).st_mtime > 1
+    assert storage.recently_reused(second)
+
+
+def test_release_file_respects_references(db: Session, tmp_path):
+    blob = tmp_path / "shared.png"
+    blob.write_bytes(b"x")
+    path = str(blob)
+    db.add(models.Image(file_path=path))
+    db.add(models.ProjectFiles(file_path=path))
+    db.commit()
+
+    assert storage.count_references(db, path) == 2
+    assert storage.release_file(db, path) is False
+    assert blob.exists()
+
+    db.query(models.Image).delete()
+    db.query(models.ProjectFiles).delete()
+    db.commit()
+
+    assert storage.release_file(db, path) is True
+    assert not blob.exists()
+
+
+def test_release_and_reuse_do_not_race(db: Session, tmp_path, monkeypatch):
+    path = storage.store_content_addressed(io.BytesIO(b"x"), str(tmp_path))
+    storage._recently_reused.clear()
+    uploads = []
+    count_references = storage.count_references
+
+    def count_during_upload(db, file_path):
+        # Ten sam plik przesłany w trakcie sprawdzania referencji
+        upload = threading.Thread(
+            target=storage.store_content_addressed,
+            args=(io.BytesIO(b"x"), str(tmp_path)),
+        )
+        upload.start()
+        upload.join(0.1)
+        uploads.append(upload)
+        return count_references(db, file_path)
+
+    monkeypatch.setattr(storage, "count_references", count_during_upload)
+    assert storage.release_file(db, path) is True
+    uploads[0].join()
+
+    # Upload czekał na usunięcie i zapisał plik od nowa
+    assert os.path.exists(path)
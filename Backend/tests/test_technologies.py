@@ -0,0 +1,83 @@
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+
+from app.db.migrations import migrate_technology_tags
+from app.models import models
+from app.routers import projects as projects_router
+
+HEADERS = {"X-API-Key": "test_api_key"}
+
+
+def create_project(client: TestClient, name: str, technologies: str) -> dict:
+    return client.post(
+        "/api/admin/projects/",
+        json={"name": name, "description": "D", "technologies": technologies},
+        headers=HEADERS,
+    ).json()
+
+
+def facets(client: TestClient) -> dict:
+    return {
+        t["name"]: t["project_count"] for t in client.get("/api/technologies").json()
+    }
+
+
+def test_parse_technologies():
+    assert models.parse_technologies(" Python,  FastAPI ;python,,") == [
+        "Python",
+        "FastAPI",
+    ]
+    assert models.parse_technologies(None) == []
+
+
+def test_tag_counts_follow_project_writes(client: TestClient, db: Session):
+    first = create_project(client, "A", "Python, FastAPI")
+    create_project(client, "B", "python, React")
+    assert facets(client) == {"Python": 2, "FastAPI": 1, "React": 1}
+
+    client.put(
+        f"/api/admin/projects/{first['id']}",
+        json={"name": "A", "description": "D", "technologies": "Rust"},
+        headers=HEADERS,
+    )
+    # Tagi bez projektów znikają z listy
+    assert facets(client) == {"Python": 1, "React": 1, "Rust": 1}
+
+    client.delete(f"/api/admin/projects/{first['id']}", headers=HEADERS)
+    assert facets(client) == {"Python": 1, "React": 1}
+    assert db.query(models.Technology).count() == 4
+
+
+def test_technology_filter_matches_whole_tags(client: TestClient, db: Session):
+    create_project(client, "A", "Python")
+    create_project(client, "B", "CPython-ish")
+
+    response = client.get("/api/projects/", params={"technology": "PYTHON"})
+    assert [p["name"] for p in response.json()] == ["A"]
+
+
+def test_technology_filter_uses_tag_indexes(db: Session, query_plan):
+    plan = query_plan(lambda: projects_router.list_projects(db, technology="Python"))
+    assert "sqlite_autoindex_technologies_1 (name=?)" in plan
+    assert "ix_project_technologies_technology (technology_id=?)" in plan
+    assert "SCAN project_technologies" not in plan
+
+
+def test_migration_splits_existing_strings(db: Session):
+    db.add_all(
+        [
+            models.Project(name="A", technologies="C++, Qt"),
+            models.Project(name="B", technologies="Qt"),
+        ]
+    )
+    db.commit()
+    # Stan sprzed migracji - tylko tekstowe pole technologies
+    db.execute(models.project_technologies.delete())
+    db.query(models.Technology).delete()
+    db.commit()
+
+    assert migrate_technology_tags(db.get_bind()) == 2
+    counts = {t.name: t.project_count for t in db.query(models.Technology)}
+    assert counts == {"C++": 1, "Qt": 2}
+    # Drugie uruchomienie nic nie zmienia
+    assert migrate_technology_tags(db.get_bind()) == 0
@@ -0,0 +1,325 @@
+import asyncio
+import hashlib
+import os
+from datetime import timedelta
+
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+
+from app.models import models
+from app.routers import projects as projects_router
+from app.routers import uploads as uploads_router
+
+HEADERS = {"X-API-Key": "test_api_key"}
+
+
+@pytest.fixture()
+def upload_dirs(tmp_path):
+    uploads_router.STAGING_DIR = str(tmp_path / "staging")
+    projects_router.EXE_DIR = str(tmp_path / "executables")
+    projects_router.FILES_DIR = str(tmp_path / "project_files")
+    return tmp_path
+
+
+def create_project(db: Session) -> models.Project:
+    project = models.Project(name="Game", description="D", technologies="C++")
+    db.add(project)
+    db.commit()
+    db.refresh(project)
+    return project
+
+
+def start_upload(client: TestClient, project_id: int, content: bytes, **extra):
+    payload = {
+        "kind": "executable",
+        "file_name": "setup.exe",
+        "total_size": len(content),
+        "project_id": project_id,
+        "version": "2.0",
+        "platform": models.Platforms.WIN.value,
+    }
+    payload.update(extra)
+    return client.post("/api/admin/uploads/", json=payload, headers=HEADERS)
+
+
+def put_chunk(client: TestClient, upload_id: str, offset: int, chunk: bytes):
+    return client.put(
+        f"/api/admin/uploads/{upload_id}",
+        params={"offset": offset},
+        content=chunk,
+        headers={**HEADERS, "Content-Type": "application/octet-stream"},
+    )
+
+
+def test_chunked_executable_upload(client: TestClient, db: Session, upload_dirs):
+    project = create_project(db)
+    content = b"A" * 1000 + b"B" * 500
+
+    response = start_upload(client, project.id, content)
+    assert response.status_code == 200
+    upload_id = response.json()["id"]
+    assert response.json()["received"] == 0
+
+    assert put_chunk(client, upload_id, 0, content[:1000]).json()["received"] == 1000
+    assert (
+        client.get(f"/api/admin/uploads/{upload_id}", headers=HEADERS).json()[
+            "received"
+        ]
+        == 1000
+    )
+    assert put_chunk(client, upload_id, 1000, content[1000:]).json()["received"] == 1500
+
+    response = client.post(f"/api/admin/uploads/{upload_id}/finalize", headers=HEADERS)
+    assert response.status_code == 200
+    data = response.json()
+    assert data["version"] == "2.0"
+    assert data["file_name"] == "setup.exe"
+    assert hashlib.sha256(content).hexdigest() in data["file_path"]
+    with open(data["file_path"], "rb") as f:
+        assert f.read() == content
+
+    # Sesja i plik roboczy znikają po finalizacji
+    assert not os.listdir(uploads_router.STAGING_DIR)
+    assert (
+        client.get(f"/api/admin/uploads/{upload_id}", headers=HEADERS).status_code
+        == 404
+    )
+
+
+def test_chunk_with_wrong_offset_is_rejected(
+    client: TestClient, db: Session, upload_dirs
+):
+    project = create_project(db)
+    upload_id = start_upload(client, project.id, b"0123456789").json()["id"]
+    put_chunk(client, upload_id, 0, b"01234")
+
+    response = put_chunk(client, upload_id, 2, b"23456")
+    assert response.status_code == 409
+    assert "expected 5" in response.json()["detail"]
+
+
+def test_chunk_beyond_declared_size(client: TestClient, db: Session, upload_dirs):
+    project = create_project(db)
+    upload_id = start_upload(client, project.id, b"0123").json()["id"]
+
+    assert put_chunk(client, upload_id, 0, b"0123456").status_code == 413
+
+
+def test_finalize_incomplete_upload(client: TestClient, db: Session, upload_dirs):
+    project = create_project(db)
+    upload_id = start_upload(client, project.id, b"0123456789").json()["id"]
+    put_chunk(client, upload_id, 0, b"0123")
+
+    response = client.post(f"/api/admin/uploads/{upload_id}/finalize", headers=HEADERS)
+    assert response.status_code == 409
+
+
+def test_finalize_after_restart_rehashes(client: TestClient, db: Session, upload_dirs):
+    project = create_project(db)
+    content = b"archive-bytes"
+    upload_id = start_upload(
+        client, project.id, content, kind="project_file", file_name="src.zip"
+    ).json()["id"]
+    put_chunk(client, upload_id, 0, content)
+    uploads_router._hashers.clear()  # symulacja restartu procesu
+
+    data = client.post(
+        f"/api/admin/uploads/{upload_id}/finalize", headers=HEADERS
+    ).json()
+    assert data["file_path"].endswith(hashlib.sha256(content).hexdigest() + ".zip")
+    assert db.query(models.ProjectFiles).count() == 1
+
+
+def test_project_file_upload_requires_archive(
+    client: TestClient, db: Session, upload_dirs
+):
+    project = create_project(db)
+    response = start_upload(
+        client, project.id, b"x", kind="project_file", file_name="virus.exe"
+    )
+    assert response.status_code == 400
+
+
+def test_expired_sessions_are_purged(client: TestClient, db: Session, upload_dirs):
+    project = create_project(db)
+    upload_id = start_upload(client, project.id, b"0123").json()["id"]
+    db.query(models.UploadSession).update(
+        {"expires_at": models.utcnow() - timedelta(seconds=1)}
+    )
+    db.commit()
+
+    assert put_chunk(client, upload_id, 0, b"0123").status_code == 404
+    start_upload(client, project.id, b"4567")
+
+    assert db.query(models.UploadSession).count() == 1
+    assert not os.path.exists(uploads_router.staging_path(upload_id))
+
+
+def test_expired_sessions_are_purged_on_finalize(
+    client: TestClient, db: Session, upload_dirs
+):
+    project = create_project(db)
+    expired_id = start_upload(client, project.id, b"0123").json()["id"]
+    upload_id = start_upload(client, project.id, b"4567").json()["id"]
+    put_chunk(client, upload_id, 0, b"4567")
+    db.query(models.UploadSession).filter_by(id=expired_id).update(
+        {"expires_at": models.utcnow() - timedelta(seconds=1)}
+    )
+    db.commit()
+
+    client.post(f"/api/admin/uploads/{upload_id}/finalize", headers=HEADERS)
+
+    assert db.query(models.UploadSession).count() == 0
+    assert not os.path.exists(uploads_router.staging_path(expired_id))
+
+
+def test_unknown_session_does_not_leave_lock(client: TestClient, upload_dirs):
+    assert put_chunk(client, "unknown", 0, b"0123").status_code == 404
+    response = client.post("/api/admin/uploads/unknown/finalize", headers=HEADERS)
+    assert response.status_code == 404
+    assert "unknown" not in uploads_router._locks
+
+
+def test_concurrent_finalize_creates_one_file(
+    client: TestClient, db: Session, upload_dirs
+):
+    project = create_project(db)
+    upload_id = start_upload(client, project.id, b"0123").json()["id"]
+    put_chunk(client, upload_id, 0, b"0123")
+
+    async def finalize_twice():
+        transport = httpx.ASGITransport(app=client.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://t") as c:
+            url = f"/api/admin/uploads/{upload_id}/finalize"
+            return await asyncio.gather(*(c.post(url, headers=HEADERS) for _ in "ab"))
+
+    responses = client.portal.call(finalize_twice)
+
+    assert sorted(r.status_code for r in responses) == [200, 404]
+    assert db.query(models.ExecutableFile).count() == 1
+    assert upload_id not in uploads_router._locks
+
+
+def test_abort_upload(client: TestClient, db: Session, upload_dirs):
+    project = create_project(db)
+    upload_id = start_upload(client, project.id, b"0123").json()["id"]
+
+    response = client.delete(f"/api/admin/uploads/{upload_id}", headers=HEADERS)
+    assert response.status_code == 200
+    assert not os.path.exists(uploads_router.staging_path(upload_id))
+
+
+def expire_all_sessions(db: Session):
+    db.query(models.UploadSession).update(
+        {"expires_at": models.utcnow() - timedelta(seconds=1)}
+    )
+    db.commit()
+
+
+def test_expired_sessions_are_purged_in_background(
+    client: TestClient, db: Session, upload_dirs, monkeypatch
+):
+    project = create_project(db)
+    upload_id = start_upload(client, project.id, b"0123").json()["id"]
+    expire_all_sessions(db)
+    monkeypatch.setattr(uploads_router, "SessionLocal", lambda: Session(db.get_bind()))
+    sleeps = []
+
+    async def fake_sleep(delay):
+        sleeps.append(delay)
+        if len(sleeps) > 1:
+            raise asyncio.CancelledError
+
+    monkeypatch.setattr(uploads_router.asyncio, "sleep", fake_sleep)
+    with pytest.raises(asyncio.CancelledError):
+        asyncio.run(uploads_router.purge_periodically(60))
+
+    assert sleeps == [60, 60]
+    assert db.query(models.UploadSession).count() == 0
+    assert not os.path.exists(uploads_router.staging_path(upload_id))
+
+
+def test_purge_skips_session_with_chunk_in_progress(
+    client: TestClient, db: Session, upload_dirs
+):
+    project = create_project(db)
+    upload_id = start_upload(client, project.id, b"0123").json()["id"]
+    expire_all_sessions(db)
+
+    async def purge_while_writing():
+        lock = uploads_router._locks.setdefault(upload_id, asyncio.Lock())
+        async with lock:
+            return uploads_router.purge_expired_sessions(db)
+
+    assert asyncio.run(purge_while_writing()) == 0
+    assert upload_id in uploads_router._locks
+    assert os.path.exists(uploads_router.staging_path(upload_id))
+    assert uploads_router.purge_expired_sessions(db) == 1
+
+
+def test_chunk_is_written_through_one_open_file(
+    client: TestClient, db: Session, upload_dirs, monkeypatch
+):
+    project = create_project(db)
+    content = bytes(range(250)) * 2
+    upload_id = start_upload(client, project.id, content).json()["id"]
+
+    opened, writes = [], []
+    open_at = uploads_router._open_at
+
+    class CountingStaging:
+        def __init__(self, staging):
+            self.staging = staging
+
+        def write(self, data):
+            writes.append(len(data))
+            return self.staging.write(data)
+
+        def close(self):
+            self.staging.close()
+
+    def counting_open_at(path, offset):
+        opened.append(offset)
+        return CountingStaging(open_at(path, offset))
+
+    monkeypatch.setattr(uploads_router, "_open_at", counting_open_at)
+
+    def body():
+        for start in range(0, len(content), 100):
+            yield content[start : start + 100]
+
+    response = client.put(
+        f"/api/admin/uploads/{upload_id}",
+        params={"offset": 0},
+        content=body(),
+        headers={**HEADERS, "Content-Type": "application/octet-stream"},
+    )
+    assert response.json()["received"] == 500
+    assert opened == [0]
+    assert sum(writes) == 500
+    with open(uploads_router.staging_path(upload_id), "rb") as f:
+        assert f.read() == content
+
+
+def test_chunk_loses_race_with_other_worker(
+    client: TestClient, db: Session, upload_dirs, monkeypatch
+):
+    project = create_project(db)
+    upload_id = start_upload(client, project.id, b"0123456789").json()["id"]
+    open_at = uploads_router._open_at
+
+    def open_after_other_worker(path, offset):
+        # Inny proces przyjął już ten sam zakres po naszym sprawdzeniu offsetu
+        db.query(models.UploadSession).filter_by(id=upload_id).update({"received": 5})
+        db.commit()
+        return open_at(path, offset)
+
+    monkeypatch.setattr(uploads_router, "_open_at", open_after_other_worker)
+
+    response = put_chunk(client, upload_id, 0, b"01234")
+    assert response.status_code == 409
+    assert upload_id not in uploads_router._hashers
+    db.expire_all()
+    assert db.get(models.UploadSession, upload_id).received == 5
@@ -1,4 +1,5 @@
 import React, { useEffect, useState } from "react";
+import { getHome } from "../services/api";
 
 const API_URL = "http://localhost:8000";
 
@@ -13,22 +14,11 @@ export default function PublicPage() {
 
   const fetchData = async () => {
     try {
-      // Pobieranie projektów
-      const resProj = await fetch(`${API_URL}/api/projects/`);
-      const dataProj = await resProj.json();
-      setProjects(dataProj);
-
-      // Pobieranie eventów
-      const resEvent = await fetch(`${API_URL}/api/events/`);
-      const dataEvent = await resEvent.json();
-      setEvents(dataEvent);
-
-      // Pobieranie info
-      const resInfo = await fetch(`${API_URL}/api/about/`);
-      if (resInfo.ok) {
-        const dataInfo = await resInfo.json();
-        setGroupInfo(dataInfo);
-      }
+      // Projekty, eventy i info w jednym zapytaniu
+      const data = await getHome();
+      setProjects(data.projects);
+      setEvents(data.events);
+      setGroupInfo(data.about);
     } catch (err) {
       console.error("Błąd pobierania danych", err);
     }
@@ -40,6 +30,17 @@ export default function PublicPage() {
     return `${API_URL}/${path}`;
   };
 
+  // Miniatury: przeglądarka wybiera najmniejszy wystarczający wariant
+  const getImageSrcSet = (img) =>
+    (img.variants || [])
+      .map((v) => `${getImageUrl(v.file_path)} ${v.width}w`)
+      .join(", ");
+
+  const getThumbnailUrl = (img) =>
+    img.variants && img.variants.length > 0
+      ? getImageUrl(img.variants[0].file_path)
+      : getImageUrl(img.file_path);
+
   return (
     <div style={{ padding: 20 }}>
       <h1>Strona Publiczna</h1>
@@ -79,7 +80,10 @@ export default function PublicPage() {
               evt.images.map((img) => (
                 <img
                   key={img.id}
-                  src={getImageUrl(img.file_path)}
+                  src={getThumbnailUrl(img)}
+                  srcSet={getImageSrcSet(img) || undefined}
+                  sizes="100px"
+                  loading="lazy"
                   alt="evt"
                   width="100"
                   style={{ marginRight: 5 }}
@@ -112,7 +116,10 @@ export default function PublicPage() {
                 proj.images.map((img) => (
                   <img
                     key={img.id}
-                    src={getImageUrl(img.file_path)}
+                    src={getThumbnailUrl(img)}
+                    srcSet={getImageSrcSet(img) || undefined}
+                    sizes="100px"
+                    loading="lazy"
                     alt="proj"
                     width="100"
                     style={{ marginRight: 5 }}
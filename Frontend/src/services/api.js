@@ -44,6 +44,13 @@ const uploadFileApi = async (url, formData, options = {}) => {
     return response.json();
 }
 
+// Dane strony głównej (projekty, wydarzenia, info) w jednym zapytaniu
+export const getHome = () => fetchApi(`${API_URL}/home`);
+
+// Wyszukiwanie pełnotekstowe w projektach i wydarzeniach (po stronie serwera)
+export const search = (query, limit = 20) =>
+  fetchApi(`${API_URL}/search?${new URLSearchParams({ q: query, limit })}`);
+
 // Funkcje API dla projektów
 export const getProjects = () => fetchApi(`${API_URL}/projects/`);
 